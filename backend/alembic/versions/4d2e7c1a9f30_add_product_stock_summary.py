@@ -0,0 +1,48 @@
+"""add_product_stock_summary
+
+Revision ID: 4d2e7c1a9f30
+Revises: 3cbaf9ab57b9
+Create Date: 2026-10-19 09:12:41.203118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d2e7c1a9f30'
+down_revision: Union[str, None] = '3cbaf9ab57b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('product_stock_summary',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('on_hand_quantity', sa.Integer(), nullable=False),
+    sa.Column('reserved_quantity', sa.Integer(), nullable=False),
+    sa.Column('available_quantity', sa.Integer(), nullable=False),
+    sa.Column('location_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+
+    # Backfill from existing inventory so the summary starts consistent
+    op.execute("""
+        INSERT INTO product_stock_summary
+            (product_id, on_hand_quantity, reserved_quantity, available_quantity, location_count)
+        SELECT product_id,
+               COALESCE(SUM(quantity), 0),
+               COALESCE(SUM(reserved_quantity), 0),
+               COALESCE(SUM(quantity), 0) - COALESCE(SUM(reserved_quantity), 0),
+               COUNT(*)
+        FROM inventory
+        GROUP BY product_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('product_stock_summary')
@@ -0,0 +1,30 @@
+"""add_version_columns
+
+Revision ID: 5f3a8c2d7e91
+Revises: 9c4d1e6b8a27
+Create Date: 2026-10-19 17:48:12.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3a8c2d7e91'
+down_revision: Union[str, None] = '9c4d1e6b8a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('inventory', 'purchase_orders', 'products')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column('version_id', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, 'version_id')
@@ -0,0 +1,50 @@
+"""add_inventory_stock_status
+
+Revision ID: 7a91c3e5b2d4
+Revises: 4d2e7c1a9f30
+Create Date: 2026-10-19 11:40:03.518274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a91c3e5b2d4'
+down_revision: Union[str, None] = '4d2e7c1a9f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    stockstatus_enum = sa.Enum('OK', 'LOW', 'OUT', 'OVER', name='stockstatus')
+    stockstatus_enum.create(op.get_bind())
+
+    op.add_column('inventory', sa.Column('stock_status', stockstatus_enum, nullable=False, server_default='OK'))
+
+    # Classify existing rows with the same rules as classify_stock_status
+    op.execute("""
+        UPDATE inventory SET stock_status = CAST(CASE
+            WHEN inventory.quantity <= 0 THEN 'OUT'
+            WHEN inventory.quantity <= COALESCE(products.reorder_point, 0) THEN 'LOW'
+            WHEN products.max_stock_level IS NOT NULL AND inventory.quantity > products.max_stock_level THEN 'OVER'
+            ELSE 'OK'
+        END AS stockstatus)
+        FROM products
+        WHERE products.id = inventory.product_id
+    """)
+
+    op.create_index(
+        'ix_inventory_stock_status_quantity', 'inventory', ['stock_status', 'quantity', 'id'],
+        unique=False, postgresql_where=sa.text("stock_status <> 'OK'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_stock_status_quantity', table_name='inventory')
+    op.drop_column('inventory', 'stock_status')
+
+    stockstatus_enum = sa.Enum(name='stockstatus')
+    stockstatus_enum.drop(op.get_bind())
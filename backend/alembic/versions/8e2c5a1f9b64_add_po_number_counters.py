@@ -0,0 +1,36 @@
+"""add_po_number_counters
+
+Revision ID: 8e2c5a1f9b64
+Revises: 0b6e2f9d4c13
+Create Date: 2026-10-19 19:02:55.618240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2c5a1f9b64'
+down_revision: Union[str, None] = '0b6e2f9d4c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-year counters for databases without sequences; PostgreSQL uses
+    # po_number_seq_<year> sequences created on first use (app/core/po_numbers.py)
+    op.create_table('po_number_counters',
+    sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('last_value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('year')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('po_number_counters')
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        for name in bind.execute(sa.text("SELECT sequencename FROM pg_sequences WHERE sequencename LIKE 'po\\_number\\_seq\\_%'")).scalars().all():
+            op.execute(f"DROP SEQUENCE IF EXISTS {name}")
@@ -0,0 +1,55 @@
+"""add_stock_reservations
+
+Revision ID: 9c4d1e6b8a27
+Revises: e1b7d94c3a58
+Create Date: 2026-10-19 17:05:41.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4d1e6b8a27'
+down_revision: Union[str, None] = 'e1b7d94c3a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stock_reservations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('inventory_item_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('ACTIVE', 'RELEASED', 'EXPIRED', 'FULFILLED', name='reservationstatus'), nullable=False),
+    sa.Column('reference_type', sa.String(), nullable=True),
+    sa.Column('reference_id', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('released_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['inventory_item_id'], ['inventory.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stock_reservations_id'), 'stock_reservations', ['id'], unique=False)
+    op.create_index(op.f('ix_stock_reservations_inventory_item_id'), 'stock_reservations', ['inventory_item_id'], unique=False)
+    op.create_index(
+        'ix_stock_reservations_active_expires_at',
+        'stock_reservations',
+        ['expires_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'ACTIVE'"),
+        sqlite_where=sa.text("status = 'ACTIVE'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_reservations_active_expires_at', table_name='stock_reservations')
+    op.drop_index(op.f('ix_stock_reservations_inventory_item_id'), table_name='stock_reservations')
+    op.drop_index(op.f('ix_stock_reservations_id'), table_name='stock_reservations')
+    op.drop_table('stock_reservations')
+    sa.Enum(name='reservationstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,65 @@
+"""add_inventory_valuation
+
+Revision ID: c5e8f2a7d613
+Revises: 7a91c3e5b2d4
+Create Date: 2026-10-19 14:05:27.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8f2a7d613'
+down_revision: Union[str, None] = '7a91c3e5b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('inventory', sa.Column('average_unit_cost', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('inventory', sa.Column('fifo_value', sa.Float(), nullable=False, server_default='0'))
+
+    op.create_table('inventory_cost_layers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('inventory_item_id', sa.Integer(), nullable=False),
+    sa.Column('unit_cost', sa.Float(), nullable=False),
+    sa.Column('original_quantity', sa.Integer(), nullable=False),
+    sa.Column('remaining_quantity', sa.Integer(), nullable=False),
+    sa.Column('reference_type', sa.String(), nullable=True),
+    sa.Column('reference_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['inventory_item_id'], ['inventory.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_inventory_cost_layers_id'), 'inventory_cost_layers', ['id'], unique=False)
+    op.create_index(
+        'ix_inventory_cost_layers_open', 'inventory_cost_layers', ['inventory_item_id', 'id'],
+        unique=False, postgresql_where=sa.text('remaining_quantity > 0')
+    )
+
+    # Existing stock becomes one opening layer per row at its recorded cost
+    op.execute("""
+        UPDATE inventory SET
+            average_unit_cost = COALESCE(inventory.unit_cost, products.cost, 0),
+            fifo_value = GREATEST(inventory.quantity, 0) * COALESCE(inventory.unit_cost, products.cost, 0)
+        FROM products
+        WHERE products.id = inventory.product_id
+    """)
+    op.execute("""
+        INSERT INTO inventory_cost_layers
+            (inventory_item_id, unit_cost, original_quantity, remaining_quantity, reference_type)
+        SELECT id, average_unit_cost, quantity, quantity, 'opening'
+        FROM inventory
+        WHERE quantity > 0
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_cost_layers_open', table_name='inventory_cost_layers')
+    op.drop_index(op.f('ix_inventory_cost_layers_id'), table_name='inventory_cost_layers')
+    op.drop_table('inventory_cost_layers')
+    op.drop_column('inventory', 'fifo_value')
+    op.drop_column('inventory', 'average_unit_cost')
@@ -0,0 +1,49 @@
+"""add_purchase_order_rollups
+
+Revision ID: d7f1a3b9e2c6
+Revises: 8e2c5a1f9b64
+Create Date: 2026-10-19 20:14:07.351902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7f1a3b9e2c6'
+down_revision: Union[str, None] = '8e2c5a1f9b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('purchase_order_rollups',
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('supplier_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM('DRAFT', 'PENDING_APPROVAL', 'APPROVED', 'ORDERED', 'PARTIALLY_RECEIVED', 'RECEIVED', 'CANCELLED', name='purchaseorderstatus', create_type=False), nullable=False),
+    sa.Column('po_count', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('month', 'supplier_id', 'status')
+    )
+
+    # Backfill from existing orders so the rollup starts consistent
+    if op.get_bind().dialect.name == 'postgresql':
+        month = "date_trunc('month', order_date)::date"
+    else:
+        month = "date(order_date, 'start of month')"
+    op.execute(f"""
+        INSERT INTO purchase_order_rollups (month, supplier_id, status, po_count, total_amount)
+        SELECT {month}, supplier_id, status, COUNT(*), COALESCE(SUM(total_amount), 0)
+        FROM purchase_orders
+        WHERE status IS NOT NULL
+        GROUP BY {month}, supplier_id, status
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('purchase_order_rollups')
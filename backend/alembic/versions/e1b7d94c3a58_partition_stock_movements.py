@@ -0,0 +1,122 @@
+"""partition_stock_movements
+
+Revision ID: e1b7d94c3a58
+Revises: c5e8f2a7d613
+Create Date: 2026-10-19 16:22:10.667391
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7d94c3a58'
+down_revision: Union[str, None] = 'c5e8f2a7d613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    "id, inventory_item_id, movement_type, quantity, from_location_id, to_location_id, "
+    "reference_type, reference_id, unit_cost, notes, created_by, created_at"
+)
+
+
+def _add_months(month_start: date, months: int) -> date:
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # Declarative partitioning is PostgreSQL only; other databases keep the plain table
+        op.create_index('ix_stock_movements_item_created', 'stock_movements', ['inventory_item_id', 'created_at'], unique=False)
+        return
+
+    op.execute("ALTER TABLE stock_movements RENAME TO stock_movements_legacy")
+    op.execute("ALTER SEQUENCE stock_movements_id_seq OWNED BY NONE")
+    op.execute("DROP INDEX IF EXISTS ix_stock_movements_id")
+
+    # The partition key must be part of the primary key
+    op.execute("""
+        CREATE TABLE stock_movements (
+            id INTEGER NOT NULL DEFAULT nextval('stock_movements_id_seq'),
+            inventory_item_id INTEGER NOT NULL REFERENCES inventory (id),
+            movement_type stockmovementtype NOT NULL,
+            quantity INTEGER NOT NULL,
+            from_location_id INTEGER REFERENCES locations (id),
+            to_location_id INTEGER REFERENCES locations (id),
+            reference_type VARCHAR,
+            reference_id INTEGER,
+            unit_cost FLOAT,
+            notes TEXT,
+            created_by INTEGER REFERENCES users (id),
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE stock_movements_id_seq OWNED BY stock_movements.id")
+    op.execute("CREATE TABLE stock_movements_default PARTITION OF stock_movements DEFAULT")
+
+    # One partition per month from the oldest movement through MONTHS_AHEAD from now
+    oldest = bind.execute(sa.text("SELECT MIN(created_at) FROM stock_movements_legacy")).scalar()
+    current = date.today().replace(day=1)
+    month = (oldest.date() if oldest else current).replace(day=1)
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        name = f"stock_movements_p{month.year:04d}_{month.month:02d}"
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF stock_movements "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+    op.execute(f"""
+        INSERT INTO stock_movements ({COLUMNS})
+        SELECT id, inventory_item_id, movement_type, quantity, from_location_id, to_location_id,
+               reference_type, reference_id, unit_cost, notes, created_by, COALESCE(created_at, now())
+        FROM stock_movements_legacy
+    """)
+    op.execute("DROP TABLE stock_movements_legacy")
+
+    op.create_index('ix_stock_movements_id', 'stock_movements', ['id'], unique=False)
+    op.create_index('ix_stock_movements_item_created', 'stock_movements', ['inventory_item_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_stock_movements_item_created', table_name='stock_movements')
+        return
+
+    op.execute("ALTER TABLE stock_movements RENAME TO stock_movements_partitioned")
+    op.execute("ALTER SEQUENCE stock_movements_id_seq OWNED BY NONE")
+    op.execute("DROP INDEX IF EXISTS ix_stock_movements_id")
+    op.execute("DROP INDEX IF EXISTS ix_stock_movements_item_created")
+
+    op.execute("""
+        CREATE TABLE stock_movements (
+            id INTEGER NOT NULL DEFAULT nextval('stock_movements_id_seq') PRIMARY KEY,
+            inventory_item_id INTEGER NOT NULL REFERENCES inventory (id),
+            movement_type stockmovementtype NOT NULL,
+            quantity INTEGER NOT NULL,
+            from_location_id INTEGER REFERENCES locations (id),
+            to_location_id INTEGER REFERENCES locations (id),
+            reference_type VARCHAR,
+            reference_id INTEGER,
+            unit_cost FLOAT,
+            notes TEXT,
+            created_by INTEGER REFERENCES users (id),
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+    """)
+    op.execute("ALTER SEQUENCE stock_movements_id_seq OWNED BY stock_movements.id")
+    op.execute(f"INSERT INTO stock_movements ({COLUMNS}) SELECT {COLUMNS} FROM stock_movements_partitioned")
+    op.execute("DROP TABLE stock_movements_partitioned")
+
+    op.create_index('ix_stock_movements_id', 'stock_movements', ['id'], unique=False)
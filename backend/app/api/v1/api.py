@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, products, categories, inventory, suppliers, locations, purchase_orders, stock_alerts, websocket, test_websocket
+from app.api.v1.endpoints import auth, users, products, categories, inventory, suppliers, locations, purchase_orders, stock_alerts, reservations, analytics, dashboard, replenishment, websocket, test_websocket
 
 api_router = APIRouter()
 
@@ -13,5 +13,9 @@ api_router.include_router(suppliers.router, prefix="/suppliers", tags=["supplier
 api_router.include_router(locations.router, prefix="/locations", tags=["locations"])
 api_router.include_router(purchase_orders.router, prefix="/purchase-orders", tags=["purchase-orders"])
 api_router.include_router(stock_alerts.router, prefix="/stock-alerts", tags=["stock-alerts"])
+api_router.include_router(reservations.router, prefix="/reservations", tags=["reservations"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(replenishment.router, prefix="/replenishment", tags=["replenishment"])
 api_router.include_router(websocket.router, tags=["websocket"])
 api_router.include_router(test_websocket.router, prefix="/test", tags=["test"]) 
\ No newline at end of file
@@ -0,0 +1,132 @@
+from typing import Any, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from datetime import date
+
+from app.core.database import get_db
+from app.core.security import get_current_active_user
+from app.models.user import User
+from app.models.supplier import Supplier as SupplierModel
+from app.models.purchase_order import PurchaseOrderStatus
+from app.models.purchase_order_rollup import PurchaseOrderRollup
+from app.schemas.analytics import PurchaseOrderAnalytics, SupplierSpend, MonthlySpend, StatusBreakdown
+
+router = APIRouter()
+
+# Cancelled orders are counted in the status breakdown but are not spend
+NON_SPEND_STATUSES = (PurchaseOrderStatus.CANCELLED,)
+
+def _require_reports(current_user: User = Depends(get_current_active_user)) -> User:
+    if not current_user.has_permission("view_reports"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to view reports"
+        )
+    return current_user
+
+def _month_window(
+    end_month: Optional[date] = Query(None, description="Last month included; defaults to the current month"),
+    months: int = Query(12, ge=1, le=120, description="Number of months up to and including end_month"),
+) -> Tuple[date, date]:
+    """First days of the first and last month in the requested window"""
+    end = (end_month or date.today()).replace(day=1)
+    index = end.year * 12 + end.month - 1 - (months - 1)
+    return date(index // 12, index % 12 + 1, 1), end
+
+def _rollups(db: Session, window: Tuple[date, date]):
+    start, end = window
+    return db.query(PurchaseOrderRollup).filter(
+        PurchaseOrderRollup.month >= start,
+        PurchaseOrderRollup.month <= end,
+        PurchaseOrderRollup.po_count > 0
+    )
+
+def _spend_rollups(db: Session, window: Tuple[date, date]):
+    return _rollups(db, window).filter(PurchaseOrderRollup.status.notin_(NON_SPEND_STATUSES))
+
+def _spend_by_supplier(db: Session, window: Tuple[date, date], limit: int) -> List[SupplierSpend]:
+    total_amount = func.sum(PurchaseOrderRollup.total_amount)
+    rows = _spend_rollups(db, window).join(
+        SupplierModel, SupplierModel.id == PurchaseOrderRollup.supplier_id
+    ).with_entities(
+        PurchaseOrderRollup.supplier_id,
+        SupplierModel.name.label("supplier_name"),
+        func.sum(PurchaseOrderRollup.po_count).label("order_count"),
+        total_amount.label("total_amount")
+    ).group_by(
+        PurchaseOrderRollup.supplier_id, SupplierModel.name
+    ).order_by(total_amount.desc(), PurchaseOrderRollup.supplier_id).limit(limit).all()
+    return [SupplierSpend.model_validate(row, from_attributes=True) for row in rows]
+
+def _spend_by_month(db: Session, window: Tuple[date, date]) -> List[MonthlySpend]:
+    rows = _spend_rollups(db, window).with_entities(
+        PurchaseOrderRollup.month,
+        func.sum(PurchaseOrderRollup.po_count).label("order_count"),
+        func.sum(PurchaseOrderRollup.total_amount).label("total_amount")
+    ).group_by(PurchaseOrderRollup.month).order_by(PurchaseOrderRollup.month).all()
+    return [
+        MonthlySpend(
+            month=row.month,
+            order_count=row.order_count,
+            total_amount=row.total_amount,
+            average_order_value=row.total_amount / row.order_count
+        )
+        for row in rows
+    ]
+
+def _breakdown_by_status(db: Session, window: Tuple[date, date]) -> List[StatusBreakdown]:
+    rows = _rollups(db, window).with_entities(
+        PurchaseOrderRollup.status,
+        func.sum(PurchaseOrderRollup.po_count).label("order_count"),
+        func.sum(PurchaseOrderRollup.total_amount).label("total_amount")
+    ).group_by(PurchaseOrderRollup.status).all()
+    order = list(PurchaseOrderStatus)
+    return [
+        StatusBreakdown(status=row.status.value, order_count=row.order_count, total_amount=row.total_amount)
+        for row in sorted(rows, key=lambda row: order.index(row.status))
+    ]
+
+@router.get("/purchase-orders", response_model=PurchaseOrderAnalytics)
+def get_purchase_order_analytics(
+    window: Tuple[date, date] = Depends(_month_window),
+    top_suppliers: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_require_reports)
+) -> Any:
+    """Supplier spend, monthly spend and status breakdown for the dashboard charts"""
+    return PurchaseOrderAnalytics(
+        start_month=window[0],
+        end_month=window[1],
+        by_supplier=_spend_by_supplier(db, window, top_suppliers),
+        by_month=_spend_by_month(db, window),
+        by_status=_breakdown_by_status(db, window)
+    )
+
+@router.get("/purchase-orders/by-supplier", response_model=List[SupplierSpend])
+def get_spend_by_supplier(
+    window: Tuple[date, date] = Depends(_month_window),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_require_reports)
+) -> Any:
+    """Top suppliers by spend, excluding cancelled orders"""
+    return _spend_by_supplier(db, window, limit)
+
+@router.get("/purchase-orders/by-month", response_model=List[MonthlySpend])
+def get_spend_by_month(
+    window: Tuple[date, date] = Depends(_month_window),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_require_reports)
+) -> Any:
+    """Spend per month with orders, excluding cancelled orders; months without orders are omitted"""
+    return _spend_by_month(db, window)
+
+@router.get("/purchase-orders/by-status", response_model=List[StatusBreakdown])
+def get_breakdown_by_status(
+    window: Tuple[date, date] = Depends(_month_window),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_require_reports)
+) -> Any:
+    """Order count and value per status"""
+    return _breakdown_by_status(db, window)
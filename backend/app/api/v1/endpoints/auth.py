@@ -6,13 +6,26 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, get_password_hash, create_password_reset_token, verify_password_reset_token
+from app.core.refresh_tokens import issue_refresh_token, rotate_refresh_token, revoke_refresh_token, revoke_user_tokens
+from app.core.security import verify_password, create_access_token, get_password_hash, password_needs_rehash, create_password_reset_token, verify_password_reset_token
 from app.models.user import User
-from app.schemas.auth import Token, PasswordResetRequest, PasswordResetConfirm
+from app.schemas.auth import Token, RefreshTokenRequest, PasswordResetRequest, PasswordResetConfirm
 from app.schemas.user import UserCreate, User as UserSchema
 
 router = APIRouter()
 
+def _token_pair(user: User, refresh_token: str) -> dict:
+    access_token = create_access_token(
+        data={"sub": user.username},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
 @router.post("/login", response_model=Token)
 def login(
     db: Session = Depends(get_db),
@@ -38,11 +51,43 @@ def login(
             detail="Inactive user"
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    # Upgrade hashes made at a previous bcrypt cost while the plain password is at hand
+    if password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = get_password_hash(form_data.password)
+            db.commit()
+        except HTTPException:
+            pass  # Hashing pool saturated; upgrade on a later login
+    
+    refresh_token = issue_refresh_token(db, user.id)
+    db.commit()
+    return _token_pair(user, refresh_token)
+
+@router.post("/refresh", response_model=Token)
+def refresh(
+    *,
+    db: Session = Depends(get_db),
+    token_in: RefreshTokenRequest,
+) -> Any:
+    """
+    Exchange a refresh token for a new access token and refresh token.
+    The presented refresh token is revoked; reusing it revokes the whole login.
+    """
+    user, refresh_token = rotate_refresh_token(db, token_in.refresh_token)
+    return _token_pair(user, refresh_token)
+
+@router.post("/logout")
+def logout(
+    *,
+    db: Session = Depends(get_db),
+    token_in: RefreshTokenRequest,
+) -> Any:
+    """
+    Revoke the refresh token and every token rotated from the same login.
+    """
+    revoke_refresh_token(db, token_in.refresh_token)
+    db.commit()
+    return {"message": "Logged out"}
 
 @router.post("/register", response_model=UserSchema)
 def register(
@@ -144,8 +189,9 @@ def reset_password(
             detail="Inactive user"
         )
     
-    # Update password
+    # Update password and end every existing session
     user.hashed_password = get_password_hash(password_reset.new_password)
+    revoke_user_tokens(db, user.id)
     db.commit()
     
     return {"message": "Password has been reset successfully"} 
\ No newline at end of file
@@ -0,0 +1,21 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.security import get_current_active_user
+from app.core.dashboard import get_dashboard_summary
+from app.models.user import User
+from app.schemas.dashboard import DashboardSummary
+
+router = APIRouter()
+
+@router.get("/summary", response_model=DashboardSummary)
+def read_dashboard_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Dashboard KPIs: entity counts, stock, purchase order and alert breakdowns, inventory value"""
+    # Purchase order figures follow the same visibility as the purchase order list
+    created_by = None if current_user.has_permission("view_all_po") else current_user.id
+    return get_dashboard_summary(db, created_by)
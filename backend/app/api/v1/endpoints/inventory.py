@@ -1,14 +1,21 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from datetime import datetime
 
 from app.core.database import get_db
 from app.core.security import get_current_active_user
-from app.models.inventory import Inventory, StockMovement, StockMovementType
+from app.core.concurrency import check_if_match, set_etag
+from app.core.idempotency import IdempotentRequest, get_idempotent_request
+from app.core.reservations import lock_inventory_item
+from app.core.valuation import post_receipt, post_issue, post_quantity_change
+from app.models.inventory import Inventory, StockMovement, StockMovementType, StockStatus, InventoryCostLayer
 from app.models.product import Product
+from app.models.category import Category
+from app.models.location import Location
 from app.models.user import User
-from app.schemas.inventory import InventoryCreate, InventoryUpdate, Inventory as InventorySchema, StockMovementCreate, StockMovement as StockMovementSchema, StockAdjustmentRequest
+from app.schemas.inventory import InventoryCreate, InventoryUpdate, Inventory as InventorySchema, StockMovementCreate, StockMovement as StockMovementSchema, StockAdjustmentRequest, ValuationGroupBy, InventoryValuation, InventoryValuationGroup
 from app.schemas.common import PaginatedResponse
 
 router = APIRouter()
@@ -21,6 +28,7 @@ def read_inventory(
     limit: int = 100,
     product_id: int = None,
     location_id: int = None,
+    stock_status: Optional[StockStatus] = None,
 ) -> Any:
     """
     Retrieve inventory items with optional filtering.
@@ -31,6 +39,8 @@ def read_inventory(
         query = query.filter(Inventory.product_id == product_id)
     if location_id:
         query = query.filter(Inventory.location_id == location_id)
+    if stock_status:
+        query = query.filter(Inventory.stock_status == stock_status)
     
     total = query.count()
     inventory_items = query.offset(skip).limit(limit).all()
@@ -64,18 +74,125 @@ def create_inventory_item(
             detail="Inventory item already exists for this product and location"
         )
     
-    inventory_item = Inventory(**inventory_in.dict())
+    inventory_data = inventory_in.dict()
+    opening_quantity = inventory_data.pop("quantity")
+    inventory_item = Inventory(**inventory_data, quantity=0)
     db.add(inventory_item)
+    
+    # Opening stock becomes the first cost layer
+    if opening_quantity > 0:
+        post_receipt(db, inventory_item, opening_quantity, inventory_in.unit_cost, reference_type="opening")
+    else:
+        inventory_item.quantity = opening_quantity
+        inventory_item.available_quantity = opening_quantity - inventory_item.reserved_quantity
+    
     db.commit()
     db.refresh(inventory_item)
     return inventory_item
 
+def _paginate_by_stock_status(db: Session, statuses: List[StockStatus], skip: int, limit: int) -> PaginatedResponse:
+    """Page through inventory rows in the given stock statuses, emptiest first"""
+    query = db.query(Inventory).filter(Inventory.stock_status.in_(statuses))
+    
+    total = query.count()
+    inventory_items = query.order_by(Inventory.quantity.asc(), Inventory.id.asc()).offset(skip).limit(limit).all()
+    
+    return PaginatedResponse(
+        data=inventory_items,
+        total=total,
+        page=skip // limit + 1,
+        size=limit
+    )
+
+@router.get("/low-stock", response_model=PaginatedResponse[InventorySchema])
+def get_low_stock_items(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    include_out_of_stock: bool = True,
+) -> Any:
+    """
+    Get inventory items with low stock (at or below reorder point).
+    """
+    statuses = [StockStatus.LOW, StockStatus.OUT] if include_out_of_stock else [StockStatus.LOW]
+    return _paginate_by_stock_status(db, statuses, skip, limit)
+
+@router.get("/out-of-stock", response_model=PaginatedResponse[InventorySchema])
+def get_out_of_stock_items(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """
+    Get inventory items that are out of stock.
+    """
+    return _paginate_by_stock_status(db, [StockStatus.OUT], skip, limit)
+
+@router.get("/overstock", response_model=PaginatedResponse[InventorySchema])
+def get_overstock_items(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """
+    Get inventory items above the product's maximum stock level.
+    """
+    return _paginate_by_stock_status(db, [StockStatus.OVER], skip, limit)
+
+@router.get("/valuation", response_model=InventoryValuation)
+def get_inventory_valuation(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    group_by: ValuationGroupBy = ValuationGroupBy.PRODUCT,
+    location_id: Optional[int] = None,
+) -> Any:
+    """
+    Get stock value under FIFO and weighted average cost, grouped by product, category or location.
+    """
+    if group_by == ValuationGroupBy.PRODUCT:
+        group_id, group_name = Product.id, Product.name
+    elif group_by == ValuationGroupBy.CATEGORY:
+        group_id, group_name = Product.category_id, Category.name
+    else:
+        group_id, group_name = Inventory.location_id, Location.name
+    
+    query = db.query(
+        group_id.label("group_id"),
+        group_name.label("name"),
+        func.coalesce(func.sum(Inventory.quantity), 0).label("quantity"),
+        func.coalesce(func.sum(Inventory.fifo_value), 0.0).label("fifo_value"),
+        func.coalesce(func.sum(Inventory.quantity * Inventory.average_unit_cost), 0.0).label("average_cost_value"),
+    ).join(Product, Inventory.product_id == Product.id)
+    
+    if group_by == ValuationGroupBy.CATEGORY:
+        query = query.outerjoin(Category, Product.category_id == Category.id)
+    elif group_by == ValuationGroupBy.LOCATION:
+        query = query.join(Location, Inventory.location_id == Location.id)
+    
+    if location_id:
+        query = query.filter(Inventory.location_id == location_id)
+    
+    rows = query.group_by(group_id, group_name).order_by(group_id).all()
+    groups = [InventoryValuationGroup(**row._asdict()) for row in rows]
+    
+    return InventoryValuation(
+        group_by=group_by,
+        groups=groups,
+        total_quantity=sum(group.quantity for group in groups),
+        total_fifo_value=sum(group.fifo_value for group in groups),
+        total_average_cost_value=sum(group.average_cost_value for group in groups),
+    )
+
 @router.get("/{inventory_id}", response_model=InventorySchema)
 def read_inventory_item(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     inventory_id: int,
+    response: Response,
 ) -> Any:
     """
     Get inventory item by ID.
@@ -86,6 +203,7 @@ def read_inventory_item(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Inventory item not found"
         )
+    set_etag(response, inventory_item)
     return inventory_item
 
 @router.put("/{inventory_id}", response_model=InventorySchema)
@@ -95,9 +213,11 @@ async def update_inventory_item(
     current_user: User = Depends(get_current_active_user),
     inventory_id: int,
     inventory_in: InventoryUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
 ) -> Any:
     """
-    Update inventory item.
+    Update inventory item. Send the item's ETag in If-Match to reject stale edits with 412.
     """
     inventory_item = db.query(Inventory).filter(Inventory.id == inventory_id).first()
     if not inventory_item:
@@ -105,17 +225,24 @@ async def update_inventory_item(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Inventory item not found"
         )
+    check_if_match(if_match, inventory_item)
     
     update_data = inventory_in.dict(exclude_unset=True)
+    new_quantity = update_data.pop("quantity", None)
     for field, value in update_data.items():
         setattr(inventory_item, field, value)
     
+    # Quantity edits are posted as receipts or issues so valuation stays in step
+    if new_quantity is not None:
+        post_quantity_change(db, inventory_item, new_quantity, update_data.get("unit_cost"), reference_type="adjustment")
+    
     # Update available quantity
     inventory_item.available_quantity = inventory_item.quantity - inventory_item.reserved_quantity
     
     db.add(inventory_item)
     db.commit()
     db.refresh(inventory_item)
+    set_etag(response, inventory_item)
     return inventory_item
 
 @router.delete("/{inventory_id}")
@@ -136,16 +263,15 @@ def delete_inventory_item(
         )
     
     try:
-        # Check if there are any stock movements for this inventory item
-        stock_movements = db.query(StockMovement).filter(
+        # Delete the item's movement history in one statement; on the partitioned
+        # ledger this is an index scan per partition rather than a count plus delete
+        db.query(StockMovement).filter(
             StockMovement.inventory_item_id == inventory_id
-        ).count()
+        ).delete(synchronize_session=False)
         
-        if stock_movements > 0:
-            # Delete associated stock movements first
-            db.query(StockMovement).filter(
-                StockMovement.inventory_item_id == inventory_id
-            ).delete()
+        db.query(InventoryCostLayer).filter(
+            InventoryCostLayer.inventory_item_id == inventory_id
+        ).delete()
             
         db.delete(inventory_item)
         db.commit()
@@ -164,16 +290,18 @@ def create_stock_movement(
     current_user: User = Depends(get_current_active_user),
     inventory_id: int,
     movement_in: StockMovementCreate,
+    idempotency: IdempotentRequest = Depends(get_idempotent_request),
 ) -> Any:
     """
-    Create stock movement for inventory item.
+    Create stock movement for inventory item. Retries with the same Idempotency-Key replay the first response.
     """
-    inventory_item = db.query(Inventory).filter(Inventory.id == inventory_id).first()
-    if not inventory_item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Inventory item not found"
-        )
+    replayed = idempotency.replay()
+    if replayed:
+        return replayed
+    
+    # Locked like reservations so issues and holds see each other's quantities
+    inventory_item = lock_inventory_item(db, inventory_id)
+    unreserved = inventory_item.quantity - (inventory_item.reserved_quantity or 0)
     
     # Create stock movement
     movement_data = movement_in.model_dump()
@@ -185,30 +313,38 @@ def create_stock_movement(
     )
     db.add(stock_movement)
     
-    # Update inventory quantities based on movement type
+    # Update inventory quantities and cost layers based on movement type
     if movement_in.movement_type == "in":
-        inventory_item.quantity += movement_in.quantity
+        layer = post_receipt(db, inventory_item, movement_in.quantity, movement_in.unit_cost,
+                             reference_type=movement_in.reference_type, reference_id=movement_in.reference_id)
+        stock_movement.unit_cost = layer.unit_cost
     elif movement_in.movement_type == "out":
-        if inventory_item.quantity < movement_in.quantity:
+        if unreserved < movement_in.quantity:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Insufficient stock for this movement"
+                detail=f"Insufficient stock for this movement: {unreserved} available after reservations"
             )
-        inventory_item.quantity -= movement_in.quantity
+        issued_cost = post_issue(db, inventory_item, movement_in.quantity)
+        stock_movement.unit_cost = issued_cost / movement_in.quantity if movement_in.quantity else None
     elif movement_in.movement_type == "transfer":
-        if inventory_item.quantity < movement_in.quantity:
+        if unreserved < movement_in.quantity:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Insufficient stock for this transfer"
+                detail=f"Insufficient stock for this transfer: {unreserved} available after reservations"
             )
-        inventory_item.quantity -= movement_in.quantity
+        issued_cost = post_issue(db, inventory_item, movement_in.quantity)
+        stock_movement.unit_cost = issued_cost / movement_in.quantity if movement_in.quantity else None
     
     # Update available quantity
     inventory_item.available_quantity = inventory_item.quantity - inventory_item.reserved_quantity
     inventory_item.last_restocked = datetime.utcnow()
     
     db.add(inventory_item)
-    db.commit()
+    db.flush()
+    idempotency.save(StockMovementSchema.model_validate(stock_movement))
+    replayed = idempotency.commit()
+    if replayed:
+        return replayed
     db.refresh(stock_movement)
     return stock_movement
 
@@ -220,6 +356,7 @@ def get_stock_movements(
     inventory_id: int,
     skip: int = 0,
     limit: int = 100,
+    since: Optional[datetime] = Query(None, description="Only movements at or after this time; limits the scan to recent partitions"),
 ) -> Any:
     """
     Get stock movements for an inventory item.
@@ -231,9 +368,13 @@ def get_stock_movements(
             detail="Inventory item not found"
         )
     
-    movements = db.query(StockMovement).filter(
+    query = db.query(StockMovement).filter(
         StockMovement.inventory_item_id == inventory_id
-    ).order_by(StockMovement.created_at.desc()).offset(skip).limit(limit).all()
+    )
+    if since:
+        query = query.filter(StockMovement.created_at >= since)
+    
+    movements = query.order_by(StockMovement.created_at.desc()).offset(skip).limit(limit).all()
     
     return movements
 
@@ -244,76 +385,47 @@ def adjust_stock(
     current_user: User = Depends(get_current_active_user),
     inventory_id: int,
     adjustment: StockAdjustmentRequest,
+    idempotency: IdempotentRequest = Depends(get_idempotent_request),
 ) -> Any:
     """
-    Manually adjust stock quantity (add or reduce).
+    Manually adjust stock quantity (add or reduce). Retries with the same Idempotency-Key replay the first response.
     """
-    inventory_item = db.query(Inventory).filter(Inventory.id == inventory_id).first()
-    if not inventory_item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Inventory item not found"
-        )
+    replayed = idempotency.replay()
+    if replayed:
+        return replayed
+    
+    inventory_item = lock_inventory_item(db, inventory_id)
+    
+    # Update inventory quantity, clamping reductions at the unreserved stock
+    if adjustment.quantity_change > 0:
+        applied = adjustment.quantity_change
+        post_receipt(db, inventory_item, applied, reference_type="adjustment")
+    else:
+        unreserved = inventory_item.quantity - (inventory_item.reserved_quantity or 0)
+        applied = -min(-adjustment.quantity_change, max(unreserved, 0))
+        post_issue(db, inventory_item, -applied)
     
-    # Create stock movement for adjustment
-    movement_type = StockMovementType.IN if adjustment.quantity_change > 0 else StockMovementType.OUT
+    # Create stock movement for the quantity actually applied
+    movement_type = StockMovementType.IN if applied > 0 else StockMovementType.OUT
     stock_movement = StockMovement(
         inventory_item_id=inventory_id,
         created_by=current_user.id,
         movement_type=movement_type,
-        quantity=abs(adjustment.quantity_change),
+        quantity=abs(applied),
         reference_type="adjustment",
         notes=adjustment.notes or f"Manual stock adjustment: {adjustment.quantity_change:+d}"
     )
     db.add(stock_movement)
     
-    # Update inventory quantity
-    inventory_item.quantity += adjustment.quantity_change
-    if inventory_item.quantity < 0:
-        inventory_item.quantity = 0
-    
     # Update available quantity
-    inventory_item.available_quantity = inventory_item.quantity - inventory_item.reserved_quantity
+    inventory_item.available_quantity = inventory_item.quantity - (inventory_item.reserved_quantity or 0)
     
     db.add(inventory_item)
-    db.commit()
     
-    return {
+    result = {
         "message": f"Stock adjusted by {adjustment.quantity_change:+d}",
         "new_quantity": inventory_item.quantity,
         "available_quantity": inventory_item.available_quantity
     }
-
-@router.get("/low-stock", response_model=List[InventorySchema])
-def get_low_stock_items(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-    skip: int = 0,
-    limit: int = 100,
-) -> Any:
-    """
-    Get inventory items with low stock (below reorder point).
-    """
-    low_stock_items = db.query(Inventory).join(
-        Product, Inventory.product_id == Product.id
-    ).filter(
-        Inventory.quantity <= Product.reorder_point
-    ).offset(skip).limit(limit).all()
-    
-    return low_stock_items
-
-@router.get("/out-of-stock", response_model=List[InventorySchema])
-def get_out_of_stock_items(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-    skip: int = 0,
-    limit: int = 100,
-) -> Any:
-    """
-    Get inventory items that are out of stock.
-    """
-    out_of_stock_items = db.query(Inventory).filter(
-        Inventory.quantity == 0
-    ).offset(skip).limit(limit).all()
-    
-    return out_of_stock_items 
\ No newline at end of file
+    idempotency.save(result)
+    return idempotency.commit() or result
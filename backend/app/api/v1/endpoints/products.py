@@ -1,17 +1,19 @@
 from typing import Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from sqlalchemy.orm import Session, contains_eager, noload
 from sqlalchemy import or_
 
 from app.core.database import get_db
+from app.core.concurrency import check_if_match, set_etag
 from app.models.product import Product as ProductModel
-from app.schemas.product import ProductCreate, ProductUpdate, Product
+from app.models.product_stock_summary import ProductStockSummary as ProductStockSummaryModel
+from app.schemas.product import ProductCreate, ProductUpdate, Product, ProductWithStock, ProductStockSummary
 from app.schemas.common import PaginatedResponse
 from app.models.purchase_order import PurchaseOrderStatus, PurchaseOrderItem, PurchaseOrder
 
 router = APIRouter()
 
-@router.get("/", response_model=PaginatedResponse[Product])
+@router.get("/", response_model=PaginatedResponse[ProductWithStock])
 def read_products(
     db: Session = Depends(get_db),
     skip: int = 0,
@@ -20,6 +22,7 @@ def read_products(
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     supplier_id: Optional[int] = Query(None, description="Filter by supplier ID"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    include_stock: bool = Query(False, description="Embed per-product stock totals across all locations"),
 ) -> Any:
     """
     Retrieve products with optional filtering.
@@ -27,6 +30,12 @@ def read_products(
     try:
         query = db.query(ProductModel)
         
+        # Stock totals come from the maintained summary table in the same query
+        if include_stock:
+            query = query.outerjoin(ProductModel.stock_summary).options(contains_eager(ProductModel.stock_summary))
+        else:
+            query = query.options(noload(ProductModel.stock_summary))
+        
         # Apply search filter
         if search:
             search_filter = or_(
@@ -90,6 +99,7 @@ def read_product(
     *,
     db: Session = Depends(get_db),
     product_id: int,
+    response: Response,
 ) -> Any:
     """
     Get product by ID.
@@ -100,17 +110,41 @@ def read_product(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
+    set_etag(response, product)
     return product
 
+@router.get("/{product_id}/stock", response_model=ProductStockSummary)
+def read_product_stock(
+    *,
+    db: Session = Depends(get_db),
+    product_id: int,
+) -> Any:
+    """
+    Get on hand, reserved and available stock for a product across all locations.
+    """
+    product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    
+    summary = db.query(ProductStockSummaryModel).filter(ProductStockSummaryModel.product_id == product_id).first()
+    if not summary:
+        return ProductStockSummary(product_id=product_id)
+    return summary
+
 @router.put("/{product_id}", response_model=Product)
 def update_product(
     *,
     db: Session = Depends(get_db),
     product_id: int,
     product_in: ProductUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
 ) -> Any:
     """
-    Update product.
+    Update product. Send the product's ETag in If-Match to reject stale edits with 412.
     """
     product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
     if not product:
@@ -118,6 +152,7 @@ def update_product(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
+    check_if_match(if_match, product)
     
     update_data = product_in.dict(exclude_unset=True)
     for field, value in update_data.items():
@@ -126,6 +161,7 @@ def update_product(
     db.add(product)
     db.commit()
     db.refresh(product)
+    set_etag(response, product)
     return product
 
 @router.delete("/{product_id}")
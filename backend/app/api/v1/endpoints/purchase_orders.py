@@ -1,31 +1,115 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from sqlalchemy.orm import Session, joinedload, selectinload
+from pydantic import ValidationError
+from sqlalchemy import and_, func, insert, update
 from datetime import datetime, date
-import random
-import string
 
 from app.core.database import get_db
 from app.core.security import get_current_active_user
+from app.core.concurrency import check_if_match, set_etag
+from app.core.idempotency import IdempotentRequest, get_idempotent_request
+from app.core.change_feed import record_changes, updated_change
+from app.core.receiving import receive_lines
+from app.core.po_numbers import po_number_allocator
 from app.models.user import User
 from app.models.purchase_order import PurchaseOrder as PurchaseOrderModel, PurchaseOrderItem as PurchaseOrderItemModel, PurchaseOrderStatus
+from app.models.purchase_order_rollup import apply_bulk_status_change
 from app.models.supplier import Supplier as SupplierModel
 from app.models.product import Product as ProductModel
-from app.models.inventory import Inventory, StockMovement, StockMovementType
-from app.schemas.purchase_order import PurchaseOrder, PurchaseOrderCreate, PurchaseOrderUpdate, PurchaseOrderUpdateWithItems, PurchaseOrderItem, PurchaseOrderItemCreate, PurchaseOrderItemUpdate
+from app.schemas.purchase_order import PurchaseOrder, PurchaseOrderCreate, PurchaseOrderUpdate, PurchaseOrderUpdateWithItems, PurchaseOrderItem, PurchaseOrderItemCreate, PurchaseOrderItemUpdate, PurchaseOrderReceiptLine, PurchaseOrderReceivingSession, PurchaseOrderSummary, PurchaseOrderView, PurchaseOrderBulkStatusChange, PurchaseOrderBulkStatusResult, PurchaseOrderStatusOutcome
 from app.schemas.common import PaginatedResponse
 
 router = APIRouter()
 
-def generate_po_number():
-    """Generate a unique PO number"""
-    prefix = "PO"
-    year = datetime.now().year
-    random_suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    return f"{prefix}{year}{random_suffix}"
+def _validate_products(db: Session, items: List[PurchaseOrderItemCreate]) -> None:
+    """Check every line's product exists with a single IN query"""
+    product_ids = {item.product_id for item in items}
+    if not product_ids:
+        return
+    found = {row[0] for row in db.query(ProductModel.id).filter(ProductModel.id.in_(product_ids))}
+    missing = [item.product_id for item in items if item.product_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Product with ID {missing[0]} not found")
 
-@router.get("/", response_model=PaginatedResponse[PurchaseOrder])
+def _line_rows(po_id: int, items: List[PurchaseOrderItemCreate]) -> List[dict]:
+    """Insert parameters for new lines, with line totals"""
+    return [
+        {**item.dict(), "purchase_order_id": po_id, "total_price": item.quantity * item.unit_price}
+        for item in items
+    ]
+
+def _load_purchase_orders(db: Session, po_ids: List[int]) -> List[PurchaseOrderModel]:
+    """Fetch purchase orders with supplier, lines and line products in three queries"""
+    return db.query(PurchaseOrderModel).options(
+        joinedload(PurchaseOrderModel.supplier),
+        selectinload(PurchaseOrderModel.items).selectinload(PurchaseOrderItemModel.product)
+    ).filter(PurchaseOrderModel.id.in_(po_ids)).order_by(PurchaseOrderModel.id).populate_existing().all()
+
+def _load_purchase_order(db: Session, po_id: int) -> PurchaseOrderModel:
+    return _load_purchase_orders(db, [po_id])[0]
+
+# Statuses each status may move to through the status endpoints
+VALID_STATUS_TRANSITIONS = {
+    PurchaseOrderStatus.DRAFT: [PurchaseOrderStatus.PENDING_APPROVAL, PurchaseOrderStatus.CANCELLED],
+    PurchaseOrderStatus.PENDING_APPROVAL: [PurchaseOrderStatus.APPROVED, PurchaseOrderStatus.CANCELLED],
+    PurchaseOrderStatus.APPROVED: [PurchaseOrderStatus.ORDERED, PurchaseOrderStatus.CANCELLED],
+    PurchaseOrderStatus.ORDERED: [PurchaseOrderStatus.PARTIALLY_RECEIVED, PurchaseOrderStatus.RECEIVED, PurchaseOrderStatus.CANCELLED],
+    PurchaseOrderStatus.PARTIALLY_RECEIVED: [PurchaseOrderStatus.RECEIVED, PurchaseOrderStatus.CANCELLED],
+    PurchaseOrderStatus.RECEIVED: [],  # Final state
+    PurchaseOrderStatus.CANCELLED: []  # Final state
+}
+
+def _check_status_permission(current_user: User, new_status: PurchaseOrderStatus) -> None:
+    """Check permissions based on status change"""
+    if new_status == PurchaseOrderStatus.APPROVED:
+        if not current_user.can_approve_po():
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions to approve purchase orders"
+            )
+    elif new_status == PurchaseOrderStatus.CANCELLED:
+        if not current_user.can_cancel_po():
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions to cancel purchase orders"
+            )
+
+def _summarize_purchase_orders(db: Session, query, skip: int, limit: int) -> List[PurchaseOrderSummary]:
+    """Project a page of purchase orders to header columns and add line aggregates"""
+    header_columns = [column for column in PurchaseOrderModel.__table__.columns if column.key in PurchaseOrderSummary.model_fields]
+    headers = query.outerjoin(PurchaseOrderModel.supplier).with_entities(
+        *header_columns, SupplierModel.name.label("supplier_name")
+    ).order_by(PurchaseOrderModel.id).offset(skip).limit(limit).all()
+    if not headers:
+        return []
+    
+    aggregates = {
+        row.purchase_order_id: row
+        for row in db.query(
+            PurchaseOrderItemModel.purchase_order_id,
+            func.count(PurchaseOrderItemModel.id).label("line_count"),
+            func.coalesce(func.sum(PurchaseOrderItemModel.quantity), 0).label("ordered_quantity"),
+            func.coalesce(func.sum(PurchaseOrderItemModel.received_quantity), 0).label("received_quantity"),
+        ).filter(
+            PurchaseOrderItemModel.purchase_order_id.in_([header.id for header in headers])
+        ).group_by(PurchaseOrderItemModel.purchase_order_id)
+    }
+    
+    summaries = []
+    for header in headers:
+        row = dict(header._mapping)
+        totals = aggregates.get(header.id)
+        if totals:
+            row.update(line_count=totals.line_count, ordered_quantity=totals.ordered_quantity, received_quantity=totals.received_quantity)
+        summaries.append(PurchaseOrderSummary(**row))
+    return summaries
+
+@router.get(
+    "/",
+    response_model=None,
+    responses={200: {"model": Union[PaginatedResponse[PurchaseOrder], PaginatedResponse[PurchaseOrderSummary]]}}
+)
 def get_purchase_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -33,14 +117,12 @@ def get_purchase_orders(
     supplier_id: Optional[int] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    view: PurchaseOrderView = Query(PurchaseOrderView.FULL, description="summary: header fields and line totals only; full: nested lines and products"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """Get all purchase orders with optional filtering and pagination"""
-    query = db.query(PurchaseOrderModel).options(
-        joinedload(PurchaseOrderModel.supplier),
-        joinedload(PurchaseOrderModel.items).joinedload(PurchaseOrderItemModel.product)
-    )
+    query = db.query(PurchaseOrderModel)
     
     # Role-based filtering
     if not current_user.has_permission("view_all_po"):
@@ -60,10 +142,24 @@ def get_purchase_orders(
         query = query.filter(PurchaseOrderModel.order_date <= end_date)
     
     total = query.count()
-    purchase_orders = query.offset(skip).limit(limit).all()
     
-    return PaginatedResponse(
-        data=purchase_orders,
+    # The two views have different shapes, so each is serialized through its own schema
+    if view == PurchaseOrderView.SUMMARY:
+        return PaginatedResponse[PurchaseOrderSummary](
+            data=_summarize_purchase_orders(db, query, skip, limit),
+            total=total,
+            page=skip // limit + 1,
+            size=limit
+        )
+    
+    # selectinload keeps LIMIT on the orders themselves instead of one row per line
+    purchase_orders = query.options(
+        joinedload(PurchaseOrderModel.supplier),
+        selectinload(PurchaseOrderModel.items).selectinload(PurchaseOrderItemModel.product)
+    ).order_by(PurchaseOrderModel.id).offset(skip).limit(limit).all()
+    
+    return PaginatedResponse[PurchaseOrder](
+        data=[PurchaseOrder.model_validate(po) for po in purchase_orders],
         total=total,
         page=skip // limit + 1,
         size=limit
@@ -88,44 +184,34 @@ def create_purchase_order(
         raise HTTPException(status_code=404, detail="Supplier not found")
     
     # Validate products exist
-    for item in purchase_order.items:
-        product = db.query(ProductModel).filter(ProductModel.id == item.product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail=f"Product with ID {item.product_id} not found")
+    _validate_products(db, purchase_order.items)
     
     # Create purchase order
     po_data = purchase_order.dict(exclude={'items'})
-    po_data['po_number'] = generate_po_number()
+    po_data['po_number'] = po_number_allocator.next_number(db)
     po_data['created_by'] = current_user.id
     
     db_po = PurchaseOrderModel(**po_data)
     db.add(db_po)
     db.flush()  # Get the ID without committing
     
-    # Calculate totals
-    subtotal = 0
-    
-    # Create purchase order items
-    for item_data in purchase_order.items:
-        item_data_dict = item_data.dict()
-        item_data_dict['purchase_order_id'] = db_po.id
-        item_data_dict['total_price'] = item_data.quantity * item_data.unit_price
-        subtotal += item_data_dict['total_price']
-        
-        db_item = PurchaseOrderItemModel(**item_data_dict)
-        db.add(db_item)
+    # Create all lines in one bulk insert and total them in the same pass
+    rows = _line_rows(db_po.id, purchase_order.items)
+    if rows:
+        db.execute(insert(PurchaseOrderItemModel), rows)
     
     # Update totals
+    subtotal = sum(row['total_price'] for row in rows)
     db_po.subtotal = subtotal
     db_po.total_amount = subtotal + db_po.tax_amount + db_po.shipping_amount
     
     db.commit()
-    db.refresh(db_po)
-    return db_po
+    return _load_purchase_order(db, db_po.id)
 
 @router.get("/{po_id}", response_model=PurchaseOrder)
 def get_purchase_order(
     po_id: int, 
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -145,12 +231,15 @@ def get_purchase_order(
             detail="Not enough permissions to view this purchase order"
         )
     
+    set_etag(response, db_po)
     return db_po
 
 @router.put("/{po_id}", response_model=PurchaseOrder)
 def update_purchase_order(
     po_id: int, 
     purchase_order: PurchaseOrderUpdate, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -170,6 +259,8 @@ def update_purchase_order(
             detail="Not enough permissions to edit this purchase order"
         )
     
+    check_if_match(if_match, db_po)
+    
     # Don't allow updates if already received
     if db_po.status in [PurchaseOrderStatus.RECEIVED, PurchaseOrderStatus.CANCELLED]:
         raise HTTPException(status_code=400, detail="Cannot update completed purchase order")
@@ -194,8 +285,101 @@ def update_purchase_order(
     
     db.commit()
     db.refresh(db_po)
+    set_etag(response, db_po)
     return db_po
 
+@router.post("/bulk-status", response_model=PurchaseOrderBulkStatusResult)
+def bulk_change_purchase_order_status(
+    change: PurchaseOrderBulkStatusChange,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Move many purchase orders to one status; orders that cannot make the transition are reported, not fatal"""
+    new_status = PurchaseOrderStatus(change.new_status.value)
+    _check_status_permission(current_user, new_status)
+    
+    po_ids = list(dict.fromkeys(change.po_ids))
+    allowed_from = [from_status for from_status, targets in VALID_STATUS_TRANSITIONS.items() if new_status in targets]
+    
+    # One locked read validates every order against the transition table
+    rows = {
+        row.id: row
+        for row in db.query(
+            PurchaseOrderModel.id,
+            PurchaseOrderModel.status,
+            PurchaseOrderModel.supplier_id,
+            PurchaseOrderModel.order_date,
+            PurchaseOrderModel.total_amount,
+            PurchaseOrderModel.version_id
+        ).filter(PurchaseOrderModel.id.in_(po_ids)).with_for_update()
+    }
+    
+    results = []
+    permitted = []
+    for po_id in po_ids:
+        row = rows.get(po_id)
+        if row is None:
+            results.append(PurchaseOrderStatusOutcome(po_id=po_id, success=False, detail="Purchase order not found"))
+        elif row.status not in allowed_from:
+            results.append(PurchaseOrderStatusOutcome(
+                po_id=po_id, success=False, previous_status=row.status.value, status=row.status.value,
+                detail=f"Invalid status transition from {row.status} to {new_status}"
+            ))
+        else:
+            results.append(PurchaseOrderStatusOutcome(
+                po_id=po_id, success=True, previous_status=row.status.value, status=new_status.value
+            ))
+            permitted.append(row)
+    
+    if permitted:
+        values = {
+            "status": new_status,
+            "version_id": PurchaseOrderModel.version_id + 1,
+            "updated_at": func.now(),
+        }
+        order_date = None
+        if new_status == PurchaseOrderStatus.APPROVED:
+            values.update(approved_by=current_user.id, approved_at=datetime.now())
+        elif new_status == PurchaseOrderStatus.ORDERED:
+            order_date = datetime.now().date()
+            values["order_date"] = order_date
+        
+        # Only rows the guarded UPDATE actually changed are rolled up and streamed
+        versions = dict(db.execute(
+            update(PurchaseOrderModel)
+            .where(
+                PurchaseOrderModel.id.in_([row.id for row in permitted]),
+                PurchaseOrderModel.status.in_(allowed_from)
+            )
+            .values(**values)
+            .returning(PurchaseOrderModel.id, PurchaseOrderModel.version_id)
+            .execution_options(synchronize_session=False)
+        ).all())
+        if len(versions) < len(permitted):
+            lost = {row.id for row in permitted if row.id not in versions}
+            results = [
+                PurchaseOrderStatusOutcome(
+                    po_id=outcome.po_id, success=False, previous_status=outcome.previous_status,
+                    detail="Status changed concurrently; reload and retry"
+                ) if outcome.po_id in lost else outcome
+                for outcome in results
+            ]
+            permitted = [row for row in permitted if row.id in versions]
+        apply_bulk_status_change(db, permitted, new_status, order_date)
+        fields = {key: value for key, value in values.items() if key not in ("version_id", "updated_at")}
+        record_changes(db, [
+            updated_change("purchase_order", row.id, {**fields, "version_id": versions[row.id]})
+            for row in permitted
+        ])
+        db.commit()
+    
+    return PurchaseOrderBulkStatusResult(
+        new_status=new_status.value,
+        updated=len(permitted),
+        failed=len(results) - len(permitted),
+        results=results
+    )
+
 @router.post("/{po_id}/status", response_model=PurchaseOrder)
 def change_purchase_order_status(
     po_id: int, 
@@ -216,32 +400,9 @@ def change_purchase_order_status(
     if not db_po:
         raise HTTPException(status_code=404, detail="Purchase order not found")
     
-    # Check permissions based on status change
-    if new_status == PurchaseOrderStatus.APPROVED:
-        if not current_user.can_approve_po():
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions to approve purchase orders"
-            )
-    elif new_status == PurchaseOrderStatus.CANCELLED:
-        if not current_user.can_cancel_po():
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions to cancel purchase orders"
-            )
-    
-    # Validate status transitions
-    valid_transitions = {
-        PurchaseOrderStatus.DRAFT: [PurchaseOrderStatus.PENDING_APPROVAL, PurchaseOrderStatus.CANCELLED],
-        PurchaseOrderStatus.PENDING_APPROVAL: [PurchaseOrderStatus.APPROVED, PurchaseOrderStatus.CANCELLED],
-        PurchaseOrderStatus.APPROVED: [PurchaseOrderStatus.ORDERED, PurchaseOrderStatus.CANCELLED],
-        PurchaseOrderStatus.ORDERED: [PurchaseOrderStatus.PARTIALLY_RECEIVED, PurchaseOrderStatus.RECEIVED, PurchaseOrderStatus.CANCELLED],
-        PurchaseOrderStatus.PARTIALLY_RECEIVED: [PurchaseOrderStatus.RECEIVED, PurchaseOrderStatus.CANCELLED],
-        PurchaseOrderStatus.RECEIVED: [],  # Final state
-        PurchaseOrderStatus.CANCELLED: []  # Final state
-    }
+    _check_status_permission(current_user, new_status)
     
-    if new_status not in valid_transitions.get(db_po.status, []):
+    if new_status not in VALID_STATUS_TRANSITIONS.get(db_po.status, []):
         raise HTTPException(
             status_code=400, 
             detail=f"Invalid status transition from {db_po.status} to {new_status}"
@@ -263,13 +424,19 @@ def change_purchase_order_status(
 def update_purchase_order_with_items(
     po_id: int, 
     purchase_order: PurchaseOrderUpdateWithItems, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Update a purchase order including items"""
+    """Update a purchase order including items.
+    
+    Submitted lines are matched to existing lines by product: matched lines are updated in
+    place (keeping their received quantity), the rest are bulk inserted, and existing lines
+    with no match are removed in a single delete.
+    """
     db_po = db.query(PurchaseOrderModel).options(
-        joinedload(PurchaseOrderModel.supplier),
-        joinedload(PurchaseOrderModel.items).joinedload(PurchaseOrderItemModel.product)
+        selectinload(PurchaseOrderModel.items)
     ).filter(PurchaseOrderModel.id == po_id).first()
     
     if not db_po:
@@ -282,6 +449,8 @@ def update_purchase_order_with_items(
             detail="Not enough permissions to edit this purchase order"
         )
     
+    check_if_match(if_match, db_po)
+    
     # Don't allow updates if already received
     if db_po.status in [PurchaseOrderStatus.RECEIVED, PurchaseOrderStatus.CANCELLED]:
         raise HTTPException(status_code=400, detail="Cannot update completed purchase order")
@@ -293,140 +462,139 @@ def update_purchase_order_with_items(
             raise HTTPException(status_code=404, detail="Supplier not found")
     
     # Validate products exist
-    for item in purchase_order.items:
-        product = db.query(ProductModel).filter(ProductModel.id == item.product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail=f"Product with ID {item.product_id} not found")
+    _validate_products(db, purchase_order.items)
     
     # Update basic fields
     update_data = purchase_order.dict(exclude={'items'}, exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_po, field, value)
     
-    # Clear existing items and recalculate totals
-    db.query(PurchaseOrderItemModel).filter(PurchaseOrderItemModel.purchase_order_id == po_id).delete()
+    # Diff submitted lines against existing ones, totalling in the same pass
+    existing_by_product = {}
+    for line in sorted(db_po.items, key=lambda line: line.id):
+        existing_by_product.setdefault(line.product_id, []).append(line)
     
-    # Calculate new totals
+    new_items = []
     subtotal = 0
-    
-    # Create new items
     for item_data in purchase_order.items:
-        item_data_dict = item_data.dict()
-        item_data_dict['purchase_order_id'] = po_id
-        item_data_dict['total_price'] = item_data.quantity * item_data.unit_price
-        subtotal += item_data_dict['total_price']
+        subtotal += item_data.quantity * item_data.unit_price
+        matches = existing_by_product.get(item_data.product_id)
+        if not matches:
+            new_items.append(item_data)
+            continue
         
-        db_item = PurchaseOrderItemModel(**item_data_dict)
-        db.add(db_item)
+        line = matches.pop(0)
+        if item_data.quantity < (line.received_quantity or 0):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot reduce item {line.id} below its received quantity of {line.received_quantity}"
+            )
+        changes = {**item_data.dict(), 'total_price': item_data.quantity * item_data.unit_price}
+        for field, value in changes.items():
+            if getattr(line, field) != value:
+                setattr(line, field, value)
+    
+    removed = [line for lines in existing_by_product.values() for line in lines]
+    for line in removed:
+        if line.received_quantity:
+            raise HTTPException(status_code=400, detail=f"Cannot remove item {line.id}: it has already been received")
+    
+    if removed:
+        db.query(PurchaseOrderItemModel).filter(
+            PurchaseOrderItemModel.id.in_([line.id for line in removed])
+        ).delete(synchronize_session=False)
+    if new_items:
+        db.execute(insert(PurchaseOrderItemModel), _line_rows(po_id, new_items))
     
     # Update totals
     db_po.subtotal = subtotal
     db_po.total_amount = subtotal + db_po.tax_amount + db_po.shipping_amount
+    # Item-only edits must still bump the order's version
+    db_po.updated_at = func.now()
     
     db.commit()
-    db.refresh(db_po)
+    db_po = _load_purchase_order(db, po_id)
+    set_etag(response, db_po)
     return db_po
 
+@router.post("/receive", response_model=List[PurchaseOrder])
+def receive_purchase_orders(
+    session: PurchaseOrderReceivingSession,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    idempotency: IdempotentRequest = Depends(get_idempotent_request)
+):
+    """Receive lines from several purchase orders at one location in a single transaction"""
+    if not current_user.can_receive_po():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to receive purchase orders"
+        )
+    
+    replayed = idempotency.replay()
+    if replayed:
+        return replayed
+    
+    po_ids = {line.purchase_order_id for line in session.lines}
+    found = {row[0] for row in db.query(PurchaseOrderModel.id).filter(PurchaseOrderModel.id.in_(po_ids))}
+    if po_ids - found:
+        raise HTTPException(status_code=404, detail=f"Purchase order {min(po_ids - found)} not found")
+    
+    receive_lines(db, session.location_id, session.lines, current_user)
+    
+    purchase_orders = _load_purchase_orders(db, sorted(po_ids))
+    idempotency.save([PurchaseOrder.model_validate(po) for po in purchase_orders])
+    replayed = idempotency.commit()
+    if replayed:
+        return replayed
+    return _load_purchase_orders(db, sorted(po_ids))
+
 @router.post("/{po_id}/receive", response_model=PurchaseOrder)
 def receive_purchase_order(
     po_id: int, 
     received_items: List[dict],  # List of {item_id: int, received_quantity: int}
     location_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    idempotency: IdempotentRequest = Depends(get_idempotent_request)
 ):
-    """Receive items from a purchase order"""
+    """Receive items from a purchase order; retries with the same Idempotency-Key replay the first response"""
     if not current_user.can_receive_po():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions to receive purchase orders"
         )
     
-    db_po = db.query(PurchaseOrderModel).options(
-        joinedload(PurchaseOrderModel.supplier),
-        joinedload(PurchaseOrderModel.items).joinedload(PurchaseOrderItemModel.product)
-    ).filter(PurchaseOrderModel.id == po_id).first()
+    replayed = idempotency.replay()
+    if replayed:
+        return replayed
     
+    db_po = db.query(PurchaseOrderModel).filter(PurchaseOrderModel.id == po_id).first()
     if not db_po:
         raise HTTPException(status_code=404, detail="Purchase order not found")
     
     if db_po.status in [PurchaseOrderStatus.DRAFT, PurchaseOrderStatus.PENDING_APPROVAL, PurchaseOrderStatus.CANCELLED]:
         raise HTTPException(status_code=400, detail="Cannot receive items from this purchase order status")
     
-    all_received = True
-    
-    for received_item in received_items:
-        item_id = received_item.get('item_id')
-        received_quantity = received_item.get('received_quantity', 0)
-        
-        if received_quantity <= 0:
-            continue
-            
-        # Find the purchase order item
-        po_item = db.query(PurchaseOrderItemModel).filter(
-            and_(PurchaseOrderItemModel.id == item_id, PurchaseOrderItemModel.purchase_order_id == po_id)
-        ).first()
-        
-        if not po_item:
-            raise HTTPException(status_code=404, detail=f"Purchase order item {item_id} not found")
-        
-        # Check if we're not exceeding the ordered quantity
-        total_received = po_item.received_quantity + received_quantity
-        if total_received > po_item.quantity:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Cannot receive more than ordered quantity for item {item_id}"
-            )
-        
-        # Update received quantity
-        po_item.received_quantity = total_received
-        
-        # Update inventory
-        inventory_item = db.query(Inventory).filter(
-            and_(Inventory.product_id == po_item.product_id, Inventory.location_id == location_id)
-        ).first()
-        
-        if not inventory_item:
-            # Create new inventory item
-            inventory_item = Inventory(
-                product_id=po_item.product_id,
-                location_id=location_id,
-                quantity=received_quantity,
-                unit_cost=po_item.unit_price
+    try:
+        lines = [
+            PurchaseOrderReceiptLine(
+                purchase_order_id=po_id,
+                item_id=received_item.get('item_id'),
+                received_quantity=received_item.get('received_quantity', 0)
             )
-            db.add(inventory_item)
-        else:
-            # Update existing inventory
-            inventory_item.quantity += received_quantity
-            inventory_item.available_quantity = inventory_item.quantity - inventory_item.reserved_quantity
-            inventory_item.last_restocked = datetime.now()
-        
-        # Create stock movement record
-        stock_movement = StockMovement(
-            inventory_item_id=inventory_item.id,
-            movement_type=StockMovementType.IN,
-            quantity=received_quantity,
-            reference_type="purchase_order",
-            reference_id=po_id,
-            unit_cost=po_item.unit_price,
-            notes=f"Received from PO {db_po.po_number} by {current_user.username}"
-        )
-        db.add(stock_movement)
-        
-        # Check if all items are received
-        if po_item.received_quantity < po_item.quantity:
-            all_received = False
-    
-    # Update purchase order status
-    if all_received:
-        db_po.status = PurchaseOrderStatus.RECEIVED
-        db_po.delivery_date = datetime.now().date()
-    else:
-        db_po.status = PurchaseOrderStatus.PARTIALLY_RECEIVED
-    
-    db.commit()
-    db.refresh(db_po)
-    return db_po
+            for received_item in received_items
+        ]
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    receive_lines(db, location_id, lines, current_user)
+    
+    db_po = _load_purchase_order(db, po_id)
+    idempotency.save(PurchaseOrder.model_validate(db_po))
+    replayed = idempotency.commit()
+    if replayed:
+        return replayed
+    return _load_purchase_order(db, po_id)
 
 @router.post("/{po_id}/items", response_model=PurchaseOrderItem)
 def add_purchase_order_item(
@@ -0,0 +1,49 @@
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.core.database import get_db
+from app.core.security import get_current_active_user
+from app.core.replenishment import plan_reorders, create_draft_purchase_orders
+from app.models.user import User
+from app.models.purchase_order import PurchaseOrder as PurchaseOrderModel, PurchaseOrderItem as PurchaseOrderItemModel
+from app.schemas.purchase_order import PurchaseOrder
+from app.schemas.replenishment import ReorderPlan
+
+router = APIRouter()
+
+def _require_create_po(current_user: User = Depends(get_current_active_user)) -> User:
+    if not current_user.has_permission("create_po"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to create purchase orders"
+        )
+    return current_user
+
+@router.get("/suggestions", response_model=ReorderPlan)
+def get_reorder_suggestions(
+    supplier_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_require_create_po)
+) -> Any:
+    """Dry run: reorder suggestions grouped by supplier, nothing is written"""
+    return plan_reorders(db, supplier_id)
+
+@router.post("/draft-purchase-orders", response_model=List[PurchaseOrder])
+def draft_reorder_purchase_orders(
+    supplier_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_require_create_po)
+) -> Any:
+    """Create one draft purchase order per supplier from the current suggestions"""
+    plan = plan_reorders(db, supplier_id)
+    purchase_orders = create_draft_purchase_orders(db, plan, current_user.id)
+    db.commit()
+    if not purchase_orders:
+        return []
+    return db.query(PurchaseOrderModel).options(
+        joinedload(PurchaseOrderModel.supplier),
+        selectinload(PurchaseOrderModel.items).selectinload(PurchaseOrderItemModel.product)
+    ).filter(
+        PurchaseOrderModel.id.in_([purchase_order.id for purchase_order in purchase_orders])
+    ).order_by(PurchaseOrderModel.id).populate_existing().all()
@@ -0,0 +1,122 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.security import get_current_active_user
+from app.core.reservations import reserve_stock, release_reservation, fulfill_reservation, reservation_scheduler
+from app.models.reservation import StockReservation, ReservationStatus
+from app.models.user import User
+from app.schemas.reservation import StockReservationCreate, StockReservation as StockReservationSchema
+from app.schemas.inventory import StockMovement as StockMovementSchema
+from app.schemas.common import PaginatedResponse
+
+router = APIRouter()
+
+def _get_reservation(db: Session, reservation_id: int, for_update: bool = False) -> StockReservation:
+    query = db.query(StockReservation).filter(StockReservation.id == reservation_id)
+    if for_update:
+        query = query.with_for_update()
+    reservation = query.first()
+    if not reservation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reservation not found"
+        )
+    return reservation
+
+@router.get("/", response_model=PaginatedResponse[StockReservationSchema])
+def read_reservations(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    skip: int = 0,
+    limit: int = 100,
+    inventory_item_id: Optional[int] = None,
+    reservation_status: Optional[ReservationStatus] = None,
+) -> Any:
+    """
+    Retrieve stock reservations with optional filtering.
+    """
+    query = db.query(StockReservation)
+    
+    if inventory_item_id:
+        query = query.filter(StockReservation.inventory_item_id == inventory_item_id)
+    if reservation_status:
+        query = query.filter(StockReservation.status == reservation_status)
+    
+    total = query.count()
+    reservations = query.order_by(StockReservation.id.desc()).offset(skip).limit(limit).all()
+    
+    return PaginatedResponse(
+        data=reservations,
+        total=total,
+        page=skip // limit + 1,
+        size=limit
+    )
+
+@router.post("/", response_model=StockReservationSchema, status_code=status.HTTP_201_CREATED)
+def create_reservation(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    reservation_in: StockReservationCreate,
+) -> Any:
+    """
+    Reserve stock of an inventory item until it is released, fulfilled or expires.
+    """
+    reservation = reserve_stock(
+        db,
+        reservation_in.inventory_item_id,
+        reservation_in.quantity,
+        ttl_seconds=reservation_in.ttl_seconds,
+        reference_type=reservation_in.reference_type,
+        reference_id=reservation_in.reference_id,
+        notes=reservation_in.notes,
+        created_by=current_user.id,
+    )
+    db.commit()
+    db.refresh(reservation)
+    reservation_scheduler.schedule(reservation.id, reservation.expires_at)
+    return reservation
+
+@router.get("/{reservation_id}", response_model=StockReservationSchema)
+def read_reservation(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    reservation_id: int,
+) -> Any:
+    """
+    Get stock reservation by ID.
+    """
+    return _get_reservation(db, reservation_id)
+
+@router.post("/{reservation_id}/release", response_model=StockReservationSchema)
+def release_stock_reservation(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    reservation_id: int,
+) -> Any:
+    """
+    Release an active reservation, returning its quantity to available stock.
+    """
+    reservation = release_reservation(db, _get_reservation(db, reservation_id, for_update=True))
+    db.commit()
+    db.refresh(reservation)
+    return reservation
+
+@router.post("/{reservation_id}/fulfill", response_model=StockMovementSchema)
+def fulfill_stock_reservation(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    reservation_id: int,
+) -> Any:
+    """
+    Fulfill an active reservation, issuing the reserved stock.
+    """
+    stock_movement = fulfill_reservation(db, _get_reservation(db, reservation_id, for_update=True), created_by=current_user.id)
+    db.commit()
+    db.refresh(stock_movement)
+    return stock_movement
@@ -1,10 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_
 from typing import List, Any, Optional
 from datetime import datetime, timedelta
 import json
-import logging
 
 from app.core.database import get_db
 from app.schemas.stock_alert import (
@@ -250,23 +249,8 @@ async def check_stock_alerts(db: Session = Depends(get_db)):
 # WebSocket endpoint for real-time alerts
 @router.websocket("/ws/alerts/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: int):
-    await websocket.accept()
-    try:
-        from app.core.websocket import manager
-        await manager.connect(websocket, user_id)
-        
-        while True:
-            # Keep connection alive
-            await websocket.receive_text()
-            
-    except WebSocketDisconnect:
-        try:
-            from app.core.websocket import manager
-            manager.disconnect(user_id)
-        except:
-            pass
-    except Exception as e:
-        logging.error(f"WebSocket error: {e}")
+    from app.api.v1.endpoints.websocket import serve_alerts
+    await serve_alerts(websocket, user_id)
 
 # Background task management
 @router.get("/background-task/status")
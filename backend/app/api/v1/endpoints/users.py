@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.refresh_tokens import revoke_user_tokens
 from app.core.security import get_current_active_user, verify_password
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate, User as UserSchema, UserWithPermissions
@@ -95,12 +96,19 @@ def create_user(
 
 @router.get("/me", response_model=UserWithPermissions)
 def read_current_user(
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
     Get current user with permissions.
     """
-    return convert_user_to_user_with_permissions(current_user)
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return convert_user_to_user_with_permissions(user)
 
 @router.get("/{user_id}", response_model=UserWithPermissions)
 def read_user(
@@ -221,13 +229,15 @@ def change_password(
     db: Session = Depends(get_db)
 ):
     """Change user password"""
-    if not verify_password(password_data["current_password"], current_user.hashed_password):
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if not user or not verify_password(password_data["current_password"], user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
-    current_user.hashed_password = get_password_hash(password_data["new_password"])
+    user.hashed_password = get_password_hash(password_data["new_password"])
+    revoke_user_tokens(db, user.id)
     db.commit()
     
     return {"message": "Password changed successfully"} 
\ No newline at end of file
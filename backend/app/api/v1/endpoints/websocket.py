@@ -1,28 +1,46 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.core.websocket import manager
+import os
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from app.core.change_feed import change_feed
+from app.core.security import get_current_active_user
+from app.core.websocket import decode_client_frame, manager
+from app.models.user import User
 
 router = APIRouter()
 
-@router.websocket("/ws/alerts")
-async def websocket_alerts(websocket: WebSocket):
-    await manager.connect(websocket)
+async def serve_alerts(websocket: WebSocket, user_id: int = None):
+    """Register the socket and handle client messages until it goes away"""
+    await manager.connect(websocket, user_id)
     try:
         while True:
-            # Keep connection alive
-            data = await websocket.receive_text()
-            # Echo back for heartbeat
-            await websocket.send_text(f"Message received: {data}")
+            # Text or binary: msgpack clients send binary frames
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            manager.touch(websocket)
+            request = decode_client_frame(message)
+            if not await manager.handle_client_message(websocket, request):
+                await change_feed.handle_client_message(websocket, request)
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        manager.disconnect(websocket, user_id)
+
+@router.websocket("/ws/alerts")
+async def websocket_alerts(websocket: WebSocket):
+    await serve_alerts(websocket)
 
 @router.websocket("/ws/alerts/{user_id}")
 async def websocket_user_alerts(websocket: WebSocket, user_id: int):
-    await manager.connect(websocket, user_id)
-    try:
-        while True:
-            # Keep connection alive
-            data = await websocket.receive_text()
-            # Echo back for heartbeat
-            await websocket.send_text(f"Message received: {data}")
-    except WebSocketDisconnect:
-        manager.disconnect(websocket, user_id) 
\ No newline at end of file
+    await serve_alerts(websocket, user_id)
+
+@router.get("/ws/stats")
+async def websocket_stats(current_user: User = Depends(get_current_active_user)):
+    """Live connection gauge and fan-out counters for this worker"""
+    return {
+        "worker_pid": os.getpid(),
+        "connections": len(manager.clients),
+        "users": len(manager.user_connections),
+        "topics": len(manager.topic_connections),
+        **manager.stats
+    }
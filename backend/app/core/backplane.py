@@ -0,0 +1,197 @@
+"""
+Cross-process pub/sub for WebSocket messages.
+
+Each worker only holds its own sockets, so a message published in one worker has to
+reach the others before it can be delivered. Publishers hand an envelope to the
+backplane; every subscribed worker, the publisher included, receives it and delivers
+it to its local connections.
+
+``PostgresBackplane`` uses ``LISTEN``/``NOTIFY`` on a dedicated autocommit connection,
+polled from the event loop with ``add_reader``, and reconnects with backoff if that
+connection is lost. NOTIFY payloads are limited to ~8000 bytes; larger envelopes are
+delivered to this worker only. ``InProcessBackplane`` is the single-process stand-in
+used with SQLite and in tests; several managers subscribed to one instance behave
+like several workers.
+"""
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.encoding import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Awaitable[None]]
+
+MAX_NOTIFY_PAYLOAD = 7999  # Bytes; PostgreSQL rejects payloads of 8000 or more
+
+
+class Backplane(ABC):
+    """Interface: deliver every published envelope to every subscribed handler"""
+
+    @abstractmethod
+    async def start(self, handler: Handler) -> None:
+        """Subscribe handler to every envelope published from now on"""
+
+    @abstractmethod
+    async def publish(self, envelope: dict) -> None:
+        """Deliver envelope to every subscribed handler, in every worker"""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Unsubscribe and release connections"""
+
+
+class InProcessBackplane(Backplane):
+    def __init__(self):
+        self.handlers: List[Handler] = []
+
+    async def start(self, handler: Handler) -> None:
+        self.handlers.append(handler)
+
+    async def publish(self, envelope: dict) -> None:
+        # Round-trip through JSON so subscribers see exactly what Postgres would carry
+        payload = dumps(envelope)
+        for handler in list(self.handlers):
+            await handler(loads(payload))
+
+    async def stop(self) -> None:
+        self.handlers.clear()
+
+
+class PostgresBackplane(Backplane):
+    def __init__(self, dsn: str, channel: Optional[str] = None):
+        self.dsn = dsn
+        self.channel = channel or settings.WEBSOCKET_BACKPLANE_CHANNEL
+        self.handler: Optional[Handler] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listen_conn = None
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._handler_tasks: Set[asyncio.Task] = set()  # Referenced until done so they are not garbage-collected
+        self._stopped = False
+
+    def _connect(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        return conn
+
+    async def start(self, handler: Handler) -> None:
+        self.handler = handler
+        self._loop = asyncio.get_running_loop()
+        self._stopped = False
+        await self._listen()
+
+    async def _listen(self) -> None:
+        conn = await asyncio.to_thread(self._connect)
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        self._listen_conn = conn
+        self._loop.add_reader(conn.fileno(), self._on_readable)
+        logger.info(f"WebSocket backplane listening on {self.channel}")
+
+    def _on_readable(self) -> None:
+        conn = self._listen_conn
+        try:
+            conn.poll()
+        except Exception as e:
+            logger.error(f"WebSocket backplane connection lost: {e}")
+            self._drop_listener()
+            if not self._stopped:
+                self._reconnect_task = self._loop.create_task(self._reconnect())
+            return
+
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            try:
+                envelope = loads(notify.payload)
+            except ValueError:
+                logger.warning("Ignoring malformed WebSocket backplane payload")
+                continue
+            task = self._loop.create_task(self.handler(envelope))
+            self._handler_tasks.add(task)
+            task.add_done_callback(self._on_handler_done)
+
+    def _on_handler_done(self, task: asyncio.Task) -> None:
+        self._handler_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"WebSocket backplane delivery failed: {task.exception()!r}")
+
+    def _drop_listener(self) -> None:
+        conn, self._listen_conn = self._listen_conn, None
+        if conn is None:
+            return
+        try:
+            self._loop.remove_reader(conn.fileno())
+        except Exception:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    async def _reconnect(self) -> None:
+        delay = 1
+        while not self._stopped:
+            await asyncio.sleep(delay)
+            try:
+                await self._listen()
+                return
+            except Exception as e:
+                logger.error(f"WebSocket backplane reconnect failed: {e}")
+                delay = min(delay * 2, 30)
+
+    def _notify(self, payload: str) -> None:
+        with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publish_conn is None or self._publish_conn.closed:
+                        self._publish_conn = self._connect()
+                    with self._publish_conn.cursor() as cursor:
+                        cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+                    return
+                except Exception:
+                    self._publish_conn = None
+                    if attempt:
+                        raise
+
+    async def publish(self, envelope: dict) -> None:
+        payload = dumps(envelope)
+        if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+            logger.warning(f"WebSocket message of {len(payload)} bytes is too large for NOTIFY; delivering locally only")
+            await self.handler(envelope)
+            return
+        try:
+            await asyncio.to_thread(self._notify, payload)
+        except Exception as e:
+            # Better to reach this worker's clients than none
+            logger.error(f"WebSocket backplane publish failed, delivering locally only: {e}")
+            await self.handler(envelope)
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        self._drop_listener()
+        with self._publish_lock:
+            if self._publish_conn is not None:
+                self._publish_conn.close()
+                self._publish_conn = None
+
+
+def create_backplane(engine) -> Backplane:
+    """Backplane for the configured mode: "postgres", "memory", or "auto" (by database dialect)"""
+    mode = settings.WEBSOCKET_BACKPLANE
+    if mode == "auto":
+        mode = "postgres" if engine.dialect.name == "postgresql" else "memory"
+    if mode == "postgres":
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        return PostgresBackplane(dsn)
+    return InProcessBackplane()
@@ -0,0 +1,305 @@
+"""
+Resumable stream of inventory, alert and purchase order changes.
+
+Every flush that creates, updates or deletes one of these rows records a compact change
+(entity, id, op, the changed columns' new values) in ``change_events`` in the same
+transaction; the row id is the global sequence number. Once the transaction commits
+the changes are published over the WebSocket manager, tagged with the entity's
+``location:``, ``product:``, ``alerts:`` and ``changes:{entity}`` topics, so they reach
+every worker through the backplane.
+
+Each worker keeps the last CHANGE_FEED_BUFFER_SIZE changes it delivered in a ring
+buffer. A reconnecting client sends ``{"action": "resume", "since": <last sequence>}``
+and is replayed what it missed from the buffer, or from ``change_events`` when the gap
+is older than the buffer. Gaps larger than CHANGE_FEED_MAX_REPLAY, or older than the
+CHANGE_FEED_RETENTION_HOURS kept in the database, get a ``reset`` reply instead and the
+client refetches. Sequence numbers are allocated at flush, so concurrent transactions
+can commit slightly out of sequence order.
+"""
+import asyncio
+import enum
+import logging
+import threading
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Deque, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.encoding import dumps, loads
+from app.core.websocket import ConnectionManager
+from app.models.change_event import ChangeEvent
+from app.models.inventory import Inventory
+from app.models.purchase_order import PurchaseOrder
+from app.models.stock_alert import StockAlert
+
+logger = logging.getLogger(__name__)
+
+TRACKED_ENTITIES = {Inventory: "inventory", StockAlert: "stock_alert", PurchaseOrder: "purchase_order"}
+
+_PENDING_KEY = "change_feed_pending"
+
+# (sequence, topics, encoded message)
+Entry = Tuple[int, List[str], str]
+
+
+def _json_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def change_topics(entity: str, values: dict) -> List[str]:
+    """Topics a change to an entity with these column values is published to"""
+    topics = [f"changes:{entity}"]
+    if values.get("location_id") is not None:
+        topics.append(f"location:{values['location_id']}")
+    if values.get("product_id") is not None:
+        topics.append(f"product:{values['product_id']}")
+    if entity == "stock_alert" and values.get("alert_type") is not None:
+        topics.append(f"alerts:{_json_value(values['alert_type'])}")
+    return topics
+
+def _collect_changes(session: Session) -> List[dict]:
+    """Changes for the tracked rows just flushed; only already-loaded values are read"""
+    changes = []
+
+    def add(obj, op, fields):
+        state = inspect(obj)
+        entity = TRACKED_ENTITIES[type(obj)]
+        changes.append({
+            "entity": entity,
+            "entity_id": state.dict.get("id"),
+            "op": op,
+            "fields": {key: _json_value(value) for key, value in fields.items()},
+            "topics": change_topics(entity, state.dict),
+        })
+
+    for obj in session.new:
+        if type(obj) in TRACKED_ENTITIES:
+            state = inspect(obj)
+            add(obj, "created", {
+                attr.key: state.dict[attr.key] for attr in state.mapper.column_attrs
+                if state.dict.get(attr.key) is not None
+            })
+
+    for obj in session.dirty:
+        if type(obj) in TRACKED_ENTITIES:
+            state = inspect(obj)
+            fields = {}
+            for attr in state.mapper.column_attrs:
+                added = state.attrs[attr.key].history.added
+                if added:
+                    fields[attr.key] = added[0]
+            if fields:
+                if state.mapper.version_id_col is not None:
+                    # Bumped by the mapper during the flush, so it has no history
+                    version_key = state.mapper.get_property_by_column(state.mapper.version_id_col).key
+                    fields[version_key] = state.dict.get(version_key)
+                add(obj, "updated", fields)
+
+    for obj in session.deleted:
+        if type(obj) in TRACKED_ENTITIES:
+            add(obj, "deleted", {})
+
+    return changes
+
+def updated_change(entity: str, entity_id: int, fields: dict, values: Optional[dict] = None) -> dict:
+    """A change for a row updated by a bulk statement; values supply its topic columns"""
+    return {
+        "entity": entity,
+        "entity_id": entity_id,
+        "op": "updated",
+        "fields": {key: _json_value(value) for key, value in fields.items()},
+        "topics": change_topics(entity, values or fields),
+    }
+
+def record_changes(session: Session, changes: List[dict]) -> None:
+    """Store changes in the session's transaction; they are published when it commits.
+
+    Use directly for bulk UPDATE/DELETE statements, which bypass the flush listener.
+    """
+    changes = [change for change in changes if change["entity_id"] is not None]
+    if not changes:
+        return
+    table = ChangeEvent.__table__
+    sequences = session.execute(
+        table.insert().returning(table.c.id, sort_by_parameter_order=True),
+        [
+            {
+                "entity": change["entity"],
+                "entity_id": change["entity_id"],
+                "op": change["op"],
+                "fields": dumps(change["fields"]),
+                "topics": dumps(change["topics"]),
+            }
+            for change in changes
+        ]
+    ).scalars().all()
+
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for sequence, change in zip(sequences, changes):
+        pending.append(_entry(sequence, change["entity"], change["entity_id"], change["op"],
+                              change["fields"], change["topics"]))
+
+def _entry(sequence: int, entity: str, entity_id: int, op: str, fields: dict, topics: List[str]) -> Entry:
+    message = dumps({
+        "type": "change",
+        "seq": sequence,
+        "entity": entity,
+        "id": entity_id,
+        "op": op,
+        "fields": fields,
+    })
+    return sequence, topics, message
+
+
+class ChangeFeed:
+    """Publishes committed changes and replays missed ones to resuming clients"""
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None, buffer_size: Optional[int] = None):
+        self.session_factory = session_factory
+        self.buffer: Deque[Entry] = deque(maxlen=buffer_size or settings.CHANGE_FEED_BUFFER_SIZE)
+        self.connections: Optional[ConnectionManager] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    async def start(self, connections: ConnectionManager):
+        self.connections = connections
+        self._loop = asyncio.get_running_loop()
+        connections.listeners.append(self._on_envelope)
+
+    async def stop(self):
+        if self.connections is not None and self._on_envelope in self.connections.listeners:
+            self.connections.listeners.remove(self._on_envelope)
+        self.connections = None
+        self._loop = None
+
+    def _remember(self, entry: Entry):
+        with self._lock:
+            self.buffer.append(entry)
+
+    def _on_envelope(self, envelope: dict):
+        """Buffer every change delivered to this worker, whichever worker published it"""
+        sequence = envelope.get("sequence")
+        if sequence is not None:
+            self._remember((sequence, envelope["topics"], envelope["message"]))
+
+    def emit(self, entries: List[Entry]):
+        """Publish committed changes; safe to call from any thread"""
+        loop, connections = self._loop, self.connections
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(lambda: loop.create_task(self._publish(connections, entries)))
+                return
+            except RuntimeError:
+                pass  # Loop already closed
+        # Not serving WebSockets: keep the buffer current for replay
+        for entry in entries:
+            self._remember(entry)
+
+    async def _publish(self, connections: ConnectionManager, entries: List[Entry]):
+        for sequence, topics, message in entries:
+            await connections.publish(topics, message, sequence=sequence)
+
+    def _buffered_since(self, since: int) -> Optional[List[Entry]]:
+        with self._lock:
+            entries = sorted(self.buffer)
+        if entries and entries[0][0] <= since + 1:
+            return [entry for entry in entries if entry[0] > since]
+        return None
+
+    def _load_since(self, since: int) -> Optional[List[Entry]]:
+        """Changes after since from the database; None if they cannot all be replayed"""
+        db = self.session_factory()
+        try:
+            oldest = db.query(func.min(ChangeEvent.id)).scalar()
+            if oldest is not None and since < oldest - 1:
+                return None  # Pruned
+            rows = db.query(ChangeEvent).filter(ChangeEvent.id > since).order_by(ChangeEvent.id).limit(
+                settings.CHANGE_FEED_MAX_REPLAY + 1
+            ).all()
+        finally:
+            db.close()
+        if len(rows) > settings.CHANGE_FEED_MAX_REPLAY:
+            return None
+        return [
+            _entry(row.id, row.entity, row.entity_id, row.op, loads(row.fields), loads(row.topics))
+            for row in rows
+        ]
+
+    def _head(self) -> int:
+        with self._lock:
+            if self.buffer:
+                return max(entry[0] for entry in self.buffer)
+        db = self.session_factory()
+        try:
+            return db.query(func.max(ChangeEvent.id)).scalar() or 0
+        finally:
+            db.close()
+
+    async def replay(self, since: int) -> Optional[List[Entry]]:
+        """Changes after sequence since, or None if the client must refetch"""
+        entries = self._buffered_since(since)
+        if entries is None:
+            entries = await asyncio.to_thread(self._load_since, since)
+        if entries is not None and len(entries) > settings.CHANGE_FEED_MAX_REPLAY:
+            return None
+        return entries
+
+    async def handle_client_message(self, websocket, request) -> bool:
+        """Answer a decoded resume request; False if it is not one"""
+        if not isinstance(request, dict) or request.get("action") != "resume":
+            return False
+
+        since = request.get("since")
+        if since is not None and (not isinstance(since, int) or since < 0):
+            self.connections.send_to(websocket, dumps({"type": "error", "detail": "since must be a sequence number"}))
+            return True
+
+        entries = None if since is None else await self.replay(since)
+        if entries is None:
+            head = await asyncio.to_thread(self._head)
+            reply_type = "resumed" if since is None else "reset"
+        else:
+            for sequence, topics, message in entries:
+                if self.connections.wants(websocket, topics):
+                    self.connections.send_to(websocket, message)
+            head = entries[-1][0] if entries else since
+            reply_type = "resumed"
+        self.connections.send_to(websocket, dumps({"type": reply_type, "sequence": head}))
+        return True
+
+
+change_feed = ChangeFeed(SessionLocal)
+
+
+def purge_change_events(engine: Engine) -> int:
+    """Delete changes older than the replay window"""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.CHANGE_FEED_RETENTION_HOURS)
+    with engine.begin() as conn:
+        result = conn.execute(ChangeEvent.__table__.delete().where(ChangeEvent.created_at < cutoff))
+    if result.rowcount:
+        logger.info(f"Purged {result.rowcount} change events")
+    return result.rowcount
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_changes(session, flush_context):
+    changes = _collect_changes(session)
+    if changes:
+        record_changes(session, changes)
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_changes(session):
+    entries = session.info.pop(_PENDING_KEY, None)
+    if entries:
+        change_feed.emit(entries)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
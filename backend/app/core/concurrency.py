@@ -0,0 +1,33 @@
+"""
+Optimistic concurrency for versioned rows.
+
+Inventory, PurchaseOrder and Product carry a SQLAlchemy ``version_id_col``: every UPDATE
+is issued as ``... WHERE id = :id AND version_id = :expected`` and bumps the version, so
+a write based on a stale read matches no row and fails with ``StaleDataError`` instead
+of silently overwriting. The version is surfaced to clients as a strong ETag and checked
+against ``If-Match`` before any change is applied.
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+
+
+def etag_for(obj) -> str:
+    """Strong ETag for a versioned row"""
+    return f'"{obj.version_id}"'
+
+def set_etag(response: Response, obj) -> None:
+    response.headers["ETag"] = etag_for(obj)
+
+def check_if_match(if_match: Optional[str], obj) -> None:
+    """Reject the request with 412 unless If-Match is absent, * or lists the current ETag"""
+    if if_match is None:
+        return
+    candidates = [tag.strip() for tag in if_match.split(",")]
+    if "*" in candidates or etag_for(obj) in candidates:
+        return
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Resource has been modified; reload it and retry",
+        headers={"ETag": etag_for(obj)},
+    )
@@ -36,6 +36,57 @@ class Settings(BaseSettings):
     # Logging
     LOG_LEVEL: str = "INFO"
     
+    # Stock movement ledger partitioning (PostgreSQL)
+    STOCK_MOVEMENT_PARTITION_MONTHS_AHEAD: int = 3
+    STOCK_MOVEMENT_RETENTION_MONTHS: int = 24
+    STOCK_MOVEMENT_ARCHIVE_DIR: str = "archive/stock_movements"
+    
+    # Stock reservations
+    RESERVATION_DEFAULT_TTL_SECONDS: int = 15 * 60
+    RESERVATION_MAX_TTL_SECONDS: int = 24 * 60 * 60
+    RESERVATION_SWEEP_INTERVAL_SECONDS: int = 5 * 60
+    
+    # PO numbers reserved per sequence call (hi/lo block size)
+    PO_NUMBER_BLOCK_SIZE: int = 50
+    
+    # Idempotency-Key replay window for stock writes
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    
+    # Password hashing: bcrypt cost, and a dedicated pool that rejects work beyond PASSWORD_HASH_MAX_PENDING with 503
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    
+    # Verified principals cached per bearer token; user writes invalidate this worker's entries
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    
+    # Seconds a computed dashboard summary is served before it is recomputed
+    DASHBOARD_CACHE_TTL_SECONDS: float = 5.0
+    
+    # Outbound messages buffered per WebSocket before a slow client is evicted
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 256
+    # Cross-worker WebSocket relay: "auto" (Postgres LISTEN/NOTIFY on PostgreSQL), "postgres" or "memory"
+    WEBSOCKET_BACKPLANE: str = "auto"
+    WEBSOCKET_BACKPLANE_CHANNEL: str = "websocket_messages"
+    # Server heartbeats: a ping every interval; connections silent for the idle timeout are closed
+    WEBSOCKET_HEARTBEAT_INTERVAL_SECONDS: float = 30.0
+    WEBSOCKET_IDLE_TIMEOUT_SECONDS: float = 75.0
+    # Offer permessage-deflate to WebSocket clients (passed to uvicorn)
+    WEBSOCKET_PER_MESSAGE_DEFLATE: bool = True
+    
+    # Change stream: recent changes kept in memory per worker, older ones replayed from the database
+    CHANGE_FEED_BUFFER_SIZE: int = 10000
+    CHANGE_FEED_MAX_REPLAY: int = 5000  # Larger gaps get a "reset" and the client refetches
+    CHANGE_FEED_RETENTION_HOURS: int = 72
+    
+    # Replenishment planning
+    REORDER_DEMAND_WINDOW_DAYS: int = 90  # Stock-out history used for the demand rate
+    REORDER_DEFAULT_LEAD_TIME_DAYS: float = 14.0  # For suppliers without received orders
+    REORDER_REVIEW_PERIOD_DAYS: float = 30.0  # Demand covered above the reorder level when max_stock_level is unset
+    REORDER_SERVICE_LEVEL_Z: float = 1.65  # Safety stock in standard deviations of lead-time demand (~95%)
+    REPLENISHMENT_JOB_INTERVAL_HOURS: float = 24.0  # Scheduled drafting of suggested purchase orders; 0 disables it
+    
     @validator("BACKEND_CORS_ORIGINS", pre=True)
     def assemble_cors_origins(cls, v):
         if isinstance(v, str) and not v.startswith("["):
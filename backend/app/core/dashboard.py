@@ -0,0 +1,146 @@
+"""
+Dashboard KPIs computed in a handful of aggregate queries and cached briefly.
+
+The summary replaces the dashboard's per-entity list fetches: entity counts come from
+one query of scalar subqueries, and the stock, purchase order and alert breakdowns
+from one GROUP BY each. Results are cached per process for
+DASHBOARD_CACHE_TTL_SECONDS, keyed by the caller's purchase order scope. A commit that
+wrote any table the summary reads clears this process's cache; other workers
+converge within the TTL.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.category import Category
+from app.models.inventory import Inventory, StockStatus
+from app.models.location import Location
+from app.models.product import Product
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderStatus
+from app.models.stock_alert import StockAlert, AlertStatus, AlertType
+from app.models.supplier import Supplier
+from app.schemas.dashboard import DashboardCounts, DashboardSummary
+
+TRACKED_MODELS = (Product, Category, Inventory, Supplier, Location, PurchaseOrder, StockAlert)
+TRACKED_TABLES = frozenset(model.__tablename__ for model in TRACKED_MODELS)
+
+_DIRTY_KEY = "dashboard_cache_dirty"
+
+
+class SummaryCache:
+    """Thread-safe TTL cache of computed summaries"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = settings.DASHBOARD_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}  # key -> (expiry on the monotonic clock, value)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+summary_cache = SummaryCache()
+
+
+def _zero_filled(enum_type, rows) -> Dict[str, int]:
+    counts = {member.value: 0 for member in enum_type}
+    for member, count in rows:
+        if member is not None:
+            counts[member.value] = count
+    return counts
+
+def build_dashboard_summary(db: Session, created_by: Optional[int] = None) -> DashboardSummary:
+    """Compute the summary; purchase orders are limited to created_by when given"""
+    po_filter = (PurchaseOrder.created_by == created_by,) if created_by is not None else ()
+
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+    counts = db.execute(select(
+        count(Product).label("products"),
+        count(Category).label("categories"),
+        count(Supplier).label("suppliers"),
+        count(Location).label("locations"),
+    )).one()
+
+    stock_rows = db.query(
+        Inventory.stock_status,
+        func.count(),
+        func.coalesce(func.sum(Inventory.fifo_value), 0.0),
+        func.coalesce(func.sum(Inventory.quantity * Inventory.average_unit_cost), 0.0),
+    ).group_by(Inventory.stock_status).all()
+
+    po_rows = db.query(PurchaseOrder.status, func.count()).filter(*po_filter).group_by(PurchaseOrder.status).all()
+
+    alert_rows = db.query(StockAlert.alert_type, func.count()).filter(
+        StockAlert.status == AlertStatus.ACTIVE
+    ).group_by(StockAlert.alert_type).all()
+
+    return DashboardSummary(
+        counts=DashboardCounts(
+            **counts._asdict(),
+            inventory_items=sum(row[1] for row in stock_rows),
+            purchase_orders=sum(row[1] for row in po_rows),
+            active_alerts=sum(row[1] for row in alert_rows),
+        ),
+        stock_status=_zero_filled(StockStatus, ((row[0], row[1]) for row in stock_rows)),
+        purchase_order_status=_zero_filled(PurchaseOrderStatus, po_rows),
+        active_alerts_by_type=_zero_filled(AlertType, alert_rows),
+        inventory_value=sum(row[2] for row in stock_rows),
+        inventory_average_cost_value=sum(row[3] for row in stock_rows),
+        generated_at=datetime.utcnow(),
+    )
+
+def get_dashboard_summary(db: Session, created_by: Optional[int] = None) -> DashboardSummary:
+    """Cached summary for the given purchase order scope"""
+    summary = summary_cache.get(created_by)
+    if summary is None:
+        summary = build_dashboard_summary(db, created_by)
+        summary_cache.set(created_by, summary)
+    return summary
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_dashboard_writes(session, flush_context):
+    if _DIRTY_KEY in session.info:
+        return
+    if any(isinstance(obj, TRACKED_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_DIRTY_KEY] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dashboard_statements(orm_execute_state):
+    """Catch bulk INSERT/UPDATE/DELETE statements that bypass the unit of work"""
+    if orm_execute_state.is_select:
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in TRACKED_TABLES:
+        orm_execute_state.session.info[_DIRTY_KEY] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dashboard_cache(session):
+    if session.info.pop(_DIRTY_KEY, False):
+        summary_cache.clear()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dashboard_writes(session):
+    session.info.pop(_DIRTY_KEY, None)
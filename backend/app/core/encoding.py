@@ -0,0 +1,42 @@
+"""
+Wire encoders for WebSocket and backplane messages.
+
+``dumps``/``loads`` use orjson when it is installed and fall back to the standard
+library otherwise; the output is the same compact JSON either way. ``packb``/``unpackb``
+encode and decode MessagePack for clients that negotiate binary frames and are only
+available when msgpack is installed (``MSGPACK_AVAILABLE``).
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional: binary frames are not offered without it
+    msgpack = None
+
+MSGPACK_AVAILABLE = msgpack is not None
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON text"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+def loads(data: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def packb(obj: Any) -> bytes:
+    """MessagePack bytes; requires msgpack"""
+    return msgpack.packb(obj)
+
+def unpackb(data: bytes) -> Any:
+    """Decode MessagePack bytes; requires msgpack"""
+    return msgpack.unpackb(data)
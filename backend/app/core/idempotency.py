@@ -0,0 +1,127 @@
+"""
+Idempotency-Key support for retry-safe stock writes.
+
+A client sends a unique ``Idempotency-Key`` header with a write. The response is stored
+with the key in the same transaction as the stock change, so a retry either finds the
+committed result and replays it or runs the write for the first time -- never twice.
+Two concurrent requests with the same key race on the (user_id, key) unique constraint:
+the loser rolls back its changes and replays the winner's response. Keys are scoped per
+user, bound to a hash of the request, and kept for IDEMPOTENCY_KEY_TTL_HOURS.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from fastapi import Depends, Header, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import get_current_active_user
+from app.models.idempotency_key import IdempotencyKey
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotentRequest:
+    """Replay or record the outcome of one write request"""
+
+    def __init__(self, db: Session, key: Optional[str], user_id: int, request_hash: str):
+        self.db = db
+        self.key = key
+        self.user_id = user_id
+        self.request_hash = request_hash
+
+    def replay(self) -> Optional[JSONResponse]:
+        """Stored response for this key, or None if the request should run"""
+        if self.key is None:
+            return None
+
+        # An expired key no longer protects anything; clear it so the key can be reused
+        self.db.query(IdempotencyKey).filter(
+            IdempotencyKey.user_id == self.user_id,
+            IdempotencyKey.key == self.key,
+            IdempotencyKey.expires_at <= datetime.now(timezone.utc)
+        ).delete(synchronize_session=False)
+
+        record = self.db.query(IdempotencyKey).filter(
+            IdempotencyKey.user_id == self.user_id,
+            IdempotencyKey.key == self.key
+        ).first()
+        if record is None:
+            return None
+
+        if record.request_hash != self.request_hash:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key has already been used for a different request"
+            )
+        return JSONResponse(
+            status_code=record.status_code,
+            content=json.loads(record.response_body),
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    def save(self, body: Any, status_code: int = 200) -> None:
+        """Record the response in the current transaction"""
+        if self.key is None:
+            return
+        self.db.add(IdempotencyKey(
+            key=self.key,
+            user_id=self.user_id,
+            request_hash=self.request_hash,
+            status_code=status_code,
+            response_body=json.dumps(jsonable_encoder(body)),
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+        ))
+
+    def commit(self) -> Optional[JSONResponse]:
+        """Commit the write, or roll it back and return the response of a concurrent duplicate"""
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            if self.key is None:
+                raise
+            replayed = self.replay()
+            if replayed is None:
+                raise
+            return replayed
+        return None
+
+
+async def get_idempotent_request(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> IdempotentRequest:
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+        )
+
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.url.path}?{request.url.query}\n".encode())
+    digest.update(await request.body())
+    return IdempotentRequest(db, idempotency_key, current_user.id, digest.hexdigest())
+
+def purge_expired_keys(engine: Engine) -> int:
+    """Delete keys past their replay window"""
+    with engine.begin() as conn:
+        result = conn.execute(
+            IdempotencyKey.__table__.delete().where(IdempotencyKey.expires_at <= datetime.now(timezone.utc))
+        )
+    if result.rowcount:
+        logger.info(f"Purged {result.rowcount} expired idempotency keys")
+    return result.rowcount
@@ -0,0 +1,96 @@
+"""
+Periodic database maintenance and scheduled jobs.
+
+Each job is a blocking function run in a worker thread on its own asyncio task and
+interval, so one slow or failing job neither delays nor skips the others. Jobs first run
+STARTUP_DELAY_SECONDS after start so they stay off the startup path; a failure is logged
+and the job retries at its next interval. Started with the app independently of the
+stock alert checks in ``background_tasks``.
+"""
+import asyncio
+import logging
+from typing import Callable, List, NamedTuple, Optional
+
+from app.core.change_feed import purge_change_events
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.idempotency import purge_expired_keys
+from app.core.partitions import run_partition_maintenance
+from app.core.refresh_tokens import purge_expired_refresh_tokens
+from app.core.replenishment import run_replenishment_job
+
+logger = logging.getLogger(__name__)
+
+STARTUP_DELAY_SECONDS = 60
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+
+class MaintenanceJob(NamedTuple):
+    name: str
+    run: Callable[[], object]
+    interval_seconds: float
+
+
+class MaintenanceScheduler:
+    """Runs registered jobs on fixed intervals, one task per job"""
+
+    def __init__(self, startup_delay: float = STARTUP_DELAY_SECONDS):
+        self.startup_delay = startup_delay
+        self.jobs: List[MaintenanceJob] = []
+        self.is_running = False
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, run: Callable[[], object], interval_seconds: float) -> None:
+        self.jobs.append(MaintenanceJob(name, run, interval_seconds))
+
+    async def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        self._tasks = [asyncio.create_task(self._run(job)) for job in self.jobs]
+        logger.info(f"Maintenance scheduler started: {', '.join(job.name for job in self.jobs)}")
+
+    async def stop(self):
+        self.is_running = False
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        logger.info("Maintenance scheduler stopped")
+
+    async def _run(self, job: MaintenanceJob):
+        await asyncio.sleep(self.startup_delay)
+        while self.is_running:
+            await self.run_job(job)
+            await asyncio.sleep(job.interval_seconds)
+
+    async def run_job(self, job: MaintenanceJob) -> Optional[object]:
+        """Run one job now in a worker thread; errors are logged, not raised"""
+        try:
+            return await asyncio.to_thread(job.run)
+        except Exception as e:
+            logger.error(f"Maintenance job {job.name} failed: {e}")
+            return None
+
+
+def _partition_maintenance():
+    result = run_partition_maintenance(engine)
+    if result["created"] or result["archived"]:
+        logger.info(f"Partition maintenance: {len(result['created'])} created, {len(result['archived'])} archived")
+    return result
+
+
+maintenance_scheduler = MaintenanceScheduler()
+maintenance_scheduler.add_job("stock movement partitions", _partition_maintenance, DAY)
+maintenance_scheduler.add_job("idempotency key purge", lambda: purge_expired_keys(engine), HOUR)
+maintenance_scheduler.add_job("change event purge", lambda: purge_change_events(engine), HOUR)
+maintenance_scheduler.add_job("refresh token purge", lambda: purge_expired_refresh_tokens(engine), HOUR)
+if settings.REPLENISHMENT_JOB_INTERVAL_HOURS > 0:
+    maintenance_scheduler.add_job(
+        "replenishment drafts", lambda: run_replenishment_job(SessionLocal), settings.REPLENISHMENT_JOB_INTERVAL_HOURS * HOUR
+    )
@@ -0,0 +1,167 @@
+"""
+Monthly range partition maintenance for the stock_movements ledger (PostgreSQL).
+
+The ledger is partitioned on ``created_at`` by migration ``e1b7d94c3a58``. This module
+keeps partitions created ahead of time and moves partitions past the retention window
+out of the hot table: they are exported to a gzip-compressed CSV, then detached and
+dropped in one transaction. Rows that reached the DEFAULT partition because their month
+had no partition yet are moved into the new partition when it is created. On other
+databases (SQLite in tests) every function is a no-op.
+"""
+import gzip
+import logging
+import os
+import re
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "stock_movements"
+DEFAULT_PARTITION = "stock_movements_default"
+PARTITION_NAME_RE = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def _add_months(month_start: date, months: int) -> date:
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month_start: date) -> str:
+    return f"{PARENT_TABLE}_p{month_start.year:04d}_{month_start.month:02d}"
+
+def is_partitioned(engine: Engine) -> bool:
+    """Whether stock_movements is a partitioned table on this database"""
+    if engine.dialect.name != "postgresql":
+        return False
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :name)"
+        ), {"name": PARENT_TABLE}).scalar()
+
+def list_partitions(engine: Engine) -> List[str]:
+    """Names of the attached monthly partitions, oldest first"""
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name ORDER BY c.relname"
+        ), {"name": PARENT_TABLE}).scalars().all()
+    return [name for name in rows if PARTITION_NAME_RE.match(name)]
+
+def _is_attached(conn, name: str) -> bool:
+    return conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :parent AND c.relname = :name)"
+    ), {"parent": PARENT_TABLE, "name": name}).scalar()
+
+def _create_partition(conn, name: str, start: date, end: date) -> int:
+    """Create one monthly partition, moving rows for its range out of the DEFAULT partition.
+
+    PostgreSQL refuses to create a partition while the default partition holds rows for
+    its range, so the default is detached for the move and reattached afterwards. Returns
+    the number of rows moved.
+    """
+    bounds = {"start": start, "end": end}
+    has_default = _is_attached(conn, DEFAULT_PARTITION)
+    stranded = has_default and conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end)"
+    ), bounds).scalar()
+
+    if stranded:
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT_TABLE} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    if not stranded:
+        return 0
+
+    moved = conn.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end RETURNING *) "
+        f"INSERT INTO {PARENT_TABLE} SELECT * FROM moved"
+    ), bounds).rowcount
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return moved
+
+def ensure_future_partitions(engine: Engine, months_ahead: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    """Create the current month's partition and the next months_ahead, returning the ones created"""
+    if not is_partitioned(engine):
+        return []
+
+    months_ahead = settings.STOCK_MOVEMENT_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = (today or date.today()).replace(day=1)
+    existing = set(list_partitions(engine))
+    created = []
+
+    for offset in range(months_ahead + 1):
+        start = _add_months(current, offset)
+        name = partition_name(start)
+        if name in existing:
+            continue
+        # One transaction per month so the default partition is only detached briefly
+        with engine.begin() as conn:
+            moved = _create_partition(conn, name, start, _add_months(start, 1))
+        if moved:
+            logger.warning(f"Moved {moved} stock movements from {DEFAULT_PARTITION} into {name}")
+        created.append(name)
+
+    if created:
+        logger.info(f"Created stock movement partitions: {', '.join(created)}")
+    return created
+
+def expired_partitions(engine: Engine, retention_months: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    """Attached partitions that end before the retention window"""
+    if not is_partitioned(engine):
+        return []
+
+    retention_months = settings.STOCK_MOVEMENT_RETENTION_MONTHS if retention_months is None else retention_months
+    cutoff = _add_months((today or date.today()).replace(day=1), -retention_months)
+    expired = []
+
+    for name in list_partitions(engine):
+        year, month = (int(part) for part in PARTITION_NAME_RE.match(name).groups())
+        if _add_months(date(year, month, 1), 1) <= cutoff:
+            expired.append(name)
+    return expired
+
+def archive_partition(engine: Engine, name: str, archive_dir: Optional[str] = None) -> str:
+    """Export a partition to <archive_dir>/<name>.csv.gz, then detach (if attached) and drop it.
+
+    Export, detach and drop share one transaction: if the export fails the partition stays
+    attached and queryable.
+    """
+    if not PARTITION_NAME_RE.match(name):
+        raise ValueError(f"Not a stock movement partition: {name}")
+
+    archive_dir = archive_dir or settings.STOCK_MOVEMENT_ARCHIVE_DIR
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+
+    with engine.begin() as conn:
+        cursor = conn.connection.cursor()
+        try:
+            with gzip.open(path, "wb") as archive:
+                cursor.copy_expert(f'COPY "{name}" TO STDOUT WITH (FORMAT csv, HEADER true)', archive)
+        finally:
+            cursor.close()
+        if _is_attached(conn, name):
+            conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+        conn.execute(text(f'DROP TABLE "{name}"'))
+
+    logger.info(f"Archived stock movement partition {name} to {path}")
+    return path
+
+def run_partition_maintenance(engine: Engine, today: Optional[date] = None) -> dict:
+    """Create upcoming partitions, then archive expired ones"""
+    created = ensure_future_partitions(engine, today=today)
+    archived = [archive_partition(engine, name) for name in expired_partitions(engine, today=today)]
+    return {"created": created, "archived": archived}
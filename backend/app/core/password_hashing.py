@@ -0,0 +1,73 @@
+"""
+Bounded executor for bcrypt.
+
+Hashing and verifying passwords is deliberately slow CPU work. It runs on a dedicated
+pool of PASSWORD_HASH_WORKERS threads instead of in the request threadpool, and at
+most PASSWORD_HASH_MAX_PENDING operations may be running or queued at once. Beyond that
+callers get 503 with Retry-After immediately rather than queueing, so a burst of logins
+occupies a bounded number of request threads and CPU cores while stock requests keep
+flowing. Cost is BCRYPT_ROUNDS; hashes made at another cost report ``needs_rehash``
+and are upgraded at the next successful login.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+RETRY_AFTER_SECONDS = 1
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    # Hashes at any other cost need an update, so raising or lowering the cost migrates users on login
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasher:
+    """Runs password hashing on its own threads with a cap on outstanding work"""
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_pending = max_pending or settings.PASSWORD_HASH_MAX_PENDING
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self.rejected = 0
+
+    def run(self, fn: Callable[..., T], *args) -> T:
+        """Run fn on the hashing pool and wait for it; 503 if the pool is saturated"""
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy; retry shortly",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password: str) -> str:
+        return self.run(pwd_context.hash, password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self.run(pwd_context.verify, password, hashed_password)
+
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        return pwd_context.needs_update(hashed_password)
+
+
+password_hasher = PasswordHasher()
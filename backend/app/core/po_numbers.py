@@ -0,0 +1,105 @@
+"""
+Purchase order number allocation.
+
+Numbers look like ``PO2026000123``: prefix, year, and a six digit counter that restarts
+every year. Each year has its own counter, so the reset needs no coordination. On
+PostgreSQL the counter is a sequence (``po_number_seq_<year>``) created on first use
+with ``INCREMENT BY`` the block size; elsewhere it is a row in ``po_number_counters``.
+
+On PostgreSQL allocation is hi/lo: one ``nextval`` reserves a block of numbers that this
+process then hands out from memory, so most POs are numbered without a round trip.
+Numbers are unique and increase within a process; numbers left in a block when a process
+exits are skipped. The counter table (SQLite) is transactional and allocates one number
+at a time.
+"""
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select, text, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderNumberCounter
+
+PREFIX = "PO"
+DIGITS = 6
+
+
+def format_po_number(year: int, number: int) -> str:
+    return f"{PREFIX}{year}{number:0{DIGITS}d}"
+
+def _sequence_name(year: int) -> str:
+    return f"po_number_seq_{year}"
+
+def _highest_issued(conn, year: int) -> int:
+    """Largest counter already used for year, including numeric legacy numbers"""
+    pattern = re.compile(rf"^{PREFIX}{year}(\d{{{DIGITS}}})$")
+    numbers = conn.execute(
+        select(PurchaseOrder.po_number).where(PurchaseOrder.po_number.like(f"{PREFIX}{year}%"))
+    ).scalars()
+    return max((int(match.group(1)) for po_number in numbers if (match := pattern.match(po_number))), default=0)
+
+
+class PONumberAllocator:
+    """Per-process hi/lo allocator over per-year database counters"""
+
+    def __init__(self, block_size: Optional[int] = None):
+        self.block_size = block_size or settings.PO_NUMBER_BLOCK_SIZE
+        self._lock = threading.Lock()
+        self._blocks: Dict[int, Tuple[int, int]] = {}  # year -> (next number, end of block)
+        self._sequence_steps: Dict[int, int] = {}  # year -> INCREMENT BY of an existing sequence
+
+    def next_number(self, db: Session, year: Optional[int] = None) -> str:
+        year = year or datetime.now().year
+        with self._lock:
+            next_number, end = self._blocks.get(year, (0, 0))
+            if next_number >= end:
+                next_number, end = self._reserve_block(db, year)
+            self._blocks[year] = (next_number + 1, end)
+        return format_po_number(year, next_number)
+
+    def _reserve_block(self, db: Session, year: int) -> Tuple[int, int]:
+        if db.get_bind().dialect.name == "postgresql":
+            return self._reserve_from_sequence(db, year)
+        return self._reserve_from_counter(db, year)
+
+    def _sequence_step(self, db: Session, year: int) -> int:
+        """INCREMENT BY of the year's sequence, creating it on first use"""
+        name = _sequence_name(year)
+        lookup = text("SELECT increment_by FROM pg_sequences WHERE sequencename = :name")
+        # Created outside the caller's transaction so a rollback cannot drop a sequence
+        # whose values this process has already cached
+        with db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            step = conn.execute(lookup, {"name": name}).scalar()
+            if step is None:
+                start = _highest_issued(conn, year) + 1
+                conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {name} START WITH {start} INCREMENT BY {self.block_size}"))
+                # Another process may have created it first with a different step
+                step = conn.execute(lookup, {"name": name}).scalar()
+        return step
+
+    def _reserve_from_sequence(self, db: Session, year: int) -> Tuple[int, int]:
+        if year not in self._sequence_steps:
+            self._sequence_steps[year] = self._sequence_step(db, year)
+        step = self._sequence_steps[year]
+
+        # nextval is not rolled back with the caller's transaction, so blocks are never reissued
+        start = db.execute(text(f"SELECT nextval('{_sequence_name(year)}')")).scalar()
+        return start, start + step
+
+    def _reserve_from_counter(self, db: Session, year: int) -> Tuple[int, int]:
+        # The counter row is written in the caller's transaction, so a rollback returns the
+        # number; prefetching a block here could hand out numbers another process reuses.
+        table = PurchaseOrderNumberCounter.__table__
+        result = db.execute(
+            update(table).where(table.c.year == year).values(last_value=table.c.last_value + 1)
+        )
+        if result.rowcount == 0:
+            db.execute(table.insert().values(year=year, last_value=_highest_issued(db, year) + 1))
+        last_value = db.execute(select(table.c.last_value).where(table.c.year == year)).scalar()
+        return last_value, last_value + 1
+
+
+po_number_allocator = PONumberAllocator()
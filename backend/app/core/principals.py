@@ -0,0 +1,131 @@
+"""
+Cache of verified principals for authenticated requests.
+
+``get_current_user`` decodes the bearer token and loads the user once, then serves
+repeat requests with the same token from an in-process TTL+LRU cache keyed by the
+token's SHA-256. A ``Principal`` carries what authorization needs -- id, username,
+role, active flag and a precomputed permission set -- and is safe to share between
+requests; endpoints that need the full row load it by id. Entries expire after
+PRINCIPAL_CACHE_TTL_SECONDS or at the token's own expiry, whichever is first. A commit
+that writes a user drops that user's entries in this process; other workers converge
+within the TTL.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import ROLE_PERMISSIONS, User
+
+_CHANGED_USERS_KEY = "principal_cache_changed_users"
+
+
+class Principal:
+    """Authorization view of a user"""
+    __slots__ = ("id", "username", "email", "role", "is_active", "is_superuser", "permissions")
+
+    def __init__(self, user: User):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.role = user.role
+        self.is_active = user.is_active
+        self.is_superuser = user.is_superuser
+        self.permissions = frozenset(ROLE_PERMISSIONS.get(user.role, ()))
+
+    def has_permission(self, permission: str) -> bool:
+        return permission in self.permissions
+
+    # Role checks are shared with the model
+    can_approve_po = User.can_approve_po
+    can_cancel_po = User.can_cancel_po
+    can_receive_po = User.can_receive_po
+    can_edit_po = User.can_edit_po
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class PrincipalCache:
+    """Thread-safe TTL+LRU cache of principals by token key, with per-user invalidation"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_size: Optional[int] = None):
+        self.ttl_seconds = settings.PRINCIPAL_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_size = max_size or settings.PRINCIPAL_CACHE_MAX_SIZE
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()  # key -> (expiry on the monotonic clock, principal)
+        self._keys_by_user: Dict[int, Set[str]] = {}
+
+    def get(self, key: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, principal: Principal, token_expires_at: Optional[float] = None) -> None:
+        """Cache principal until the TTL or token_expires_at (a Unix timestamp) passes"""
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, principal)
+            self._keys_by_user.setdefault(principal.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        _, principal = self._entries.pop(key)
+        keys = self._keys_by_user.get(principal.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[principal.id]
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            user_id = inspect(obj).dict.get("id")
+            if user_id is not None:
+                session.info.setdefault(_CHANGED_USERS_KEY, set()).add(user_id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop(_CHANGED_USERS_KEY, ()):
+        principal_cache.invalidate_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop(_CHANGED_USERS_KEY, None)
@@ -0,0 +1,123 @@
+"""
+Set-based receiving of purchase order lines into inventory.
+
+A receiving session may cover any number of lines across several purchase orders
+delivered to one location. All lines of the affected orders are fetched and locked in
+one query, all target inventory rows in a second; quantities, cost layers and order
+statuses are then applied in memory and written by a single flush, after which the
+stock movements are bulk inserted with the inventory ids that flush assigned.
+"""
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.valuation import post_receipt
+from app.models.inventory import Inventory, StockMovement, StockMovementType
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem, PurchaseOrderStatus
+from app.models.user import User
+
+NOT_RECEIVABLE = (PurchaseOrderStatus.DRAFT, PurchaseOrderStatus.PENDING_APPROVAL, PurchaseOrderStatus.CANCELLED)
+
+
+def receive_lines(db: Session, location_id: int, lines: Sequence, received_by: User) -> List[PurchaseOrder]:
+    """Receive lines given as objects with purchase_order_id, item_id and received_quantity.
+
+    Returns the affected purchase orders; the caller commits.
+    """
+    po_ids = {line.purchase_order_id for line in lines}
+    if not po_ids:
+        return []
+
+    po_items = db.query(PurchaseOrderItem).options(
+        joinedload(PurchaseOrderItem.purchase_order),
+        joinedload(PurchaseOrderItem.product)
+    ).filter(
+        PurchaseOrderItem.purchase_order_id.in_(po_ids)
+    ).with_for_update(of=PurchaseOrderItem).all()
+
+    items_by_id = {item.id: item for item in po_items}
+    purchase_orders: Dict[int, PurchaseOrder] = {item.purchase_order_id: item.purchase_order for item in po_items}
+
+    # Total the quantity per line, so a line scanned twice is checked against its sum
+    quantities: Dict[int, int] = {}
+    for line in lines:
+        po_item = items_by_id.get(line.item_id)
+        if po_item is None or po_item.purchase_order_id != line.purchase_order_id:
+            raise HTTPException(status_code=404, detail=f"Purchase order item {line.item_id} not found")
+        if line.received_quantity > 0:
+            quantities[line.item_id] = quantities.get(line.item_id, 0) + line.received_quantity
+
+    for po in purchase_orders.values():
+        if po.status in NOT_RECEIVABLE:
+            raise HTTPException(status_code=400, detail=f"Cannot receive items from purchase order {po.po_number} in status {po.status.value}")
+
+    for item_id, quantity in quantities.items():
+        po_item = items_by_id[item_id]
+        if (po_item.received_quantity or 0) + quantity > po_item.quantity:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot receive more than ordered quantity for item {item_id}"
+            )
+
+    product_ids = {items_by_id[item_id].product_id for item_id in quantities}
+    inventory_by_product = {
+        inventory_item.product_id: inventory_item
+        for inventory_item in db.query(Inventory).filter(
+            Inventory.location_id == location_id,
+            Inventory.product_id.in_(product_ids)
+        ).with_for_update()
+    } if product_ids else {}
+
+    now = datetime.now()
+    receipts = []
+    for item_id, quantity in quantities.items():
+        po_item = items_by_id[item_id]
+        inventory_item = inventory_by_product.get(po_item.product_id)
+        if inventory_item is None:
+            inventory_item = Inventory(
+                product=po_item.product,
+                location_id=location_id,
+                quantity=0,
+                reserved_quantity=0,
+                unit_cost=po_item.unit_price
+            )
+            db.add(inventory_item)
+            inventory_by_product[po_item.product_id] = inventory_item
+
+        po_item.received_quantity = (po_item.received_quantity or 0) + quantity
+        post_receipt(db, inventory_item, quantity, po_item.unit_price,
+                     reference_type="purchase_order", reference_id=po_item.purchase_order_id)
+        inventory_item.last_restocked = now
+        receipts.append((po_item, inventory_item, quantity))
+
+    outstanding = {item.purchase_order_id for item in po_items if (item.received_quantity or 0) < item.quantity}
+    for po_id, po in purchase_orders.items():
+        if po_id not in outstanding:
+            po.status = PurchaseOrderStatus.RECEIVED
+            po.delivery_date = now.date()
+        else:
+            po.status = PurchaseOrderStatus.PARTIALLY_RECEIVED
+
+    # One flush assigns ids to new inventory rows before movements reference them
+    db.flush()
+
+    if receipts:
+        db.execute(insert(StockMovement), [
+            {
+                "inventory_item_id": inventory_item.id,
+                "movement_type": StockMovementType.IN,
+                "quantity": quantity,
+                "to_location_id": location_id,
+                "reference_type": "purchase_order",
+                "reference_id": po_item.purchase_order_id,
+                "unit_cost": po_item.unit_price,
+                "notes": f"Received from PO {po_item.purchase_order.po_number} by {received_by.username}",
+                "created_by": received_by.id,
+            }
+            for po_item, inventory_item, quantity in receipts
+        ])
+
+    return list(purchase_orders.values())
@@ -0,0 +1,103 @@
+"""
+Refresh tokens with rotation and reuse detection.
+
+Login issues a short-lived access token plus an opaque refresh token valid for
+REFRESH_TOKEN_EXPIRE_DAYS. ``/auth/refresh`` exchanges a refresh token for a new pair
+without touching the password hasher: the token is looked up by its SHA-256, marked
+revoked and replaced by a new token in the same family. Presenting a token that was
+already rotated means it was copied, so the whole family is revoked and both holders
+must log in again. Only hashes are stored, one small row per issued token; rows are
+kept until they expire so reuse stays detectable, then purged by maintenance.
+"""
+import hashlib
+import logging
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def issue_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """Add a new refresh token to the session, starting a family unless one is given"""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=_hash(token),
+        family_id=family_id or secrets.token_hex(16),
+        user_id=user_id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[User, str]:
+    """Revoke token and issue its successor; returns the user and the new token. Commits."""
+    # Expiry is compared in SQL: timestamptz values come back aware on PostgreSQL but naive on SQLite
+    record = db.query(RefreshToken).filter(
+        RefreshToken.token_hash == _hash(token),
+        RefreshToken.expires_at > datetime.now(timezone.utc)
+    ).with_for_update().first()
+    if record is None:
+        raise _invalid_refresh_token()
+
+    if record.revoked_at is not None:
+        revoked = revoke_family(db, record.family_id)
+        db.commit()
+        logger.warning(f"Refresh token reuse for user {record.user_id}; revoked {revoked} tokens in its family")
+        raise _invalid_refresh_token()
+
+    user = db.query(User).filter(User.id == record.user_id).first()
+    if user is None or not user.is_active:
+        raise _invalid_refresh_token()
+
+    record.revoked_at = datetime.now(timezone.utc)
+    new_token = issue_refresh_token(db, user.id, record.family_id)
+    db.commit()
+    return user, new_token
+
+def revoke_family(db: Session, family_id: str) -> int:
+    """Revoke every live token of one login"""
+    return db.query(RefreshToken).filter(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.now(timezone.utc)}, synchronize_session=False)
+
+def revoke_refresh_token(db: Session, token: str) -> None:
+    """Log out the login that token belongs to; unknown tokens are ignored"""
+    record = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash(token)).first()
+    if record is not None:
+        revoke_family(db, record.family_id)
+
+def revoke_user_tokens(db: Session, user_id: int) -> int:
+    """Revoke every live token of a user, e.g. after a password change"""
+    return db.query(RefreshToken).filter(
+        RefreshToken.user_id == user_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.now(timezone.utc)}, synchronize_session=False)
+
+def purge_expired_refresh_tokens(engine: Engine) -> int:
+    """Delete tokens past their expiry; revoked ones are kept until then for reuse detection"""
+    with engine.begin() as conn:
+        result = conn.execute(
+            RefreshToken.__table__.delete().where(RefreshToken.expires_at <= datetime.now(timezone.utc))
+        )
+    if result.rowcount:
+        logger.info(f"Purged {result.rowcount} expired refresh tokens")
+    return result.rowcount
@@ -0,0 +1,241 @@
+"""
+Reorder suggestions computed from stock-out history in one vectorized pass.
+
+Planning runs a fixed number of queries regardless of catalog size: active products
+with a supplier, available stock from ``product_stock_summary``, open purchase order
+quantities, daily stock-out totals over REORDER_DEMAND_WINDOW_DAYS, and lead times of
+received orders. Each result is loaded into NumPy arrays aligned on product id, and
+per-SKU demand rate, demand variability, reorder level and order quantity are computed
+with array operations.
+
+For each SKU, with ``d`` the daily demand rate, ``sigma`` its daily standard deviation
+and ``L`` the supplier's mean lead time in days:
+
+- reorder level = max(reorder_point, min_stock_level, d * L + z * sigma * sqrt(L))
+- target level = max_stock_level, or reorder level + d * REORDER_REVIEW_PERIOD_DAYS
+- a SKU is suggested when available + on order <= reorder level, for the quantity
+  that brings it up to the target level.
+
+Quantities on open purchase orders, drafts included, count as on order, so running
+the plan again does not propose the same stock twice.
+"""
+import logging
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional
+
+import numpy as np
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.po_numbers import po_number_allocator
+from app.models.inventory import Inventory, StockMovement, StockMovementType
+from app.models.product import Product
+from app.models.product_stock_summary import ProductStockSummary
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem, PurchaseOrderStatus
+from app.models.supplier import Supplier
+from app.models.user import User, UserRole
+from app.schemas.replenishment import ReorderPlan, ReorderSuggestionLine, SupplierReorderSuggestion
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = (
+    PurchaseOrderStatus.DRAFT,
+    PurchaseOrderStatus.PENDING_APPROVAL,
+    PurchaseOrderStatus.APPROVED,
+    PurchaseOrderStatus.ORDERED,
+    PurchaseOrderStatus.PARTIALLY_RECEIVED,
+)
+LEAD_TIME_HISTORY_DAYS = 365
+
+
+def _align(ids: np.ndarray, keys, values, dtype=float) -> np.ndarray:
+    """Sum values into an array aligned with the sorted ids; unknown keys are dropped"""
+    result = np.zeros(len(ids), dtype=dtype)
+    keys = np.asarray(keys, dtype=np.int64)
+    if len(ids) == 0 or len(keys) == 0:
+        return result
+    positions = np.searchsorted(ids, keys)
+    clipped = np.minimum(positions, len(ids) - 1)
+    known = ids[clipped] == keys
+    np.add.at(result, clipped[known], np.asarray(values, dtype=dtype)[known])
+    return result
+
+def _supplier_lead_times(db: Session, supplier_ids: np.ndarray, today: date) -> np.ndarray:
+    """Mean order-to-delivery days per SKU supplier, defaulting where there is no history"""
+    rows = db.query(PurchaseOrder.supplier_id, PurchaseOrder.order_date, PurchaseOrder.delivery_date).filter(
+        PurchaseOrder.status == PurchaseOrderStatus.RECEIVED,
+        PurchaseOrder.delivery_date.isnot(None),
+        PurchaseOrder.order_date >= today - timedelta(days=LEAD_TIME_HISTORY_DAYS)
+    ).all()
+
+    lead_times = np.full(len(supplier_ids), settings.REORDER_DEFAULT_LEAD_TIME_DAYS)
+    if not rows:
+        return lead_times
+
+    suppliers, ordered, delivered = zip(*rows)
+    days = (np.array(delivered, dtype="datetime64[D]") - np.array(ordered, dtype="datetime64[D]")).astype(float)
+    known, inverse = np.unique(np.array(suppliers, dtype=np.int64), return_inverse=True)
+    means = np.bincount(inverse, weights=np.maximum(days, 0)) / np.bincount(inverse)
+
+    positions = np.minimum(np.searchsorted(known, supplier_ids), len(known) - 1)
+    has_history = known[positions] == supplier_ids
+    lead_times[has_history] = means[positions[has_history]]
+    return lead_times
+
+def plan_reorders(db: Session, supplier_id: Optional[int] = None, today: Optional[date] = None) -> ReorderPlan:
+    """Compute reorder suggestions grouped by supplier without writing anything"""
+    today = today or date.today()
+    window = settings.REORDER_DEMAND_WINDOW_DAYS
+
+    product_query = db.query(
+        Product.id, Product.supplier_id, Product.sku, Product.name, Product.reorder_point,
+        Product.min_stock_level, Product.max_stock_level, func.coalesce(Product.cost, Product.price)
+    ).filter(Product.is_active.is_(True), Product.supplier_id.isnot(None))
+    if supplier_id is not None:
+        product_query = product_query.filter(Product.supplier_id == supplier_id)
+    products = product_query.order_by(Product.id).all()
+
+    plan = ReorderPlan(generated_at=datetime.utcnow(), demand_window_days=window, sku_count=len(products), suggestions=[])
+    if not products:
+        return plan
+
+    product_ids, supplier_ids, skus, names, reorder_points, min_levels, max_levels, unit_prices = zip(*products)
+    ids = np.array(product_ids, dtype=np.int64)
+    supplier_ids = np.array(supplier_ids, dtype=np.int64)
+    reorder_points = np.array([value or 0 for value in reorder_points], dtype=float)
+    min_levels = np.array([value or 0 for value in min_levels], dtype=float)
+    max_levels = np.array([np.nan if value is None else value for value in max_levels], dtype=float)
+
+    stock = db.query(ProductStockSummary.product_id, ProductStockSummary.available_quantity).all()
+    available = _align(ids, *zip(*stock)) if stock else np.zeros(len(ids))
+
+    on_order_rows = db.query(
+        PurchaseOrderItem.product_id,
+        func.sum(PurchaseOrderItem.quantity - func.coalesce(PurchaseOrderItem.received_quantity, 0))
+    ).join(PurchaseOrder).filter(
+        PurchaseOrder.status.in_(OPEN_STATUSES)
+    ).group_by(PurchaseOrderItem.product_id).all()
+    on_order = np.maximum(_align(ids, *zip(*on_order_rows)), 0) if on_order_rows else np.zeros(len(ids))
+
+    # Daily totals, so the variance below counts days without demand as zero
+    daily_rows = db.query(
+        Inventory.product_id, func.sum(StockMovement.quantity)
+    ).join(Inventory, StockMovement.inventory_item_id == Inventory.id).filter(
+        StockMovement.movement_type == StockMovementType.OUT,
+        StockMovement.created_at >= datetime.combine(today - timedelta(days=window), datetime.min.time())
+    ).group_by(Inventory.product_id, func.date(StockMovement.created_at)).all()
+    if daily_rows:
+        demand_ids, daily_quantities = zip(*daily_rows)
+        daily_quantities = np.array(daily_quantities, dtype=float)
+        demand = _align(ids, demand_ids, daily_quantities)
+        demand_squares = _align(ids, demand_ids, daily_quantities ** 2)
+    else:
+        demand = demand_squares = np.zeros(len(ids))
+
+    daily_rate = demand / window
+    daily_sigma = np.sqrt(np.maximum(demand_squares / window - daily_rate ** 2, 0))
+    lead_times = _supplier_lead_times(db, supplier_ids, today)
+
+    safety_stock = settings.REORDER_SERVICE_LEVEL_Z * daily_sigma * np.sqrt(lead_times)
+    reorder_levels = np.maximum.reduce([reorder_points, min_levels, np.ceil(daily_rate * lead_times + safety_stock)])
+    target_levels = np.where(
+        np.isnan(max_levels),
+        np.ceil(reorder_levels + daily_rate * settings.REORDER_REVIEW_PERIOD_DAYS),
+        max_levels
+    )
+    position = available + on_order
+    quantities = np.ceil(target_levels - position)
+    selected = np.flatnonzero((reorder_levels > 0) & (position <= reorder_levels) & (quantities > 0))
+    if len(selected) == 0:
+        return plan
+
+    supplier_names = dict(db.query(Supplier.id, Supplier.name).filter(
+        Supplier.id.in_(np.unique(supplier_ids[selected]).tolist())
+    ).all())
+
+    suggestions = {}
+    for index in selected[np.argsort(supplier_ids[selected], kind="stable")]:
+        supplier = int(supplier_ids[index])
+        suggestion = suggestions.get(supplier)
+        if suggestion is None:
+            suggestion = suggestions[supplier] = SupplierReorderSuggestion(
+                supplier_id=supplier, supplier_name=supplier_names.get(supplier, ""), lines=[], total_amount=0.0
+            )
+        line = ReorderSuggestionLine(
+            product_id=int(ids[index]),
+            sku=skus[index],
+            name=names[index],
+            quantity=int(quantities[index]),
+            unit_price=unit_prices[index] or 0.0,
+            available_quantity=int(available[index]),
+            on_order_quantity=int(on_order[index]),
+            daily_demand=round(float(daily_rate[index]), 4),
+            lead_time_days=round(float(lead_times[index]), 2),
+            reorder_level=int(reorder_levels[index]),
+            target_level=int(target_levels[index]),
+        )
+        suggestion.lines.append(line)
+        suggestion.total_amount += line.quantity * line.unit_price
+
+    plan.suggestions = list(suggestions.values())
+    return plan
+
+def create_draft_purchase_orders(db: Session, plan: ReorderPlan, created_by: int) -> List[PurchaseOrder]:
+    """Turn each supplier suggestion into a draft purchase order; the caller commits"""
+    purchase_orders = []
+    for suggestion in plan.suggestions:
+        subtotal = sum(line.quantity * line.unit_price for line in suggestion.lines)
+        purchase_order = PurchaseOrder(
+            po_number=po_number_allocator.next_number(db),
+            supplier_id=suggestion.supplier_id,
+            status=PurchaseOrderStatus.DRAFT,
+            order_date=date.today(),
+            subtotal=subtotal,
+            total_amount=subtotal,
+            notes=f"Suggested by replenishment plan of {plan.generated_at:%Y-%m-%d %H:%M}",
+            created_by=created_by,
+        )
+        db.add(purchase_order)
+        purchase_orders.append((purchase_order, suggestion))
+
+    if not purchase_orders:
+        return []
+    db.flush()
+
+    db.execute(insert(PurchaseOrderItem), [
+        {
+            "purchase_order_id": purchase_order.id,
+            "product_id": line.product_id,
+            "quantity": line.quantity,
+            "unit_price": line.unit_price,
+            "total_price": line.quantity * line.unit_price,
+        }
+        for purchase_order, suggestion in purchase_orders
+        for line in suggestion.lines
+    ])
+    return [purchase_order for purchase_order, _ in purchase_orders]
+
+def run_replenishment_job(session_factory: Callable[[], Session]) -> int:
+    """Scheduled run: draft the current plan's purchase orders on behalf of the first active admin"""
+    db = session_factory()
+    try:
+        owner_id = db.query(User.id).filter(
+            User.role == UserRole.ADMIN, User.is_active.is_(True)
+        ).order_by(User.id).limit(1).scalar()
+        if owner_id is None:
+            logger.warning("Replenishment job skipped: no active admin to own draft purchase orders")
+            return 0
+
+        plan = plan_reorders(db)
+        purchase_orders = create_draft_purchase_orders(db, plan, owner_id)
+        db.commit()
+        if purchase_orders:
+            lines = sum(len(suggestion.lines) for suggestion in plan.suggestions)
+            logger.info(f"Replenishment drafted {len(purchase_orders)} purchase orders with {lines} lines")
+        return len(purchase_orders)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,270 @@
+"""
+Stock reservations with TTL expiry.
+
+Reserving locks the inventory row, checks availability and moves quantity into
+``reserved_quantity`` in one transaction. Expiry is driven by an in-process min-heap of
+deadlines: scheduling is O(log n) and the scheduler sleeps until the earliest deadline
+instead of polling. Released reservations stay in the heap and are skipped when popped.
+A periodic DB sweep over the partial ``expires_at`` index recovers reservations
+scheduled by other workers or lost in a crash.
+"""
+import asyncio
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.valuation import post_issue
+from app.models.inventory import Inventory, StockMovement, StockMovementType
+from app.models.reservation import StockReservation, ReservationStatus
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def lock_inventory_item(db: Session, inventory_item_id: int) -> Inventory:
+    """Load an inventory row FOR UPDATE so quantity checks and writes cannot interleave"""
+    inventory_item = db.query(Inventory).filter(Inventory.id == inventory_item_id).with_for_update().first()
+    if not inventory_item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inventory item not found"
+        )
+    return inventory_item
+
+def _lock_active_reservation(db: Session, reservation: StockReservation) -> StockReservation:
+    # Reservation before inventory, the order the expiry sweep locks in; the status is
+    # re-read under the lock so concurrent release/fulfill/expiry cannot unreserve twice
+    locked = db.query(StockReservation).filter(
+        StockReservation.id == reservation.id
+    ).with_for_update().populate_existing().first()
+    if locked is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
+    if locked.status != ReservationStatus.ACTIVE:
+        raise HTTPException(status_code=400, detail=f"Reservation is already {locked.status.value}")
+    return locked
+
+def _unreserve(inventory_item: Inventory, quantity: int) -> None:
+    inventory_item.reserved_quantity = max((inventory_item.reserved_quantity or 0) - quantity, 0)
+    inventory_item.available_quantity = inventory_item.quantity - inventory_item.reserved_quantity
+
+def reserve_stock(
+    db: Session,
+    inventory_item_id: int,
+    quantity: int,
+    ttl_seconds: Optional[int] = None,
+    reference_type: Optional[str] = None,
+    reference_id: Optional[int] = None,
+    notes: Optional[str] = None,
+    created_by: Optional[int] = None,
+) -> StockReservation:
+    """Hold quantity of an inventory item until released, fulfilled or expired"""
+    if quantity <= 0:
+        raise HTTPException(status_code=400, detail="Reservation quantity must be positive")
+
+    ttl_seconds = settings.RESERVATION_DEFAULT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    if ttl_seconds <= 0 or ttl_seconds > settings.RESERVATION_MAX_TTL_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"ttl_seconds must be between 1 and {settings.RESERVATION_MAX_TTL_SECONDS}"
+        )
+
+    inventory_item = lock_inventory_item(db, inventory_item_id)
+    available = inventory_item.quantity - (inventory_item.reserved_quantity or 0)
+    if available < quantity:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Insufficient available stock: {available} available, {quantity} requested"
+        )
+
+    inventory_item.reserved_quantity = (inventory_item.reserved_quantity or 0) + quantity
+    inventory_item.available_quantity = inventory_item.quantity - inventory_item.reserved_quantity
+
+    reservation = StockReservation(
+        inventory_item_id=inventory_item_id,
+        quantity=quantity,
+        status=ReservationStatus.ACTIVE,
+        reference_type=reference_type,
+        reference_id=reference_id,
+        notes=notes,
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds),
+        created_by=created_by,
+    )
+    db.add(reservation)
+    return reservation
+
+def release_reservation(db: Session, reservation: StockReservation, new_status: ReservationStatus = ReservationStatus.RELEASED) -> StockReservation:
+    """Return an active reservation's quantity to available stock"""
+    reservation = _lock_active_reservation(db, reservation)
+    inventory_item = lock_inventory_item(db, reservation.inventory_item_id)
+    _unreserve(inventory_item, reservation.quantity)
+    reservation.status = new_status
+    reservation.released_at = datetime.now(timezone.utc)
+    return reservation
+
+def fulfill_reservation(db: Session, reservation: StockReservation, created_by: Optional[int] = None) -> StockMovement:
+    """Ship an active reservation: release the hold and issue the stock in one step"""
+    reservation = _lock_active_reservation(db, reservation)
+    inventory_item = lock_inventory_item(db, reservation.inventory_item_id)
+    _unreserve(inventory_item, reservation.quantity)
+    issued_cost = post_issue(db, inventory_item, reservation.quantity)
+
+    reservation.status = ReservationStatus.FULFILLED
+    reservation.released_at = datetime.now(timezone.utc)
+
+    stock_movement = StockMovement(
+        inventory_item_id=inventory_item.id,
+        movement_type=StockMovementType.OUT,
+        quantity=reservation.quantity,
+        reference_type="reservation",
+        reference_id=reservation.id,
+        unit_cost=issued_cost / reservation.quantity,
+        notes=f"Fulfilled reservation {reservation.id}",
+        created_by=created_by,
+    )
+    db.add(stock_movement)
+    return stock_movement
+
+def expire_reservations(db: Session, reservation_ids: Optional[List[int]] = None, now: Optional[datetime] = None, batch_size: int = 500) -> int:
+    """Expire active reservations past their deadline, optionally limited to reservation_ids"""
+    now = now or datetime.now(timezone.utc)
+    query = db.query(StockReservation).filter(
+        StockReservation.status == ReservationStatus.ACTIVE,
+        StockReservation.expires_at <= now
+    )
+    if reservation_ids is not None:
+        if not reservation_ids:
+            return 0
+        query = query.filter(StockReservation.id.in_(reservation_ids))
+
+    expired = 0
+    for reservation in query.order_by(StockReservation.expires_at).limit(batch_size).with_for_update(skip_locked=True).all():
+        release_reservation(db, reservation, ReservationStatus.EXPIRED)
+        expired += 1
+    db.commit()
+    return expired
+
+
+def _timestamp(moment: datetime) -> float:
+    """Seconds since the epoch for a naive-UTC or aware datetime"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - EPOCH).total_seconds()
+
+
+class ReservationExpiryScheduler:
+    """Min-heap of reservation deadlines drained by a single asyncio task"""
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        self.session_factory = session_factory
+        self.sweep_interval = settings.RESERVATION_SWEEP_INTERVAL_SECONDS
+        self.is_running = False
+        self.expired_count = 0
+        self._heap: List[Tuple[float, int]] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, reservation_id: int, expires_at: datetime) -> None:
+        """Register a deadline; safe to call from request threads"""
+        entry = (_timestamp(expires_at), reservation_id)
+        with self._lock:
+            heapq.heappush(self._heap, entry)
+            is_earliest = self._heap[0] == entry
+        if is_earliest and self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def pop_due(self, now: float) -> List[int]:
+        """Remove and return reservation ids whose deadline has passed"""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def next_deadline(self) -> Optional[float]:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    async def start(self):
+        if self.is_running or self.session_factory is None:
+            return
+        self.is_running = True
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Reservation expiry scheduler started")
+
+    async def stop(self):
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Reservation expiry scheduler stopped")
+
+    def _expire(self, reservation_ids: Optional[List[int]]) -> int:
+        db = self.session_factory()
+        try:
+            return expire_reservations(db, reservation_ids)
+        finally:
+            db.close()
+
+    def _load_active(self) -> None:
+        """Schedule every active reservation (startup recovery)"""
+        db = self.session_factory()
+        try:
+            rows = db.query(StockReservation.id, StockReservation.expires_at).filter(
+                StockReservation.status == ReservationStatus.ACTIVE
+            ).all()
+        finally:
+            db.close()
+        for reservation_id, expires_at in rows:
+            self.schedule(reservation_id, expires_at)
+
+    async def _run(self):
+        try:
+            await asyncio.to_thread(self._load_active)
+        except Exception as e:
+            logger.error(f"Error loading active reservations: {e}")
+
+        next_sweep = _timestamp(datetime.utcnow())
+        while self.is_running:
+            try:
+                now = _timestamp(datetime.utcnow())
+                due = self.pop_due(now)
+                if due:
+                    self.expired_count += await asyncio.to_thread(self._expire, due)
+                if now >= next_sweep:
+                    self.expired_count += await asyncio.to_thread(self._expire, None)
+                    next_sweep = now + self.sweep_interval
+
+                wake_at = min(next_sweep, self.next_deadline() or next_sweep)
+                timeout = wake_at - _timestamp(datetime.utcnow())
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error expiring reservations: {e}")
+                await asyncio.sleep(5)
+
+
+reservation_scheduler = ReservationExpiryScheduler(SessionLocal)
@@ -1,23 +1,27 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.password_hashing import password_hasher
+from app.core.principals import Principal, principal_cache, token_key
 from app.models.user import User
 import secrets
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer(auto_error=False)  # Make it optional for development
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether the hash was made with a different bcrypt cost than configured"""
+    return password_hasher.needs_rehash(hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -57,10 +61,15 @@ def verify_password_reset_token(token: str) -> Optional[str]:
 def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[Principal]:
     if not credentials:
         return None
     
+    key = token_key(credentials.credentials)
+    principal = principal_cache.get(key)
+    if principal is not None:
+        return principal
+    
     try:
         payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username: str = payload.get("sub")
@@ -68,11 +77,15 @@ def get_current_user(
             return None
         
         user = db.query(User).filter(User.username == username).first()
-        return user
+        if user is None:
+            return None
+        principal = Principal(user)
+        principal_cache.set(key, principal, payload.get("exp"))
+        return principal
     except JWTError:
         return None
         
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not current_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
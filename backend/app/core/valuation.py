@@ -0,0 +1,104 @@
+"""
+Inventory valuation maintained incrementally as stock moves.
+
+Every receipt opens a FIFO cost layer and folds its cost into the item's running
+weighted average; every issue consumes the oldest open layers. Inventory rows carry
+both ``fifo_value`` and ``average_unit_cost``, so valuation reports only aggregate
+maintained columns instead of replaying stock movements.
+"""
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.models.inventory import Inventory, InventoryCostLayer
+
+
+def _resolve_unit_cost(inventory_item: Inventory, unit_cost: Optional[float]) -> float:
+    if unit_cost is not None:
+        return unit_cost
+    if inventory_item.average_unit_cost:
+        return inventory_item.average_unit_cost
+    if inventory_item.unit_cost is not None:
+        return inventory_item.unit_cost
+    if inventory_item.product is not None and inventory_item.product.cost is not None:
+        return inventory_item.product.cost
+    return 0.0
+
+def post_receipt(
+    db: Session,
+    inventory_item: Inventory,
+    quantity: int,
+    unit_cost: Optional[float] = None,
+    reference_type: Optional[str] = None,
+    reference_id: Optional[int] = None,
+) -> InventoryCostLayer:
+    """Add stock to an inventory item, opening a cost layer at unit_cost"""
+    unit_cost = _resolve_unit_cost(inventory_item, unit_cost)
+    on_hand = inventory_item.quantity or 0
+    average = inventory_item.average_unit_cost or 0.0
+
+    layer = InventoryCostLayer(
+        inventory_item=inventory_item,
+        unit_cost=unit_cost,
+        original_quantity=quantity,
+        remaining_quantity=quantity,
+        reference_type=reference_type,
+        reference_id=reference_id,
+    )
+    db.add(layer)
+
+    new_on_hand = on_hand + quantity
+    if new_on_hand > 0:
+        inventory_item.average_unit_cost = (on_hand * average + quantity * unit_cost) / new_on_hand
+    inventory_item.fifo_value = (inventory_item.fifo_value or 0.0) + quantity * unit_cost
+    inventory_item.quantity = new_on_hand
+    inventory_item.available_quantity = inventory_item.quantity - (inventory_item.reserved_quantity or 0)
+    return layer
+
+def post_issue(db: Session, inventory_item: Inventory, quantity: int) -> float:
+    """Remove stock from an inventory item, consuming the oldest cost layers first.
+
+    Returns the FIFO cost of the issued quantity.
+    """
+    remaining = quantity
+    issued_cost = 0.0
+
+    if inventory_item.id is not None and remaining > 0:
+        open_layers = db.query(InventoryCostLayer).filter(
+            InventoryCostLayer.inventory_item_id == inventory_item.id,
+            InventoryCostLayer.remaining_quantity > 0
+        ).order_by(InventoryCostLayer.id).with_for_update()
+
+        for layer in open_layers:
+            taken = min(layer.remaining_quantity, remaining)
+            layer.remaining_quantity -= taken
+            issued_cost += taken * layer.unit_cost
+            remaining -= taken
+            if remaining == 0:
+                break
+
+    # Stock that predates cost layers is issued at the running average
+    issued_cost += remaining * (inventory_item.average_unit_cost or 0.0)
+
+    inventory_item.fifo_value = max((inventory_item.fifo_value or 0.0) - issued_cost, 0.0)
+    inventory_item.quantity = (inventory_item.quantity or 0) - quantity
+    inventory_item.available_quantity = inventory_item.quantity - (inventory_item.reserved_quantity or 0)
+    if inventory_item.quantity == 0:
+        inventory_item.fifo_value = 0.0
+    return issued_cost
+
+def post_quantity_change(
+    db: Session,
+    inventory_item: Inventory,
+    new_quantity: int,
+    unit_cost: Optional[float] = None,
+    reference_type: Optional[str] = None,
+    reference_id: Optional[int] = None,
+) -> float:
+    """Set an absolute quantity by posting the difference as a receipt or issue"""
+    change = new_quantity - (inventory_item.quantity or 0)
+    if change > 0:
+        layer = post_receipt(db, inventory_item, change, unit_cost, reference_type, reference_id)
+        return change * layer.unit_cost
+    if change < 0:
+        return post_issue(db, inventory_item, -change)
+    return 0.0
@@ -1,47 +1,369 @@
+"""
+WebSocket connection registry and fan-out.
+
+Every connection owns a bounded outbound queue drained by its own writer task, so
+publishing is a non-blocking enqueue per recipient and a stalled client only ever
+delays itself. A client whose queue is full has stopped keeping up: it is evicted
+(unregistered and closed with 1013 "try again later") rather than buffered without
+bound. ``stats`` counts enqueued, dropped and failed sends and evictions.
+
+Messages are published through the backplane (see ``app.core.backplane``) once the
+manager is started, so every worker delivers them to its own connections; before that
+they are delivered to this worker's connections directly.
+
+Clients narrow what they receive by sending ``{"action": "subscribe", "topics": [...]}``
+(or ``"unsubscribe"``) with topics such as ``location:3``, ``product:42`` or
+``alerts:low_stock``. A topic-tagged publish looks up only the sockets in its topics'
+index entries. Connections that have never subscribed keep receiving every message,
+as before the protocol existed.
+
+A published message is serialized once and the resulting ``Frame`` is shared by every
+recipient's queue. Clients that offer the ``msgpack`` subprotocol (when msgpack is
+installed) get binary MessagePack frames, encoded lazily once per frame; everyone else
+gets text. Clients may send either kind of frame: text is JSON, binary is MessagePack.
+permessage-deflate is negotiated by the server (uvicorn's
+``ws_per_message_deflate``); compression state is per connection, so that cost is the
+one part of a broadcast still paid per recipient.
+
+The registry is dicts and sets, so connecting and disconnecting are O(1). Once started
+the manager sends a ``{"type": "ping"}`` every WEBSOCKET_HEARTBEAT_INTERVAL_SECONDS;
+any message from the client, such as ``{"action": "pong"}``, marks it alive. A
+connection silent for WEBSOCKET_IDLE_TIMEOUT_SECONDS is presumed dead and reaped.
+"""
 from fastapi import WebSocket
-from typing import List, Dict
-import json
+from typing import Any, Callable, Iterable, List, Dict, Optional, Set, Union
 import asyncio
+import logging
+import re
+import time
 from datetime import datetime
 
+from app.core.backplane import Backplane
+from app.core.config import settings
+from app.core.encoding import MSGPACK_AVAILABLE, dumps, loads, packb, unpackb
+
+logger = logging.getLogger(__name__)
+
+SLOW_CONSUMER_CLOSE_CODE = 1013  # Try Again Later
+IDLE_CLOSE_CODE = 1001  # Going Away
+TOPIC_PATTERN = re.compile(
+    r"^(location|product):\d+$"
+    r"|^alerts:(low_stock|out_of_stock|overstock|expiry_warning)$"
+    r"|^changes:(inventory|stock_alert|purchase_order)$"
+)
+MAX_TOPICS_PER_CONNECTION = 100
+
+
+def negotiate_subprotocol(offered: List[str]) -> Optional[str]:
+    """Preferred subprotocol among those the client offered"""
+    if MSGPACK_AVAILABLE and "msgpack" in offered:
+        return "msgpack"
+    if "json" in offered:
+        return "json"
+    return None
+
+
+def decode_client_frame(message: dict) -> Any:
+    """Decode a received ASGI websocket message: text as JSON, bytes as MessagePack (JSON
+    when msgpack is not installed). None if the frame is malformed."""
+    try:
+        if message.get("text") is not None:
+            return loads(message["text"])
+        if message.get("bytes") is not None:
+            return unpackb(message["bytes"]) if MSGPACK_AVAILABLE else loads(message["bytes"])
+    except Exception:  # Malformed client input must not take the connection down
+        return None
+    return None
+
+def alert_topics(alert_data: dict) -> List[str]:
+    """Topics an alert is published to"""
+    topics = []
+    if alert_data.get("location_id") is not None:
+        topics.append(f"location:{alert_data['location_id']}")
+    if alert_data.get("product_id") is not None:
+        topics.append(f"product:{alert_data['product_id']}")
+    if alert_data.get("alert_type"):
+        topics.append(f"alerts:{alert_data['alert_type']}")
+    return topics
+
+
+class Frame:
+    """One published message, encoded at most once per wire format for all recipients"""
+    __slots__ = ("text", "_binary")
+
+    def __init__(self, text: str):
+        self.text = text
+        self._binary: Optional[bytes] = None
+
+    @property
+    def binary(self) -> bytes:
+        if self._binary is None:
+            self._binary = packb(loads(self.text))
+        return self._binary
+
+
+class ClientConnection:
+    """One socket with its bounded send queue and writer task"""
+
+    def __init__(self, websocket: WebSocket, user_id: Optional[int], queue_size: int, binary: bool = False):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.binary = binary  # Negotiated the msgpack subprotocol
+        self.last_seen = time.monotonic()  # Last message received from the client
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.topics: Set[str] = set()
+
+    def enqueue(self, frame: Frame) -> bool:
+        """Queue a frame without waiting; False if the queue is full"""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+
+def _text(message: Union[str, dict]) -> str:
+    return message if isinstance(message, str) else dumps(message)
+
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.user_connections: Dict[int, List[WebSocket]] = {}
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        heartbeat_interval: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+    ):
+        self.queue_size = queue_size or settings.WEBSOCKET_SEND_QUEUE_SIZE
+        self.heartbeat_interval = heartbeat_interval or settings.WEBSOCKET_HEARTBEAT_INTERVAL_SECONDS
+        self.idle_timeout = idle_timeout or settings.WEBSOCKET_IDLE_TIMEOUT_SECONDS
+        self.active_connections: Set[WebSocket] = set()
+        self.user_connections: Dict[int, Set[WebSocket]] = {}
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.topic_connections: Dict[str, Set[WebSocket]] = {}
+        self.unfiltered: Set[WebSocket] = set()  # Clients that never subscribed get everything
+        self.backplane: Optional[Backplane] = None
+        self.listeners: List[Callable[[dict], None]] = []  # Called with every envelope this worker delivers
+        self.stats: Dict[str, int] = {
+            "messages_enqueued": 0,
+            "messages_dropped": 0,
+            "send_errors": 0,
+            "evictions": 0,
+            "reaped": 0,
+        }
+        self._heartbeat_task: Optional[asyncio.Task] = None
 
     async def connect(self, websocket: WebSocket, user_id: int = None):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+        subprotocol = negotiate_subprotocol(getattr(websocket, "scope", {}).get("subprotocols", []))
+        await websocket.accept(subprotocol=subprotocol)
+        client = ClientConnection(websocket, user_id, self.queue_size, binary=subprotocol == "msgpack")
+        client.writer = asyncio.create_task(self._write(client))
+        self.clients[websocket] = client
+        self.unfiltered.add(websocket)
+        self.active_connections.add(websocket)
         if user_id:
-            if user_id not in self.user_connections:
-                self.user_connections[user_id] = []
-            self.user_connections[user_id].append(websocket)
+            self.user_connections.setdefault(user_id, set()).add(websocket)
 
     def disconnect(self, websocket: WebSocket, user_id: int = None):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        if user_id and user_id in self.user_connections:
-            if websocket in self.user_connections[user_id]:
-                self.user_connections[user_id].remove(websocket)
-            if not self.user_connections[user_id]:
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            user_id = user_id or client.user_id
+            self._remove_topics(client, list(client.topics))
+            self.unfiltered.discard(websocket)
+            if client.writer is not None and client.writer is not asyncio.current_task():
+                client.writer.cancel()
+        self.active_connections.discard(websocket)
+        connections = self.user_connections.get(user_id) if user_id else None
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
                 del self.user_connections[user_id]
 
-    async def send_personal_message(self, message: str, user_id: int):
-        if user_id in self.user_connections:
-            for connection in self.user_connections[user_id]:
-                try:
-                    await connection.send_text(message)
-                except:
-                    # Remove broken connections
-                    self.user_connections[user_id].remove(connection)
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
+    async def _write(self, client: ClientConnection):
+        """Drain one client's queue; a failed send drops the client"""
+        while True:
+            frame = await client.queue.get()
+            try:
+                if client.binary:
+                    await client.websocket.send_bytes(frame.binary)
+                else:
+                    await client.websocket.send_text(frame.text)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["send_errors"] += 1
+                logger.debug(f"WebSocket send failed, dropping connection: {e}")
+                self.disconnect(client.websocket)
+                return
+
+    def _evict(self, client: ClientConnection):
+        """Disconnect a client that cannot keep up with its queue"""
+        self.stats["evictions"] += 1
+        self.stats["messages_dropped"] += client.queue.qsize() + 1
+        self.disconnect(client.websocket)
+        asyncio.create_task(self._close(client.websocket, SLOW_CONSUMER_CLOSE_CODE))
+
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass  # Already gone
+
+    def _enqueue(self, websocket: WebSocket, frame: Frame):
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        if client.enqueue(frame):
+            self.stats["messages_enqueued"] += 1
+        else:
+            self._evict(client)
+
+    def touch(self, websocket: WebSocket):
+        """Record that the client is alive"""
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.last_seen = time.monotonic()
+
+    def reap(self) -> int:
+        """Close connections idle past the timeout and ping the rest; returns the number closed"""
+        deadline = time.monotonic() - self.idle_timeout
+        ping = Frame(dumps({"type": "ping", "timestamp": datetime.utcnow().isoformat()}))
+        reaped = 0
+        for client in list(self.clients.values()):
+            if client.last_seen < deadline:
+                reaped += 1
+                self.disconnect(client.websocket)
+                asyncio.create_task(self._close(client.websocket, IDLE_CLOSE_CODE))
+            else:
+                self._enqueue(client.websocket, ping)
+        self.stats["reaped"] += reaped
+        if reaped:
+            logger.info(f"Reaped {reaped} idle WebSocket connections; {len(self.clients)} live")
+        return reaped
+
+    async def _run_heartbeats(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Error in WebSocket heartbeat: {e}")
+
+    def send_to(self, websocket: WebSocket, message: str):
+        """Queue a message for one connection"""
+        self._enqueue(websocket, Frame(message))
+
+    def wants(self, websocket: WebSocket, topics: Iterable[str]) -> bool:
+        """Whether a message for topics would be delivered to this connection"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return False
+        return websocket in self.unfiltered or not client.topics.isdisjoint(topics)
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """Add topics to a connection; returns its topics"""
+        client = self.clients[websocket]
+        topics = [topic for topic in topics if topic not in client.topics]
+        if len(client.topics) + len(topics) > MAX_TOPICS_PER_CONNECTION:
+            raise ValueError(f"At most {MAX_TOPICS_PER_CONNECTION} topics per connection")
+        invalid = [topic for topic in topics if not isinstance(topic, str) or not TOPIC_PATTERN.match(topic)]
+        if invalid:
+            raise ValueError(f"Unknown topic: {invalid[0]}")
+        self.unfiltered.discard(websocket)
+        for topic in topics:
+            client.topics.add(topic)
+            self.topic_connections.setdefault(topic, set()).add(websocket)
+        return sorted(client.topics)
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """Remove topics from a connection; returns its topics"""
+        client = self.clients[websocket]
+        self._remove_topics(client, [topic for topic in topics if topic in client.topics])
+        return sorted(client.topics)
+
+    def _remove_topics(self, client: ClientConnection, topics: List[str]):
+        for topic in topics:
+            client.topics.discard(topic)
+            subscribers = self.topic_connections.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client.websocket)
+                if not subscribers:
+                    del self.topic_connections[topic]
+
+    async def handle_client_message(self, websocket: WebSocket, request: Any) -> bool:
+        """Apply a decoded subscribe/unsubscribe request; False if it is not one"""
+        if not isinstance(request, dict) or request.get("action") not in ("subscribe", "unsubscribe", "pong"):
+            return False
+        if request["action"] == "pong":
+            return True  # Liveness is recorded for every message received
+
+        topics = request.get("topics")
+        if not isinstance(topics, list):
+            reply = {"type": "error", "detail": "topics must be a list"}
+        else:
             try:
-                await connection.send_text(message)
-            except:
-                # Remove broken connections
-                self.active_connections.remove(connection)
+                if request["action"] == "subscribe":
+                    reply = {"type": "subscribed", "topics": self.subscribe(websocket, topics)}
+                else:
+                    reply = {"type": "unsubscribed", "topics": self.unsubscribe(websocket, topics)}
+            except ValueError as e:
+                reply = {"type": "error", "detail": str(e)}
+        self.send_to(websocket, dumps(reply))
+        return True
+
+    async def start(self, backplane: Backplane):
+        """Relay messages across workers through backplane"""
+        self.backplane = backplane
+        await backplane.start(self.deliver)
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._run_heartbeats())
+
+    async def stop(self):
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        backplane, self.backplane = self.backplane, None
+        if backplane is not None:
+            await backplane.stop()
+
+    async def deliver(self, envelope: dict):
+        """Deliver a published envelope to this worker's connections"""
+        for listener in self.listeners:
+            listener(envelope)
+        user_id = envelope.get("user_id")
+        topics = envelope.get("topics")
+        if user_id is not None:
+            connections = list(self.user_connections.get(user_id, ()))
+        elif topics is not None:
+            targets = set(self.unfiltered)
+            for topic in topics:
+                targets.update(self.topic_connections.get(topic, ()))
+            connections = list(targets)
+        else:
+            # Snapshot: evictions modify the registry while we iterate
+            connections = list(self.clients)
+        frame = Frame(envelope["message"])
+        for connection in connections:
+            self._enqueue(connection, frame)
+
+    async def _publish(self, envelope: dict):
+        if self.backplane is None:
+            await self.deliver(envelope)
+        else:
+            await self.backplane.publish(envelope)
+
+    async def send_personal_message(self, message: Union[str, dict], user_id: int):
+        await self._publish({"user_id": user_id, "message": _text(message)})
+
+    async def broadcast(self, message: Union[str, dict]):
+        await self._publish({"message": _text(message)})
+
+    async def publish(self, topics: List[str], message: Union[str, dict], sequence: Optional[int] = None):
+        """Send to connections subscribed to any of topics, and to unfiltered connections"""
+        envelope = {"topics": topics, "message": _text(message)}
+        if sequence is not None:
+            envelope["sequence"] = sequence
+        await self._publish(envelope)
 
     async def send_alert(self, alert_data: dict, user_id: int = None):
         """Send a stock alert to specific user or broadcast"""
@@ -50,10 +372,10 @@ class ConnectionManager:
             "data": alert_data,
             "timestamp": datetime.utcnow().isoformat()
         }
-        
+
         if user_id:
-            await self.send_personal_message(json.dumps(message), user_id)
+            await self.send_personal_message(message, user_id)
         else:
-            await self.broadcast(json.dumps(message))
+            await self.publish(alert_topics(alert_data), message)
 
-manager = ConnectionManager() 
\ No newline at end of file
+manager = ConnectionManager()
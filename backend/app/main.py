@@ -10,10 +10,17 @@ import os
 # Add the backend directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy.orm.exc import StaleDataError
+
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.core.database import engine
 from app.models import Base
+from app.core.reservations import reservation_scheduler
+from app.core.backplane import create_backplane
+from app.core.websocket import manager
+from app.core.change_feed import change_feed
+from app.core.maintenance import maintenance_scheduler
 
 # Temporarily disable background tasks to isolate health check issue
 # from app.core.background_tasks import background_task_manager
@@ -59,6 +66,14 @@ app.add_middleware(
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request, exc):
+    """A versioned row changed between read and write: report it like a failed If-Match"""
+    return JSONResponse(
+        status_code=412,
+        content={"detail": "Resource has been modified; reload it and retry"}
+    )
+
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks when the application starts"""
@@ -67,7 +82,16 @@ async def startup_event():
     #     await background_task_manager.start()
     # except Exception as e:
     #     print(f"Warning: Background task manager failed to start: {e}")
-    pass
+    try:
+        await reservation_scheduler.start()
+    except Exception as e:
+        print(f"Warning: Reservation expiry scheduler failed to start: {e}")
+    try:
+        await manager.start(create_backplane(engine))
+    except Exception as e:
+        print(f"Warning: WebSocket backplane failed to start: {e}")
+    await change_feed.start(manager)
+    await maintenance_scheduler.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -77,7 +101,16 @@ async def shutdown_event():
     #     await background_task_manager.stop()
     # except Exception as e:
     #     print(f"Warning: Background task manager failed to stop: {e}")
-    pass
+    await maintenance_scheduler.stop()
+    try:
+        await reservation_scheduler.stop()
+    except Exception as e:
+        print(f"Warning: Reservation expiry scheduler failed to stop: {e}")
+    await change_feed.stop()
+    try:
+        await manager.stop()
+    except Exception as e:
+        print(f"Warning: WebSocket backplane failed to stop: {e}")
 
 @app.get("/")
 async def root():
@@ -160,6 +193,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        ws_per_message_deflate=settings.WEBSOCKET_PER_MESSAGE_DEFLATE
     ) # Force redeploy
 # Force redeploy - Mon Aug  4 03:48:55 PM IST 2025
@@ -1,3 +1,4 @@
+from app.core.database import Base
 from .user import User
 from .product import Product
 from .category import Category
@@ -6,8 +7,15 @@ from .supplier import Supplier
 from .location import Location
 from .purchase_order import PurchaseOrder, PurchaseOrderItem
 from .stock_alert import StockAlert
+from .product_stock_summary import ProductStockSummary
+from .purchase_order_rollup import PurchaseOrderRollup
+from .reservation import StockReservation
+from .idempotency_key import IdempotencyKey
+from .change_event import ChangeEvent
+from .refresh_token import RefreshToken
 
 __all__ = [
+    "Base",
     "User",
     "Product", 
     "Category",
@@ -16,5 +24,11 @@ __all__ = [
     "Location",
     "PurchaseOrder",
     "PurchaseOrderItem",
-    "StockAlert"
-] 
\ No newline at end of file
+    "StockAlert",
+    "ProductStockSummary",
+    "PurchaseOrderRollup",
+    "StockReservation",
+    "IdempotencyKey",
+    "ChangeEvent",
+    "RefreshToken"
+]
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ChangeEvent(Base):
+    """One inventory, alert or purchase order mutation; id is the global change sequence"""
+    __tablename__ = "change_events"
+    
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(32), nullable=False)  # "inventory", "stock_alert" or "purchase_order"
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(16), nullable=False)  # "created", "updated" or "deleted"
+    fields = Column(Text, nullable=False)  # JSON of the changed columns' new values
+    topics = Column(Text, nullable=False)  # JSON list of WebSocket topics
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
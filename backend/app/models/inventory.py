@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Enum, Boolean, Index, case, cast, event, text, update
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, Session
+from sqlalchemy.orm.attributes import get_history
 from app.core.database import Base
+from app.models.product import Product
 import enum
 
 class StockMovementType(enum.Enum):
@@ -10,8 +12,23 @@ class StockMovementType(enum.Enum):
     TRANSFER = "transfer"
     ADJUSTMENT = "adjustment"
 
+class StockStatus(enum.Enum):
+    OK = "ok"
+    LOW = "low"
+    OUT = "out"
+    OVER = "over"
+
 class Inventory(Base):
     __tablename__ = "inventory"
+    __table_args__ = (
+        # Only exceptional rows are indexed, so low/out/over listings stay small as inventory grows
+        Index(
+            "ix_inventory_stock_status_quantity",
+            "stock_status", "quantity", "id",
+            postgresql_where=text("stock_status <> 'OK'"),
+            sqlite_where=text("stock_status <> 'OK'"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -19,21 +36,33 @@ class Inventory(Base):
     quantity = Column(Integer, default=0, nullable=False)
     reserved_quantity = Column(Integer, default=0, nullable=False)  # For pending orders
     available_quantity = Column(Integer, default=0, nullable=False)  # quantity - reserved_quantity
+    stock_status = Column(Enum(StockStatus), default=StockStatus.OK, nullable=False)  # Maintained on every quantity change
     unit_cost = Column(Float, nullable=True)
+    average_unit_cost = Column(Float, default=0.0, nullable=False)  # Running weighted average cost
+    fifo_value = Column(Float, default=0.0, nullable=False)  # Sum of remaining cost layers
     last_restocked = Column(DateTime(timezone=True), nullable=True)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version_id = Column(Integer, nullable=False, default=1)  # Optimistic concurrency, exposed as ETag
+    
+    __mapper_args__ = {"version_id_col": version_id}
     
     # Relationships
     product = relationship("Product", back_populates="inventory_items")
     location = relationship("Location", back_populates="inventory_items")
     stock_movements = relationship("StockMovement", back_populates="inventory_item")
+    cost_layers = relationship("InventoryCostLayer", back_populates="inventory_item", cascade="all, delete-orphan", passive_deletes=True)
 
 
 
 class StockMovement(Base):
+    # On PostgreSQL this table is range partitioned by month on created_at (primary key
+    # (id, created_at)); see app/core/partitions.py. The ORM only needs id to identify rows.
     __tablename__ = "stock_movements"
+    __table_args__ = (
+        Index("ix_stock_movements_item_created", "inventory_item_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     inventory_item_id = Column(Integer, ForeignKey("inventory.id"), nullable=False)
@@ -46,10 +75,90 @@ class StockMovement(Base):
     unit_cost = Column(Float, nullable=True)
     notes = Column(Text, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
     inventory_item = relationship("Inventory", back_populates="stock_movements")
     from_location = relationship("Location", foreign_keys=[from_location_id], back_populates="stock_movements_from")
     to_location = relationship("Location", foreign_keys=[to_location_id], back_populates="stock_movements_to")
-    user = relationship("User") 
\ No newline at end of file
+    user = relationship("User")
+
+class InventoryCostLayer(Base):
+    """FIFO cost layer created by each receipt and consumed oldest first by issues"""
+    __tablename__ = "inventory_cost_layers"
+    __table_args__ = (
+        # Open layers only; fully consumed layers drop out of the index
+        Index(
+            "ix_inventory_cost_layers_open",
+            "inventory_item_id", "id",
+            postgresql_where=text("remaining_quantity > 0"),
+            sqlite_where=text("remaining_quantity > 0"),
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    inventory_item_id = Column(Integer, ForeignKey("inventory.id", ondelete="CASCADE"), nullable=False)
+    unit_cost = Column(Float, nullable=False)
+    original_quantity = Column(Integer, nullable=False)
+    remaining_quantity = Column(Integer, nullable=False)
+    reference_type = Column(String, nullable=True)  # purchase_order, adjustment, opening
+    reference_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    inventory_item = relationship("Inventory", back_populates="cost_layers")
+
+
+def classify_stock_status(quantity: int, reorder_point: int = None, max_stock_level: int = None) -> StockStatus:
+    """Classify an on hand quantity against the product's stock levels"""
+    quantity = quantity or 0
+    if quantity <= 0:
+        return StockStatus.OUT
+    if quantity <= (reorder_point or 0):
+        return StockStatus.LOW
+    if max_stock_level is not None and quantity > max_stock_level:
+        return StockStatus.OVER
+    return StockStatus.OK
+
+def stock_status_expression(reorder_point: int = None, max_stock_level: int = None):
+    """SQL counterpart of classify_stock_status for set-based reclassification"""
+    whens = [
+        (Inventory.quantity <= 0, StockStatus.OUT.name),
+        (Inventory.quantity <= (reorder_point or 0), StockStatus.LOW.name),
+    ]
+    if max_stock_level is not None:
+        whens.append((Inventory.quantity > max_stock_level, StockStatus.OVER.name))
+    return cast(case(*whens, else_=StockStatus.OK.name), Inventory.stock_status.type)
+
+@event.listens_for(Session, "before_flush")
+def maintain_stock_status(session, flush_context, instances):
+    """Reclassify inventory rows whose quantity or product stock levels change"""
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Inventory):
+            if obj not in session.new and not get_history(obj, "quantity").has_changes():
+                continue
+            product = session.get(Product, obj.product_id) if obj.product_id is not None else obj.product
+            if product is None:
+                continue
+            status = classify_stock_status(obj.quantity, product.reorder_point, product.max_stock_level)
+            if obj.stock_status != status:
+                obj.stock_status = status
+
+        elif isinstance(obj, Product) and obj.id is not None:
+            if any(get_history(obj, attr).has_changes() for attr in ("reorder_point", "max_stock_level")):
+                # Only rows whose status changes get a new version (and so a new ETag); "fetch"
+                # expires the stale status and version of rows already loaded in the session
+                status = stock_status_expression(obj.reorder_point, obj.max_stock_level)
+                reclassified = session.execute(
+                    update(Inventory)
+                    .where(Inventory.product_id == obj.id, Inventory.stock_status != status)
+                    .values(stock_status=status, version_id=Inventory.version_id + 1)
+                    .returning(Inventory.id, Inventory.location_id, Inventory.product_id, Inventory.stock_status, Inventory.version_id)
+                    .execution_options(synchronize_session="fetch")
+                ).all()
+                # The bulk UPDATE bypasses the change feed's flush listener
+                from app.core.change_feed import record_changes, updated_change
+                record_changes(session, [
+                    updated_change("inventory", row.id, {"stock_status": row.stock_status, "version_id": row.version_id}, row._asdict())
+                    for row in reclassified
+                ])
@@ -26,10 +26,14 @@ class Product(Base):
     reorder_point = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version_id = Column(Integer, nullable=False, default=1)  # Optimistic concurrency, exposed as ETag
+    
+    __mapper_args__ = {"version_id_col": version_id}
     
     # Relationships
     category = relationship("Category", back_populates="products")
     supplier = relationship("Supplier", back_populates="products")
     inventory_items = relationship("Inventory", back_populates="product")
     purchase_order_items = relationship("PurchaseOrderItem", back_populates="product", cascade="all, delete-orphan")
-    stock_alerts = relationship("StockAlert", back_populates="product", cascade="all, delete-orphan") 
\ No newline at end of file
+    stock_alerts = relationship("StockAlert", back_populates="product", cascade="all, delete-orphan")
+    stock_summary = relationship("ProductStockSummary", back_populates="product", uselist=False, cascade="all, delete-orphan") 
\ No newline at end of file
@@ -0,0 +1,99 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, event, update
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, Session
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.database import Base
+from app.models.inventory import Inventory
+
+class ProductStockSummary(Base):
+    """Per-product stock totals across all locations, maintained on every inventory flush"""
+    __tablename__ = "product_stock_summary"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    on_hand_quantity = Column(Integer, default=0, nullable=False)
+    reserved_quantity = Column(Integer, default=0, nullable=False)
+    available_quantity = Column(Integer, default=0, nullable=False)
+    location_count = Column(Integer, default=0, nullable=False)  # Inventory rows (stocked locations)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    product = relationship("Product", back_populates="stock_summary")
+
+
+def _old_value(obj, attr):
+    history = get_history(obj, attr)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, attr)
+
+def _collect_inventory_deltas(session: Session) -> dict:
+    """Return {product_id: [on_hand, reserved, locations]} deltas for the inventory rows just flushed"""
+    deltas = {}
+
+    def add(product_id, quantity, reserved, locations):
+        if product_id is None:
+            return
+        delta = deltas.setdefault(product_id, [0, 0, 0])
+        delta[0] += quantity or 0
+        delta[1] += reserved or 0
+        delta[2] += locations
+
+    for obj in session.new:
+        if isinstance(obj, Inventory):
+            add(obj.product_id, obj.quantity, obj.reserved_quantity, 1)
+
+    for obj in session.dirty:
+        if isinstance(obj, Inventory) and session.is_modified(obj):
+            add(_old_value(obj, "product_id"), -(_old_value(obj, "quantity") or 0), -(_old_value(obj, "reserved_quantity") or 0), -1)
+            add(obj.product_id, obj.quantity, obj.reserved_quantity, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Inventory):
+            add(_old_value(obj, "product_id"), -(_old_value(obj, "quantity") or 0), -(_old_value(obj, "reserved_quantity") or 0), -1)
+
+    return {product_id: delta for product_id, delta in deltas.items() if any(delta)}
+
+def apply_stock_summary_deltas(session: Session, deltas: dict) -> None:
+    """Atomically add deltas to the summary rows, creating missing rows via upsert"""
+    dialect = session.get_bind().dialect.name
+    table = ProductStockSummary.__table__
+
+    for product_id, (on_hand, reserved, locations) in deltas.items():
+        values = {
+            "on_hand_quantity": table.c.on_hand_quantity + on_hand,
+            "reserved_quantity": table.c.reserved_quantity + reserved,
+            "available_quantity": table.c.available_quantity + (on_hand - reserved),
+            "location_count": table.c.location_count + locations,
+            "updated_at": func.now(),
+        }
+
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(table).values(
+                product_id=product_id,
+                on_hand_quantity=on_hand,
+                reserved_quantity=reserved,
+                available_quantity=on_hand - reserved,
+                location_count=locations,
+            ).on_conflict_do_update(index_elements=[table.c.product_id], set_=values)
+            session.execute(stmt)
+        else:
+            result = session.execute(update(table).where(table.c.product_id == product_id).values(**values))
+            if result.rowcount == 0:
+                session.execute(table.insert().values(
+                    product_id=product_id,
+                    on_hand_quantity=on_hand,
+                    reserved_quantity=reserved,
+                    available_quantity=on_hand - reserved,
+                    location_count=locations,
+                ))
+
+@event.listens_for(Session, "after_flush")
+def maintain_product_stock_summary(session, flush_context):
+    """Keep product_stock_summary in step with inventory writes in the same transaction"""
+    deltas = _collect_inventory_deltas(session)
+    if deltas:
+        apply_stock_summary_deltas(session, deltas)
@@ -37,6 +37,9 @@ class PurchaseOrder(Base):
     approved_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version_id = Column(Integer, nullable=False, default=1)  # Optimistic concurrency, exposed as ETag
+    
+    __mapper_args__ = {"version_id_col": version_id}
     
     # Relationships
     supplier = relationship("Supplier", back_populates="purchase_orders")
@@ -44,6 +47,13 @@ class PurchaseOrder(Base):
     creator = relationship("User", foreign_keys=[created_by])
     approver = relationship("User", foreign_keys=[approved_by])
 
+class PurchaseOrderNumberCounter(Base):
+    """Last PO number issued per year where database sequences are unavailable"""
+    __tablename__ = "po_number_counters"
+    
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    last_value = Column(Integer, nullable=False, default=0)
+
 class PurchaseOrderItem(Base):
     __tablename__ = "purchase_order_items"
     
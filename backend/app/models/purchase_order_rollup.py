@@ -0,0 +1,102 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Enum, event, update
+from sqlalchemy.sql import func
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.database import Base
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderStatus
+from app.models.product_stock_summary import _old_value
+
+class PurchaseOrderRollup(Base):
+    """PO counts and spend per (month, supplier, status), maintained on every purchase order flush"""
+    __tablename__ = "purchase_order_rollups"
+
+    month = Column(Date, primary_key=True)  # First day of the order_date month
+    supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(Enum(PurchaseOrderStatus), primary_key=True)
+    po_count = Column(Integer, default=0, nullable=False)
+    total_amount = Column(Float, default=0.0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+def _month(order_date):
+    return order_date.replace(day=1) if order_date is not None else None
+
+def _add_delta(deltas: dict, order_date, supplier_id, status, count, amount) -> None:
+    if order_date is None or supplier_id is None or status is None:
+        return
+    delta = deltas.setdefault((_month(order_date), supplier_id, status), [0, 0.0])
+    delta[0] += count
+    delta[1] += (amount or 0.0) * count
+
+def _collect_purchase_order_deltas(session: Session) -> dict:
+    """Return {(month, supplier_id, status): [count, amount]} deltas for the orders just flushed"""
+    deltas = {}
+
+    def add_old(obj, count):
+        _add_delta(deltas, _old_value(obj, "order_date"), _old_value(obj, "supplier_id"),
+                   _old_value(obj, "status"), count, _old_value(obj, "total_amount"))
+
+    for obj in session.new:
+        if isinstance(obj, PurchaseOrder):
+            _add_delta(deltas, obj.order_date, obj.supplier_id, obj.status, 1, obj.total_amount)
+
+    for obj in session.dirty:
+        if isinstance(obj, PurchaseOrder) and session.is_modified(obj):
+            add_old(obj, -1)
+            _add_delta(deltas, obj.order_date, obj.supplier_id, obj.status, 1, obj.total_amount)
+
+    for obj in session.deleted:
+        if isinstance(obj, PurchaseOrder):
+            add_old(obj, -1)
+
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+def apply_purchase_order_rollup_deltas(session: Session, deltas: dict) -> None:
+    """Atomically add deltas to the rollup rows, creating missing rows via upsert"""
+    dialect = session.get_bind().dialect.name
+    table = PurchaseOrderRollup.__table__
+
+    for (month, supplier_id, status), (count, amount) in deltas.items():
+        key = {"month": month, "supplier_id": supplier_id, "status": status}
+        values = {
+            "po_count": table.c.po_count + count,
+            "total_amount": table.c.total_amount + amount,
+            "updated_at": func.now(),
+        }
+
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(table).values(**key, po_count=count, total_amount=amount).on_conflict_do_update(
+                index_elements=[table.c.month, table.c.supplier_id, table.c.status], set_=values
+            )
+            session.execute(stmt)
+        else:
+            result = session.execute(
+                update(table).where(
+                    table.c.month == month,
+                    table.c.supplier_id == supplier_id,
+                    table.c.status == status
+                ).values(**values)
+            )
+            if result.rowcount == 0:
+                session.execute(table.insert().values(**key, po_count=count, total_amount=amount))
+
+def apply_bulk_status_change(session: Session, rows, new_status: PurchaseOrderStatus, order_date=None) -> None:
+    """Move orders changed by a bulk UPDATE to new_status, and to order_date when given.
+
+    rows carry each order's order_date, supplier_id, status and total_amount before the update.
+    """
+    deltas = {}
+    for row in rows:
+        _add_delta(deltas, row.order_date, row.supplier_id, row.status, -1, row.total_amount)
+        _add_delta(deltas, order_date or row.order_date, row.supplier_id, new_status, 1, row.total_amount)
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if deltas:
+        apply_purchase_order_rollup_deltas(session, deltas)
+
+@event.listens_for(Session, "after_flush")
+def maintain_purchase_order_rollups(session, flush_context):
+    """Keep purchase_order_rollups in step with purchase order writes in the same transaction"""
+    deltas = _collect_purchase_order_deltas(session)
+    if deltas:
+        apply_purchase_order_rollup_deltas(session, deltas)
@@ -9,6 +9,25 @@ class UserRole(enum.Enum):
     STAFF = "staff"
     VIEWER = "viewer"
 
+ROLE_PERMISSIONS = {
+    UserRole.ADMIN: [
+        "create_po", "edit_po", "delete_po", "approve_po", "cancel_po", 
+        "receive_po", "view_all_po", "manage_users", "manage_suppliers",
+        "manage_products", "manage_inventory", "view_reports"
+    ],
+    UserRole.MANAGER: [
+        "create_po", "edit_po", "approve_po", "cancel_po", 
+        "receive_po", "view_all_po", "manage_suppliers",
+        "manage_products", "manage_inventory", "view_reports"
+    ],
+    UserRole.STAFF: [
+        "create_po", "edit_po", "receive_po", "view_own_po"
+    ],
+    UserRole.VIEWER: [
+        "view_own_po"
+    ]
+}
+
 class User(Base):
     __tablename__ = "users"
     
@@ -27,25 +46,7 @@ class User(Base):
     
     def has_permission(self, permission: str) -> bool:
         """Check if user has specific permission based on role"""
-        role_permissions = {
-            UserRole.ADMIN: [
-                "create_po", "edit_po", "delete_po", "approve_po", "cancel_po", 
-                "receive_po", "view_all_po", "manage_users", "manage_suppliers",
-                "manage_products", "manage_inventory", "view_reports"
-            ],
-            UserRole.MANAGER: [
-                "create_po", "edit_po", "approve_po", "cancel_po", 
-                "receive_po", "view_all_po", "manage_suppliers",
-                "manage_products", "manage_inventory", "view_reports"
-            ],
-            UserRole.STAFF: [
-                "create_po", "edit_po", "receive_po", "view_own_po"
-            ],
-            UserRole.VIEWER: [
-                "view_own_po"
-            ]
-        }
-        return permission in role_permissions.get(self.role, [])
+        return permission in ROLE_PERMISSIONS.get(self.role, [])
     
     def can_approve_po(self) -> bool:
         """Check if user can approve purchase orders"""
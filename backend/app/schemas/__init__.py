@@ -1,23 +1,31 @@
 from .auth import Token, TokenData
 from .user import User, UserCreate, UserUpdate, UserInDB
-from .product import Product, ProductCreate, ProductUpdate, ProductList
+from .product import Product, ProductCreate, ProductUpdate, ProductList, ProductWithStock, ProductStockSummary
 from .category import Category, CategoryCreate, CategoryUpdate
 from .inventory import Inventory, InventoryCreate, InventoryUpdate, InventoryList, StockMovement, StockMovementCreate, StockMovementList
 from .supplier import Supplier, SupplierCreate, SupplierUpdate, SupplierList
 from .location import Location, LocationCreate, LocationUpdate, LocationList
 from .purchase_order import PurchaseOrder, PurchaseOrderCreate, PurchaseOrderUpdate, PurchaseOrderList, PurchaseOrderItem, PurchaseOrderItemCreate, PurchaseOrderItemUpdate
 from .stock_alert import StockAlert, StockAlertCreate, StockAlertUpdate, StockAlertList, AlertRule, AlertRuleCreate, AlertRuleUpdate, AlertRuleList
+from .reservation import StockReservation, StockReservationCreate
+from .analytics import PurchaseOrderAnalytics, SupplierSpend, MonthlySpend, StatusBreakdown
+from .dashboard import DashboardSummary, DashboardCounts
+from .replenishment import ReorderPlan, ReorderSuggestionLine, SupplierReorderSuggestion
 from .common import PaginatedResponse
 
 __all__ = [
     "Token", "TokenData",
     "User", "UserCreate", "UserUpdate", "UserInDB",
-    "Product", "ProductCreate", "ProductUpdate", "ProductList",
+    "Product", "ProductCreate", "ProductUpdate", "ProductList", "ProductWithStock", "ProductStockSummary",
     "Category", "CategoryCreate", "CategoryUpdate",
     "Inventory", "InventoryCreate", "InventoryUpdate", "InventoryList", "StockMovement", "StockMovementCreate", "StockMovementList",
     "Supplier", "SupplierCreate", "SupplierUpdate", "SupplierList",
     "Location", "LocationCreate", "LocationUpdate", "LocationList",
     "PurchaseOrder", "PurchaseOrderCreate", "PurchaseOrderUpdate", "PurchaseOrderList", "PurchaseOrderItem", "PurchaseOrderItemCreate", "PurchaseOrderItemUpdate",
     "StockAlert", "StockAlertCreate", "StockAlertUpdate", "StockAlertList", "AlertRule", "AlertRuleCreate", "AlertRuleUpdate", "AlertRuleList",
+    "StockReservation", "StockReservationCreate",
+    "PurchaseOrderAnalytics", "SupplierSpend", "MonthlySpend", "StatusBreakdown",
+    "DashboardSummary", "DashboardCounts",
+    "ReorderPlan", "ReorderSuggestionLine", "SupplierReorderSuggestion",
     "PaginatedResponse"
 ] 
\ No newline at end of file
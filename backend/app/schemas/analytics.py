@@ -0,0 +1,28 @@
+from typing import List
+from pydantic import BaseModel
+from datetime import date
+from app.schemas.purchase_order import PurchaseOrderStatus
+
+class SupplierSpend(BaseModel):
+    supplier_id: int
+    supplier_name: str
+    order_count: int
+    total_amount: float
+
+class MonthlySpend(BaseModel):
+    month: date  # First day of the month
+    order_count: int
+    total_amount: float
+    average_order_value: float
+
+class StatusBreakdown(BaseModel):
+    status: PurchaseOrderStatus
+    order_count: int
+    total_amount: float
+
+class PurchaseOrderAnalytics(BaseModel):
+    start_month: date
+    end_month: date
+    by_supplier: List[SupplierSpend]
+    by_month: List[MonthlySpend]
+    by_status: List[StatusBreakdown]
@@ -0,0 +1,21 @@
+from typing import Dict
+from pydantic import BaseModel
+from datetime import datetime
+
+class DashboardCounts(BaseModel):
+    products: int
+    categories: int
+    inventory_items: int
+    suppliers: int
+    locations: int
+    purchase_orders: int
+    active_alerts: int
+
+class DashboardSummary(BaseModel):
+    counts: DashboardCounts
+    stock_status: Dict[str, int]  # Inventory rows per stock status, every status present
+    purchase_order_status: Dict[str, int]  # Purchase orders per status, every status present
+    active_alerts_by_type: Dict[str, int]  # Active alerts per alert type, every type present
+    inventory_value: float  # FIFO value of stock on hand
+    inventory_average_cost_value: float  # Stock on hand at weighted average cost
+    generated_at: datetime
@@ -1,6 +1,8 @@
 from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime
+from enum import Enum
+from app.models.inventory import StockStatus
 
 class InventoryBase(BaseModel):
     product_id: int
@@ -22,9 +24,13 @@ class InventoryUpdate(BaseModel):
 class Inventory(InventoryBase):
     id: int
     available_quantity: int
+    stock_status: StockStatus = StockStatus.OK
+    average_unit_cost: float = 0.0
+    fifo_value: float = 0.0
     last_restocked: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version_id: int = 1
 
     class Config:
         from_attributes = True
@@ -65,4 +71,23 @@ class StockMovementList(BaseModel):
 
 class StockAdjustmentRequest(BaseModel):
     quantity_change: int
-    notes: Optional[str] = None 
\ No newline at end of file
+    notes: Optional[str] = None
+
+class ValuationGroupBy(str, Enum):
+    PRODUCT = "product"
+    CATEGORY = "category"
+    LOCATION = "location"
+
+class InventoryValuationGroup(BaseModel):
+    group_id: Optional[int] = None
+    name: Optional[str] = None
+    quantity: int
+    fifo_value: float
+    average_cost_value: float
+
+class InventoryValuation(BaseModel):
+    group_by: ValuationGroupBy
+    groups: List[InventoryValuationGroup]
+    total_quantity: int
+    total_fifo_value: float
+    total_average_cost_value: float
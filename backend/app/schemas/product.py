@@ -47,10 +47,25 @@ class Product(ProductBase):
     is_active: Optional[bool] = True
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version_id: int = 1
 
     class Config:
         from_attributes = True
 
+class ProductStockSummary(BaseModel):
+    product_id: int
+    on_hand_quantity: int = 0
+    reserved_quantity: int = 0
+    available_quantity: int = 0
+    location_count: int = 0
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ProductWithStock(Product):
+    stock_summary: Optional[ProductStockSummary] = None
+
 class ProductList(BaseModel):
     products: List[Product]
     total: int
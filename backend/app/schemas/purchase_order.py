@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime, date
 from enum import Enum
 from app.schemas.supplier import Supplier
@@ -95,12 +95,67 @@ class PurchaseOrder(PurchaseOrderBase):
     approved_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version_id: int = 1
     items: List[PurchaseOrderItem] = []
     supplier: Optional[Supplier] = None
 
     class Config:
         from_attributes = True
 
+class PurchaseOrderView(str, Enum):
+    SUMMARY = "summary"
+    FULL = "full"
+
+class PurchaseOrderSummary(BaseModel):
+    """List projection: header fields plus line aggregates computed in SQL"""
+    id: int
+    po_number: str
+    supplier_id: int
+    supplier_name: Optional[str] = None
+    status: PurchaseOrderStatus
+    order_date: date
+    expected_delivery_date: Optional[date] = None
+    delivery_date: Optional[date] = None
+    subtotal: float
+    tax_amount: float
+    shipping_amount: float
+    total_amount: float
+    currency: str
+    created_by: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    version_id: int = 1
+    line_count: int = 0
+    ordered_quantity: int = 0
+    received_quantity: int = 0
+
+class PurchaseOrderReceiptLine(BaseModel):
+    purchase_order_id: int
+    item_id: int
+    received_quantity: int
+
+class PurchaseOrderReceivingSession(BaseModel):
+    """Lines from one or more purchase orders received at a single location"""
+    location_id: int
+    lines: List[PurchaseOrderReceiptLine]
+
+class PurchaseOrderBulkStatusChange(BaseModel):
+    po_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    new_status: PurchaseOrderStatus
+
+class PurchaseOrderStatusOutcome(BaseModel):
+    po_id: int
+    success: bool
+    previous_status: Optional[PurchaseOrderStatus] = None
+    status: Optional[PurchaseOrderStatus] = None
+    detail: Optional[str] = None  # Why the transition was refused
+
+class PurchaseOrderBulkStatusResult(BaseModel):
+    new_status: PurchaseOrderStatus
+    updated: int
+    failed: int
+    results: List[PurchaseOrderStatusOutcome]
+
 class PurchaseOrderList(BaseModel):
     purchase_orders: List[PurchaseOrder]
     total: int
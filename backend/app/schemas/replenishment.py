@@ -0,0 +1,28 @@
+from typing import List
+from pydantic import BaseModel
+from datetime import datetime
+
+class ReorderSuggestionLine(BaseModel):
+    product_id: int
+    sku: str
+    name: str
+    quantity: int  # Suggested order quantity
+    unit_price: float
+    available_quantity: int
+    on_order_quantity: int  # Outstanding on open purchase orders, drafts included
+    daily_demand: float
+    lead_time_days: float
+    reorder_level: int
+    target_level: int
+
+class SupplierReorderSuggestion(BaseModel):
+    supplier_id: int
+    supplier_name: str
+    lines: List[ReorderSuggestionLine]
+    total_amount: float
+
+class ReorderPlan(BaseModel):
+    generated_at: datetime
+    demand_window_days: int
+    sku_count: int  # Products considered
+    suggestions: List[SupplierReorderSuggestion]
@@ -0,0 +1,25 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+from app.models.reservation import ReservationStatus
+
+class StockReservationBase(BaseModel):
+    inventory_item_id: int
+    quantity: int = Field(..., gt=0)
+    reference_type: Optional[str] = None
+    reference_id: Optional[int] = None
+    notes: Optional[str] = None
+
+class StockReservationCreate(StockReservationBase):
+    ttl_seconds: Optional[int] = Field(None, gt=0)  # Defaults to RESERVATION_DEFAULT_TTL_SECONDS
+
+class StockReservation(StockReservationBase):
+    id: int
+    status: ReservationStatus
+    expires_at: datetime
+    released_at: Optional[datetime] = None
+    created_by: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of WebSocket broadcast cost per 1k recipients.
+
+Connects in-memory sockets to a ConnectionManager, broadcasts a stock alert sized
+message and waits until every writer has sent it. Sockets discard what they are sent,
+so the figures are the manager's own cost: serialization, fan-out and queueing. The
+"dumps per recipient" row encodes the message separately for every recipient, as
+send_alert used to, for comparison.
+
+Usage:
+    python benchmark_websocket_broadcast.py                   # 1000 recipients, 200 broadcasts
+    python benchmark_websocket_broadcast.py --recipients 5000 --broadcasts 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.encoding import MSGPACK_AVAILABLE
+from app.core.websocket import ConnectionManager
+
+class NullWebSocket:
+    """Accepts every frame; counts them so the benchmark knows when delivery is done"""
+
+    def __init__(self, subprotocols, counter):
+        self.scope = {"subprotocols": subprotocols}
+        self.counter = counter
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, message):
+        self.counter.sent += 1
+
+    async def send_bytes(self, message):
+        self.counter.sent += 1
+
+    async def close(self, code=1000):
+        pass
+
+class Counter:
+    sent = 0
+
+def alert_message():
+    return {
+        "type": "stock_alert",
+        "data": {
+            "alert_id": 123,
+            "product_id": 42,
+            "product_name": "Benchmark Widget",
+            "location_id": 3,
+            "alert_type": "low_stock",
+            "current_quantity": 4,
+            "threshold_quantity": 10,
+            "message": "Benchmark Widget is below its reorder point at Main Warehouse",
+        },
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+async def drain(counter, expected):
+    while counter.sent < expected:
+        await asyncio.sleep(0)
+
+async def run(recipients, broadcasts, subprotocols, per_recipient_dumps=False):
+    counter = Counter()
+    manager = ConnectionManager(queue_size=broadcasts + 1)
+    sockets = [NullWebSocket(subprotocols, counter) for _ in range(recipients)]
+    for websocket in sockets:
+        await manager.connect(websocket)
+
+    message = alert_message()
+    start = time.perf_counter()
+    for _ in range(broadcasts):
+        if per_recipient_dumps:
+            for websocket in sockets:
+                manager.send_to(websocket, json.dumps(message))
+        else:
+            await manager.broadcast(message)
+    await drain(counter, recipients * broadcasts)
+    elapsed = time.perf_counter() - start
+
+    for websocket in sockets:
+        manager.disconnect(websocket)
+    return elapsed / broadcasts * 1000 / recipients * 1e6  # µs per broadcast per 1k recipients
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure WebSocket broadcast cost")
+    parser.add_argument("--recipients", type=int, default=1000, help="Connected sockets")
+    parser.add_argument("--broadcasts", type=int, default=200, help="Messages broadcast per run")
+    args = parser.parse_args()
+
+    cases = [
+        ("dumps per recipient", ["json"], True),
+        ("encode once, text", ["json"], False),
+    ]
+    if MSGPACK_AVAILABLE:
+        cases.append(("encode once, msgpack", ["msgpack"], False))
+    else:
+        print("msgpack is not installed; skipping binary frames")
+
+    print(f"{args.recipients} recipients, {args.broadcasts} broadcasts")
+    for name, subprotocols, per_recipient_dumps in cases:
+        cost = asyncio.run(run(args.recipients, args.broadcasts, subprotocols, per_recipient_dumps))
+        print(f"{name:<24} {cost:10.0f} µs per broadcast per 1k recipients")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+WebSocket alert load test.
+
+Serves the FastAPI app with uvicorn in this process, opens N concurrent
+``/api/v1/ws/alerts/{user_id}`` connections from client worker processes and drives
+alerts through ``manager.send_alert`` at a fixed rate. Clients run in separate
+processes so the server's memory and event loop are measured on their own.
+
+Reports connection setup time, alert delivery latency percentiles (send_alert call to
+client receipt), server memory per connection and dropped messages (alerts not
+received, plus the manager's eviction counters).
+
+Usage:
+    python loadtest_websocket.py                                  # 1000 clients, 20 alerts/s for 10 s
+    python loadtest_websocket.py --clients 5000 --rate 50 --duration 30 --client-processes 4
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def _raise_file_limit():
+    """Each connection needs a descriptor in the server and one in a client"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def percentiles(values, points=(50, 95, 99)):
+    if not values:
+        return {f"p{point}": None for point in points} | {"max": None}
+    values = sorted(values)
+    result = {f"p{point}": values[min(len(values) - 1, int(len(values) * point / 100))] for point in points}
+    result["max"] = values[-1]
+    return result
+
+
+# Client side (runs in worker processes)
+
+async def _connect(url, semaphore):
+    """Open one connection; returns (websocket, seconds) or (None, None) on failure"""
+    import websockets
+
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            websocket = await websockets.connect(url, max_queue=None, ping_interval=None)
+        except Exception:
+            return None, None
+        return websocket, time.perf_counter() - start
+
+async def _receive(websocket, expected, deadline, latencies):
+    """Collect alert latencies until every alert arrived or the deadline passed"""
+    import websockets
+
+    received = 0
+    try:
+        while received < expected:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                raw = await asyncio.wait_for(websocket.recv(), remaining)
+            except (asyncio.TimeoutError, websockets.ConnectionClosed):
+                break
+            message = json.loads(raw)
+            if message.get("type") == "ping":
+                await websocket.send(json.dumps({"action": "pong"}))
+            elif message.get("type") == "stock_alert" and "loadtest_sent_at" in message["data"]:
+                latencies.append(time.time() - message["data"]["loadtest_sent_at"])
+                received += 1
+    finally:
+        await websocket.close()
+    return received
+
+def _client_worker(base_url, user_ids, expected, deadline, connect_concurrency, ready, results):
+    _raise_file_limit()
+
+    async def run():
+        semaphore = asyncio.Semaphore(connect_concurrency)
+        connections = await asyncio.gather(*(_connect(f"{base_url}/{user_id}", semaphore) for user_id in user_ids))
+        sockets = [websocket for websocket, _ in connections if websocket is not None]
+        ready.put(len(sockets))
+
+        latencies = []
+        received = await asyncio.gather(*(_receive(websocket, expected, deadline, latencies) for websocket in sockets))
+        results.put({
+            "connect_times": [seconds for _, seconds in connections if seconds is not None],
+            "latencies": latencies,
+            "received": sum(received),
+        })
+
+    asyncio.run(run())
+
+
+# Server side
+
+async def run_load_test(args):
+    import uvicorn
+    from app.main import app
+    from app.core.websocket import manager
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    baseline_rss = _rss_bytes()
+    alerts = int(args.rate * args.duration)
+    setup_deadline = time.time() + args.setup_timeout
+    deadline = setup_deadline + args.duration + args.drain
+
+    context = multiprocessing.get_context("spawn")
+    ready, results = context.Queue(), context.Queue()
+    user_ids = list(range(1, args.clients + 1))
+    shards = [user_ids[i::args.client_processes] for i in range(args.client_processes)]
+    workers = [
+        context.Process(target=_client_worker, args=(
+            f"ws://127.0.0.1:{port}/api/v1/ws/alerts", shard, alerts, deadline, args.connect_concurrency, ready, results
+        ))
+        for shard in shards if shard
+    ]
+
+    setup_start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    connected = 0
+    for _ in workers:
+        connected += await asyncio.to_thread(ready.get, True, max(setup_deadline - time.time(), 1))
+    setup_seconds = time.perf_counter() - setup_start
+    while len(manager.clients) < connected and time.time() < setup_deadline:
+        await asyncio.sleep(0.05)
+    connected_rss = _rss_bytes()
+
+    # Drive alerts at a fixed rate; latency is measured from just before send_alert
+    interval = 1 / args.rate
+    send_start = next_send = time.perf_counter()
+    for sequence in range(alerts):
+        await manager.send_alert({
+            "alert_id": sequence,
+            "product_id": sequence % 100 + 1,
+            "location_id": 1,
+            "alert_type": "low_stock",
+            "message": "Load test alert",
+            "loadtest_sent_at": time.time(),
+        })
+        next_send += interval
+        await asyncio.sleep(max(next_send - time.perf_counter(), 0))
+    send_seconds = time.perf_counter() - send_start
+
+    reports = [await asyncio.to_thread(results.get) for _ in workers]
+    for worker in workers:
+        worker.join()
+    server.should_exit = True
+    await server_task
+
+    connect_times = [t for report in reports for t in report["connect_times"]]
+    latencies = [t for report in reports for t in report["latencies"]]
+    received = sum(report["received"] for report in reports)
+    return {
+        "clients": args.clients,
+        "connected": len(connect_times),
+        "setup_seconds": setup_seconds,
+        "connect_ms": {k: v * 1000 for k, v in percentiles(connect_times).items() if v is not None},
+        "server_bytes_per_connection": (connected_rss - baseline_rss) / max(len(connect_times), 1),
+        "alerts_sent": alerts,
+        "send_seconds": send_seconds,
+        "delivered": received,
+        "dropped": alerts * len(connect_times) - received,
+        "latency_ms": {k: v * 1000 for k, v in percentiles(latencies).items() if v is not None},
+        "manager_stats": dict(manager.stats),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test WebSocket alert delivery")
+    parser.add_argument("--clients", type=int, default=1000, help="Concurrent connections")
+    parser.add_argument("--rate", type=float, default=20.0, help="Alerts sent per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of sending")
+    parser.add_argument("--client-processes", type=int, default=2, help="Processes hosting the clients")
+    parser.add_argument("--connect-concurrency", type=int, default=200, help="Connection attempts in flight per process")
+    parser.add_argument("--setup-timeout", type=float, default=60.0, help="Seconds allowed to open every connection")
+    parser.add_argument("--drain", type=float, default=5.0, help="Seconds clients wait for stragglers after sending ends")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    _raise_file_limit()
+    report = asyncio.run(run_load_test(args))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"Connections:     {report['connected']}/{report['clients']} in {report['setup_seconds']:.2f}s")
+    print("Connect time:    " + ", ".join(f"{k} {v:.1f} ms" for k, v in report["connect_ms"].items()))
+    print(f"Server memory:   {report['server_bytes_per_connection'] / 1024:.1f} KiB per connection")
+    print(f"Alerts:          {report['alerts_sent']} sent in {report['send_seconds']:.2f}s")
+    print(f"Delivered:       {report['delivered']} ({report['dropped']} dropped)")
+    print("Latency:         " + ", ".join(f"{k} {v:.1f} ms" for k, v in report["latency_ms"].items()))
+    print("Manager stats:   " + ", ".join(f"{k} {v}" for k, v in report["manager_stats"].items()))
+
+if __name__ == "__main__":
+    main()
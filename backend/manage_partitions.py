@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Stock movement partition maintenance.
+
+Creates upcoming monthly partitions of stock_movements and archives partitions older
+than STOCK_MOVEMENT_RETENTION_MONTHS to gzip-compressed CSV. Safe to run from cron;
+the API's maintenance scheduler runs the same maintenance daily.
+
+Usage:
+    python manage_partitions.py                 # create ahead + archive expired
+    python manage_partitions.py --list          # show attached partitions
+    python manage_partitions.py --archive NAME  # archive one partition, attached or detached
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import engine
+from app.core.partitions import is_partitioned, list_partitions, archive_partition, run_partition_maintenance
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain stock_movements partitions")
+    parser.add_argument("--list", action="store_true", help="List attached partitions")
+    parser.add_argument("--archive", metavar="NAME", help="Archive and drop a partition, detaching it if attached")
+    args = parser.parse_args()
+    
+    if not is_partitioned(engine):
+        print("stock_movements is not partitioned on this database; nothing to do")
+        return 0
+    
+    if args.list:
+        for name in list_partitions(engine):
+            print(name)
+        return 0
+    
+    if args.archive:
+        print(f"Archived to {archive_partition(engine, args.archive)}")
+        return 0
+    
+    result = run_partition_maintenance(engine)
+    print(f"Created partitions: {', '.join(result['created']) or 'none'}")
+    print(f"Archived partitions: {', '.join(result['archived']) or 'none'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
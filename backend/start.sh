@@ -20,4 +20,4 @@ fi
 
 # Start the application
 echo "Starting FastAPI application..."
-exec python -m uvicorn main:app --host 0.0.0.0 --port $PORT 
\ No newline at end of file
+exec python -m uvicorn main:app --host 0.0.0.0 --port $PORT --ws-per-message-deflate ${WEBSOCKET_PER_MESSAGE_DEFLATE:-true} 
\ No newline at end of file
@@ -6,6 +6,7 @@ from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.core.database import get_db, Base
+from app.core.principals import principal_cache
 from app.core.security import create_access_token, get_password_hash
 from app.models.user import User, UserRole
 
@@ -27,6 +28,8 @@ def db_session():
     """Create a fresh database session for each test"""
     # Create tables
     Base.metadata.create_all(bind=engine)
+    # Tokens minted in the same second are identical across tests
+    principal_cache.clear()
     
     # Create session
     session = TestingSessionLocal()
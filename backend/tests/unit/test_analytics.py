@@ -0,0 +1,75 @@
+import pytest
+
+from app.models.product import Product
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderStatus
+from app.models.purchase_order_rollup import PurchaseOrderRollup
+from app.models.supplier import Supplier
+
+class TestPurchaseOrderAnalytics:
+    """Test purchase order analytics endpoints"""
+
+    @pytest.fixture
+    def test_data(self, client, db_session, admin_headers):
+        """Create two suppliers and a product"""
+        suppliers = [Supplier(name="Acme", code="ACME"), Supplier(name="Globex", code="GLBX")]
+        product = Product(name="Analytics Product", sku="AN001", price=10.0)
+        db_session.add_all([*suppliers, product])
+        db_session.commit()
+        return {"client": client, "db": db_session, "headers": admin_headers, "suppliers": suppliers, "product": product}
+
+    def _create(self, test_data, supplier, order_date, quantity):
+        response = test_data["client"].post(
+            "/api/v1/purchase-orders/",
+            json={
+                "supplier_id": supplier.id,
+                "order_date": order_date,
+                "items": [{"product_id": test_data["product"].id, "quantity": quantity, "unit_price": 10.0}],
+            },
+            headers=test_data["headers"]
+        )
+        assert response.status_code == 200
+        return response.json()["id"]
+
+    def test_analytics_follow_purchase_order_changes(self, test_data):
+        """Test the rollup tracks creates, status and supplier changes, and deletes"""
+        db = test_data["db"]
+        acme, globex = test_data["suppliers"]
+        self._create(test_data, acme, "2026-01-05", 10)
+        self._create(test_data, acme, "2026-01-20", 5)
+        cancelled_id = self._create(test_data, globex, "2026-02-03", 2)
+        moved_id = self._create(test_data, globex, "2026-02-10", 3)
+        deleted_id = self._create(test_data, acme, "2026-02-11", 1)
+        self._create(test_data, acme, "2025-06-01", 7)  # Outside the window
+
+        db.get(PurchaseOrder, cancelled_id).status = PurchaseOrderStatus.CANCELLED
+        db.get(PurchaseOrder, moved_id).supplier_id = acme.id
+        db.delete(db.get(PurchaseOrder, deleted_id))
+        db.commit()
+
+        response = test_data["client"].get(
+            "/api/v1/analytics/purchase-orders?end_month=2026-02-01&months=3",
+            headers=test_data["headers"]
+        )
+        assert response.status_code == 200
+        data = response.json()
+
+        assert (data["start_month"], data["end_month"]) == ("2025-12-01", "2026-02-01")
+        assert data["by_supplier"] == [
+            {"supplier_id": acme.id, "supplier_name": "Acme", "order_count": 3, "total_amount": 180.0}
+        ]
+        assert data["by_month"] == [
+            {"month": "2026-01-01", "order_count": 2, "total_amount": 150.0, "average_order_value": 75.0},
+            {"month": "2026-02-01", "order_count": 1, "total_amount": 30.0, "average_order_value": 30.0},
+        ]
+        assert data["by_status"] == [
+            {"status": "draft", "order_count": 3, "total_amount": 180.0},
+            {"status": "cancelled", "order_count": 1, "total_amount": 20.0},
+        ]
+
+        # Rows emptied by the changes remain with zero counts and are filtered out
+        assert db.query(PurchaseOrderRollup).filter(PurchaseOrderRollup.po_count < 0).count() == 0
+
+    def test_analytics_require_report_permission(self, test_data, staff_headers):
+        """Test analytics are limited to users who can view reports"""
+        response = test_data["client"].get("/api/v1/analytics/purchase-orders/by-status", headers=staff_headers)
+        assert response.status_code == 403
@@ -1,5 +1,6 @@
 import pytest
 from fastapi import status
+from sqlalchemy import event
 from app.core.security import verify_password, get_password_hash, create_password_reset_token, verify_password_reset_token
 
 class TestAuthEndpoints:
@@ -272,4 +273,162 @@ class TestSecurityFunctions:
         
         # Test invalid token
         invalid_email = verify_password_reset_token("invalid_token")
-        assert invalid_email is None 
\ No newline at end of file
+        assert invalid_email is None     
+    def test_cached_principal_skips_user_lookup(self, client, admin_headers, db_session):
+        """Test repeat requests with one token authenticate without querying users"""
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            for _ in range(3):
+                assert client.get("/api/v1/users/roles/available", headers=admin_headers).status_code == status.HTTP_200_OK
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        
+        assert len([statement for statement in statements if "FROM users" in statement]) == 1
+    
+    def test_user_changes_invalidate_cached_principal(self, client, admin_headers, staff_headers, staff_user):
+        """Test deactivating a user takes effect on their next request"""
+        assert client.get("/api/v1/users/me", headers=staff_headers).status_code == status.HTTP_200_OK
+        
+        response = client.put(f"/api/v1/users/{staff_user.id}", json={"is_active": False}, headers=admin_headers)
+        assert response.status_code == status.HTTP_200_OK
+        
+        response = client.get("/api/v1/users/me", headers=staff_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Inactive user"
+    
+    def test_login_rehashes_password_at_configured_cost(self, client, db_session):
+        """Test a hash made at an old bcrypt cost is upgraded on successful login"""
+        from passlib.hash import bcrypt
+        from app.core.config import settings
+        from app.models.user import User, UserRole
+        
+        user = User(
+            email="legacy@test.com",
+            username="legacy_test",
+            hashed_password=bcrypt.using(rounds=4).hash("password123"),
+            role=UserRole.STAFF,
+            is_active=True
+        )
+        db_session.add(user)
+        db_session.commit()
+        
+        response = client.post(
+            "/api/v1/auth/login",
+            data={"username": user.username, "password": "password123"},
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        
+        assert response.status_code == status.HTTP_200_OK
+        db_session.refresh(user)
+        assert user.hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+        assert verify_password("password123", user.hashed_password)
+    
+    def test_password_hasher_rejects_work_when_saturated(self):
+        """Test the hashing pool answers 503 instead of queueing beyond its limit"""
+        import threading
+        from fastapi import HTTPException
+        from app.core.password_hashing import PasswordHasher
+        
+        hasher = PasswordHasher(workers=1, max_pending=1)
+        started, release = threading.Event(), threading.Event()
+        def hold_slot():
+            started.set()
+            release.wait()
+        busy = threading.Thread(target=hasher.run, args=(hold_slot,))
+        busy.start()
+        started.wait()
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                hasher.run(lambda: None)
+            assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert exc_info.value.headers["Retry-After"] == "1"
+            assert hasher.rejected == 1
+        finally:
+            release.set()
+            busy.join()
+        
+        assert hasher.run(lambda: "ok") == "ok"
+
+class TestRefreshTokens:
+    """Test refresh token rotation and revocation"""
+    
+    def login(self, client, user):
+        response = client.post(
+            "/api/v1/auth/login",
+            data={"username": user.username, "password": "admin123"},
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+    
+    def test_refresh_rotates_tokens_without_password_hashing(self, client, admin_user, monkeypatch):
+        """Test a refresh token buys a new token pair and is single-use"""
+        from app.core.password_hashing import password_hasher
+        tokens = self.login(client, admin_user)
+        assert tokens["refresh_token"]
+        
+        def fail(*args):
+            raise AssertionError("refresh must not hash passwords")
+        monkeypatch.setattr(password_hasher, "run", fail)
+        
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == status.HTTP_200_OK
+        rotated = response.json()
+        assert rotated["refresh_token"] != tokens["refresh_token"]
+        assert rotated["expires_in"] > 0
+        
+        headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+        assert client.get("/api/v1/users/me", headers=headers).json()["username"] == admin_user.username
+    
+    def test_reused_refresh_token_revokes_its_family(self, client, admin_user):
+        """Test replaying a rotated token ends the login for both holders"""
+        tokens = self.login(client, admin_user)
+        other_login = self.login(client, admin_user)
+        rotated = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+        
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        
+        # Other logins of the same user are unaffected
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": other_login["refresh_token"]})
+        assert response.status_code == status.HTTP_200_OK
+    
+    def test_logout_and_password_reset_revoke_refresh_tokens(self, client, admin_user):
+        """Test refresh tokens stop working after logout or a password reset"""
+        tokens = self.login(client, admin_user)
+        assert client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}).status_code == status.HTTP_200_OK
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        
+        tokens = self.login(client, admin_user)
+        response = client.post("/api/v1/auth/reset-password", json={
+            "email": admin_user.email,
+            "token": create_password_reset_token(admin_user.email),
+            "new_password": "newpassword123"
+        })
+        assert response.status_code == status.HTTP_200_OK
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_expired_refresh_token_is_rejected_and_purged(self, client, admin_user, db_session):
+        """Test an expired refresh token no longer works and is removed by maintenance"""
+        from datetime import datetime, timedelta
+        from app.core.refresh_tokens import purge_expired_refresh_tokens
+        from app.models.refresh_token import RefreshToken
+        from tests.conftest import engine
+        
+        tokens = self.login(client, admin_user)
+        db_session.query(RefreshToken).update({RefreshToken.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+        db_session.commit()
+        
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert purge_expired_refresh_tokens(engine) == 1
+        assert db_session.query(RefreshToken).count() == 0
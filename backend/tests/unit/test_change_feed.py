@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.change_feed import ChangeFeed, change_feed
+from app.core.config import settings
+from app.core.websocket import ConnectionManager
+from app.models.change_event import ChangeEvent
+from app.models.inventory import Inventory
+from app.models.location import Location
+from app.models.product import Product
+from tests.unit.test_websocket import FakeWebSocket
+
+class TestChangeFeed:
+    """Test the inventory change stream and resume"""
+
+    def _stock(self, db_session):
+        product = Product(name="Feed Product", sku="FEED001", price=1.0, reorder_point=5)
+        location = Location(name="Feed Location", code="FEED-LOC")
+        db_session.add_all([product, location])
+        db_session.commit()
+        return product, location
+
+    def test_committed_changes_reach_subscribers(self, db_session):
+        """Test a commit publishes compact deltas with sequence numbers to matching topics only"""
+        product, location = self._stock(db_session)
+
+        async def scenario():
+            manager = ConnectionManager()
+            await change_feed.start(manager)
+            watcher, elsewhere = FakeWebSocket(), FakeWebSocket()
+            await manager.connect(watcher)
+            await manager.connect(elsewhere)
+            manager.subscribe(watcher, [f"location:{location.id}"])
+            manager.subscribe(elsewhere, [f"location:{location.id + 1}"])
+
+            item = Inventory(product_id=product.id, location_id=location.id, quantity=10, available_quantity=10)
+            db_session.add(item)
+            db_session.commit()
+            item.quantity = 2
+            db_session.commit()
+            for _ in range(3):
+                await asyncio.sleep(0)
+            await change_feed.stop()
+            return watcher, elsewhere, item.id
+
+        watcher, elsewhere, item_id = asyncio.run(scenario())
+
+        created, updated = [json.loads(message) for message in watcher.sent]
+        assert created["type"] == "change" and created["op"] == "created"
+        assert (created["entity"], created["id"]) == ("inventory", item_id)
+        assert created["fields"]["quantity"] == 10
+        assert updated["op"] == "updated"
+        assert updated["seq"] > created["seq"]
+        assert updated["fields"] == {"quantity": 2, "stock_status": "low", "version_id": 2}
+        assert elsewhere.sent == []
+        assert db_session.query(ChangeEvent).count() == 2
+
+    def test_resume_replays_missed_changes_from_database(self, db_session, monkeypatch):
+        """Test a client resuming from an old sequence gets what it missed, or a reset when too far behind"""
+        product, location = self._stock(db_session)
+        item = Inventory(product_id=product.id, location_id=location.id, quantity=10, available_quantity=10)
+        db_session.add(item)
+        db_session.commit()
+        for quantity in (8, 6):
+            item.quantity = quantity
+            db_session.commit()
+        sequences = [event.id for event in db_session.query(ChangeEvent).order_by(ChangeEvent.id)]
+
+        async def scenario():
+            # A fresh worker: nothing buffered, so the gap is read from change_events
+            feed = ChangeFeed(sessionmaker(bind=db_session.get_bind()))
+            manager = ConnectionManager()
+            await feed.start(manager)
+            resuming, lagging = FakeWebSocket(), FakeWebSocket()
+            await manager.connect(resuming)
+            await manager.connect(lagging)
+
+            await feed.handle_client_message(resuming, {"action": "resume", "since": sequences[0]})
+            monkeypatch.setattr(settings, "CHANGE_FEED_MAX_REPLAY", 1)
+            await feed.handle_client_message(lagging, {"action": "resume", "since": sequences[0]})
+            await asyncio.sleep(0)
+            await feed.stop()
+            return resuming, lagging
+
+        resuming, lagging = asyncio.run(scenario())
+
+        replayed = [json.loads(message) for message in resuming.sent]
+        assert [message.get("seq") for message in replayed[:-1]] == sequences[1:]
+        assert [message["fields"]["quantity"] for message in replayed[:-1]] == [8, 6]
+        assert replayed[-1] == {"type": "resumed", "sequence": sequences[-1]}
+        assert [json.loads(message) for message in lagging.sent] == [{"type": "reset", "sequence": sequences[-1]}]
+
+    def test_reclassification_by_product_levels_is_recorded(self, db_session):
+        """Test rows reclassified by a bulk status update still produce change events"""
+        product, location = self._stock(db_session)
+        item = Inventory(product_id=product.id, location_id=location.id, quantity=10, available_quantity=10)
+        db_session.add(item)
+        db_session.commit()
+
+        product.reorder_point = 20
+        db_session.commit()
+
+        event = db_session.query(ChangeEvent).order_by(ChangeEvent.id.desc()).first()
+        assert (event.entity, event.entity_id, event.op) == ("inventory", item.id, "updated")
+        assert json.loads(event.fields) == {"stock_status": "low", "version_id": item.version_id}
+        assert f"location:{location.id}" in json.loads(event.topics)
+
+    def test_old_change_events_are_purged_by_maintenance(self, db_session):
+        """Test the maintenance purge enforces CHANGE_FEED_RETENTION_HOURS"""
+        from datetime import datetime, timedelta
+        from app.core.change_feed import purge_change_events
+        from tests.conftest import engine
+
+        product, location = self._stock(db_session)
+        for quantity in (1, 2):
+            db_session.add(Inventory(product_id=product.id, location_id=location.id, quantity=quantity, available_quantity=quantity))
+            db_session.commit()
+        old, recent = db_session.query(ChangeEvent).order_by(ChangeEvent.id).all()
+        old.created_at = datetime.utcnow() - timedelta(hours=settings.CHANGE_FEED_RETENTION_HOURS + 1)
+        db_session.commit()
+
+        assert purge_change_events(engine) == 1
+        assert [event.id for event in db_session.query(ChangeEvent)] == [recent.id]
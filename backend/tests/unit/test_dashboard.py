@@ -0,0 +1,91 @@
+import pytest
+from datetime import date
+
+from app.core.dashboard import summary_cache
+from app.models.category import Category
+from app.models.inventory import Inventory
+from app.models.location import Location
+from app.models.product import Product
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderStatus
+from app.models.stock_alert import StockAlert, AlertType
+from app.models.supplier import Supplier
+
+class TestDashboardSummary:
+    """Test the dashboard summary endpoint"""
+
+    @pytest.fixture
+    def test_data(self, client, db_session, admin_user, staff_user, admin_headers):
+        """Create stock at two levels, purchase orders by two users and an alert"""
+        summary_cache.clear()
+        supplier = Supplier(name="Dashboard Supplier", code="DASH")
+        location = Location(name="Dashboard Location", code="DASH-LOC")
+        products = [
+            Product(name="Stocked", sku="DASH001", price=10.0, reorder_point=10),
+            Product(name="Empty", sku="DASH002", price=10.0, reorder_point=10),
+        ]
+        db_session.add_all([supplier, location, *products])
+        db_session.commit()
+
+        db_session.add_all([
+            Inventory(product_id=products[0].id, location_id=location.id, quantity=100,
+                      available_quantity=100, average_unit_cost=8.0, fifo_value=800.0),
+            Inventory(product_id=products[1].id, location_id=location.id, quantity=0, available_quantity=0),
+            StockAlert(product_id=products[1].id, location_id=location.id, alert_type=AlertType.OUT_OF_STOCK,
+                       current_quantity=0, threshold_quantity=10, message="Out of stock"),
+            *[
+                PurchaseOrder(po_number=f"PO-DASH-{i}", supplier_id=supplier.id, order_date=date(2026, 1, 1),
+                              status=status, created_by=creator.id)
+                for i, (status, creator) in enumerate([
+                    (PurchaseOrderStatus.DRAFT, admin_user),
+                    (PurchaseOrderStatus.APPROVED, admin_user),
+                    (PurchaseOrderStatus.DRAFT, staff_user),
+                ])
+            ],
+        ])
+        db_session.commit()
+        return {"client": client, "db": db_session, "headers": admin_headers}
+
+    def _summary(self, test_data, headers=None):
+        response = test_data["client"].get("/api/v1/dashboard/summary", headers=headers or test_data["headers"])
+        assert response.status_code == 200
+        return response.json()
+
+    def test_dashboard_summary(self, test_data):
+        """Test counts, breakdowns and inventory value"""
+        data = self._summary(test_data)
+
+        assert data["counts"] == {
+            "products": 2,
+            "categories": 0,
+            "inventory_items": 2,
+            "suppliers": 1,
+            "locations": 1,
+            "purchase_orders": 3,
+            "active_alerts": 1,
+        }
+        assert data["stock_status"] == {"ok": 1, "low": 0, "out": 1, "over": 0}
+        assert data["purchase_order_status"]["draft"] == 2
+        assert data["purchase_order_status"]["approved"] == 1
+        assert data["purchase_order_status"]["cancelled"] == 0
+        assert data["active_alerts_by_type"]["out_of_stock"] == 1
+        assert data["inventory_value"] == 800.0
+        assert data["inventory_average_cost_value"] == 800.0
+
+    def test_dashboard_summary_cached_until_write(self, test_data):
+        """Test the summary is served from cache until a commit writes a summarized table"""
+        first = self._summary(test_data)
+        assert self._summary(test_data)["generated_at"] == first["generated_at"]
+
+        test_data["db"].add(Category(name="New Category"))
+        test_data["db"].commit()
+
+        refreshed = self._summary(test_data)
+        assert refreshed["generated_at"] != first["generated_at"]
+        assert refreshed["counts"]["categories"] == 1
+
+    def test_dashboard_summary_scopes_purchase_orders(self, test_data, staff_headers):
+        """Test staff only see their own purchase orders in the summary"""
+        data = self._summary(test_data, staff_headers)
+        assert data["counts"]["purchase_orders"] == 1
+        assert data["purchase_order_status"]["draft"] == 1
+        assert data["counts"]["products"] == 2
@@ -5,7 +5,7 @@ from unittest.mock import patch
 
 from app.main import app
 from app.core.database import get_db
-from app.models.inventory import Inventory, StockMovement, StockMovementType
+from app.models.inventory import Inventory, StockMovement, StockMovementType, StockStatus
 from app.models.location import Location
 from app.models.product import Product
 from app.models.user import User, UserRole
@@ -212,6 +212,22 @@ class TestInventoryEndpoints:
         assert data["notes"] == "Updated inventory item"
         assert data["available_quantity"] == 140  # 150 - 10 (reserved)
     
+    def test_update_inventory_item_if_match(self, test_data):
+        """Test updates carry an ETag and stale If-Match values are rejected"""
+        client = test_data["client"]
+        url = f"/api/v1/inventory/{test_data['inventory_item'].id}"
+        
+        etag = client.get(url, headers=test_data["admin_headers"]).headers["ETag"]
+        
+        response = client.put(url, json={"notes": "First edit"}, headers={**test_data["admin_headers"], "If-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        
+        # A second editor still holding the original ETag loses
+        response = client.put(url, json={"notes": "Second edit"}, headers={**test_data["admin_headers"], "If-Match": etag})
+        assert response.status_code == 412
+        assert client.get(url, headers=test_data["admin_headers"]).json()["notes"] == "First edit"
+    
     def test_update_inventory_item_not_found(self, client, admin_headers):
         """Test updating non-existent inventory item"""
         update_data = {"quantity": 150}
@@ -318,6 +334,52 @@ class TestInventoryEndpoints:
         assert response.status_code == 400
         assert "Insufficient stock" in response.json()["detail"]
     
+    def test_stock_writes_with_idempotency_key(self, test_data):
+        """Test retried writes with the same Idempotency-Key are applied once"""
+        client = test_data["client"]
+        item_id = test_data["inventory_item"].id
+        headers = {**test_data["admin_headers"], "Idempotency-Key": "movement-1"}
+        movement_data = {"movement_type": "in", "quantity": 25}
+        
+        first = client.post(f"/api/v1/inventory/{item_id}/stock-movement", json=movement_data, headers=headers)
+        retry = client.post(f"/api/v1/inventory/{item_id}/stock-movement", json=movement_data, headers=headers)
+        
+        assert first.status_code == retry.status_code == 200
+        assert retry.json()["id"] == first.json()["id"]
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        
+        # Reusing the key for a different payload is rejected
+        response = client.post(
+            f"/api/v1/inventory/{item_id}/stock-movement",
+            json={"movement_type": "in", "quantity": 5},
+            headers=headers
+        )
+        assert response.status_code == 422
+        
+        headers["Idempotency-Key"] = "adjust-1"
+        for _ in range(2):
+            response = client.post(f"/api/v1/inventory/{item_id}/adjust-stock", json={"quantity_change": -10}, headers=headers)
+            assert response.json()["new_quantity"] == 115  # 100 + 25 - 10
+        
+        item = client.get(f"/api/v1/inventory/{item_id}", headers=test_data["admin_headers"]).json()
+        assert item["quantity"] == 115
+    
+    def test_expired_idempotency_keys_are_purged_by_maintenance(self, test_data, db_session):
+        """Test the maintenance purge removes keys past their replay window"""
+        from datetime import datetime, timedelta
+        from app.core.idempotency import purge_expired_keys
+        from app.models.idempotency_key import IdempotencyKey
+        from tests.conftest import engine
+        
+        headers = {**test_data["admin_headers"], "Idempotency-Key": "movement-1"}
+        url = f"/api/v1/inventory/{test_data['inventory_item'].id}/stock-movement"
+        assert test_data["client"].post(url, json={"movement_type": "in", "quantity": 1}, headers=headers).status_code == 200
+        db_session.query(IdempotencyKey).update({IdempotencyKey.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+        db_session.commit()
+        
+        assert purge_expired_keys(engine) == 1
+        assert db_session.query(IdempotencyKey).count() == 0
+    
     def test_get_stock_movements_success(self, test_data):
         """Test getting stock movements for inventory item"""
         
@@ -389,7 +451,7 @@ class TestInventoryEndpoints:
         assert data["new_quantity"] == 80  # 100 - 20
     
     def test_adjust_stock_below_zero(self, test_data):
-        """Test adjusting stock below zero (should clamp to 0)"""
+        """Test adjusting stock below zero (should clamp at the reserved quantity)"""
         adjustment_data = {
             "quantity_change": -150,  # More than available (100)
             "notes": "Manual stock reduction"
@@ -403,7 +465,8 @@ class TestInventoryEndpoints:
         
         assert response.status_code == 200
         data = response.json()
-        assert data["new_quantity"] == 0  # Should clamp to 0
+        assert data["new_quantity"] == 10  # Reserved stock (10) is left in place
+        assert data["available_quantity"] == 0
     
     def test_get_low_stock_items(self, test_data):
         """Test getting low stock items"""
@@ -420,9 +483,10 @@ class TestInventoryEndpoints:
         
         assert response.status_code == 200
         data = response.json()
-        assert isinstance(data, list)
+        assert data["total"] == 1
+        assert data["data"][0]["stock_status"] == "low"
         # Should include our test item since quantity (30) <= reorder_point (50)
-        inventory_ids = [item["id"] for item in data]
+        inventory_ids = [item["id"] for item in data["data"]]
         assert test_data["inventory_item"].id in inventory_ids
     
     def test_get_out_of_stock_items(self, test_data):
@@ -436,7 +500,83 @@ class TestInventoryEndpoints:
         
         assert response.status_code == 200
         data = response.json()
-        assert isinstance(data, list)
+        assert data["total"] == 1
+        assert data["data"][0]["stock_status"] == "out"
         # Should include our test item since quantity is 0
-        inventory_ids = [item["id"] for item in data]
-        assert test_data["inventory_item"].id in inventory_ids 
\ No newline at end of file
+        inventory_ids = [item["id"] for item in data["data"]]
+        assert test_data["inventory_item"].id in inventory_ids
+    
+    def test_stock_status_follows_quantity_changes(self, test_data):
+        """Test stock status is reclassified by movements and product stock levels"""
+        client = test_data["client"]
+        headers = test_data["admin_headers"]
+        item_id = test_data["inventory_item"].id
+        
+        # 100 on hand with reorder point 10
+        response = client.get(f"/api/v1/inventory/{item_id}", headers=headers)
+        assert response.json()["stock_status"] == "ok"
+        
+        client.post(f"/api/v1/inventory/{item_id}/adjust-stock", json={"quantity_change": -95}, headers=headers)
+        response = client.get(f"/api/v1/inventory/{item_id}", headers=headers)
+        assert response.json()["stock_status"] == "low"
+        
+        etag = response.headers["ETag"]
+        
+        # Lowering the reorder point reclassifies existing rows, with a new version
+        client.put(f"/api/v1/products/{test_data['product'].id}", json={"reorder_point": 2}, headers=headers)
+        response = client.get("/api/v1/inventory/?stock_status=ok", headers=headers)
+        assert [item["id"] for item in response.json()["data"]] == [item_id]
+        assert test_data["inventory_item"].stock_status == StockStatus.OK
+        response = client.get(f"/api/v1/inventory/{item_id}", headers=headers)
+        assert response.headers["ETag"] != etag
+        
+        client.put(f"/api/v1/products/{test_data['product'].id}", json={"max_stock_level": 3}, headers=headers)
+        response = client.get("/api/v1/inventory/overstock", headers=headers)
+        assert response.json()["total"] == 1
+    
+    def test_inventory_valuation_fifo_and_average(self, test_data):
+        """Test valuation follows FIFO layers and running weighted average cost"""
+        client = test_data["client"]
+        headers = test_data["admin_headers"]
+        
+        location = Location(name="Valuation Location", code="VAL-LOC")
+        db = test_data["client"].app.dependency_overrides[get_db]().__next__()
+        db.add(location)
+        db.commit()
+        
+        response = client.post(
+            "/api/v1/inventory/",
+            json={"product_id": test_data["product"].id, "location_id": location.id, "quantity": 10, "unit_cost": 2.0},
+            headers=headers
+        )
+        item_id = response.json()["id"]
+        
+        client.post(
+            f"/api/v1/inventory/{item_id}/stock-movement",
+            json={"movement_type": "in", "quantity": 10, "unit_cost": 4.0},
+            headers=headers
+        )
+        response = client.post(
+            f"/api/v1/inventory/{item_id}/stock-movement",
+            json={"movement_type": "out", "quantity": 15},
+            headers=headers
+        )
+        # FIFO issue: 10 @ 2.0 + 5 @ 4.0
+        assert response.json()["unit_cost"] == pytest.approx(40.0 / 15)
+        
+        item = client.get(f"/api/v1/inventory/{item_id}", headers=headers).json()
+        assert item["quantity"] == 5
+        assert item["fifo_value"] == pytest.approx(20.0)  # 5 @ 4.0 left
+        assert item["average_unit_cost"] == pytest.approx(3.0)
+        
+        response = client.get(
+            f"/api/v1/inventory/valuation?group_by=location&location_id={location.id}",
+            headers=headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["group_by"] == "location"
+        assert data["groups"][0]["name"] == "Valuation Location"
+        assert data["total_quantity"] == 5
+        assert data["total_fifo_value"] == pytest.approx(20.0)
+        assert data["total_average_cost_value"] == pytest.approx(15.0)
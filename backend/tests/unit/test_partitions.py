@@ -0,0 +1,52 @@
+import asyncio
+from datetime import date
+
+from app.core.partitions import _add_months, partition_name, ensure_future_partitions, expired_partitions, PARTITION_NAME_RE
+from app.core.maintenance import MaintenanceScheduler, maintenance_scheduler
+from tests.conftest import engine
+
+class TestStockMovementPartitions:
+    """Test monthly partition helpers for the stock movement ledger"""
+    
+    def test_add_months_wraps_years(self):
+        """Test month arithmetic across year boundaries"""
+        assert _add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert _add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    
+    def test_partition_name(self):
+        """Test partition names are sortable and recognised"""
+        name = partition_name(date(2026, 3, 1))
+        assert name == "stock_movements_p2026_03"
+        assert PARTITION_NAME_RE.match(name)
+        assert not PARTITION_NAME_RE.match("stock_movements_default")
+    
+    def test_maintenance_is_noop_without_partitioning(self, db_session):
+        """Test maintenance does nothing on databases without declarative partitioning"""
+        assert ensure_future_partitions(engine) == []
+        assert expired_partitions(engine) == []
+    
+    def test_partition_maintenance_is_scheduled(self):
+        """Test the app's maintenance scheduler runs partition maintenance"""
+        assert "stock movement partitions" in [job.name for job in maintenance_scheduler.jobs]
+    
+    def test_failing_job_does_not_stop_others(self):
+        """Test each maintenance job runs on its own task and survives errors"""
+        runs = []
+        def failing():
+            runs.append("failing")
+            raise RuntimeError("boom")
+        
+        async def scenario():
+            scheduler = MaintenanceScheduler(startup_delay=0)
+            scheduler.add_job("failing", failing, 0.01)
+            scheduler.add_job("healthy", lambda: runs.append("healthy"), 0.01)
+            await scheduler.start()
+            for _ in range(100):
+                if runs.count("failing") >= 2 and runs.count("healthy") >= 2:
+                    break
+                await asyncio.sleep(0.01)
+            await scheduler.stop()
+        
+        asyncio.run(scenario())
+        assert runs.count("failing") >= 2
+        assert runs.count("healthy") >= 2
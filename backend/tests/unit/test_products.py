@@ -0,0 +1,112 @@
+import pytest
+
+from app.models.inventory import Inventory
+from app.models.location import Location
+from app.models.product import Product
+from app.models.product_stock_summary import ProductStockSummary
+
+class TestProductStockSummary:
+    """Test the per-product stock summary maintained from inventory writes"""
+
+    @pytest.fixture
+    def test_data(self, client, db_session, admin_headers):
+        """Create a product stocked in two locations"""
+        product = Product(name="Summary Product", sku="SUM001", price=10.0, reorder_point=10)
+        db_session.add(product)
+
+        locations = [
+            Location(name="Main Warehouse", code="SUM-LOC1"),
+            Location(name="Overflow Warehouse", code="SUM-LOC2"),
+        ]
+        db_session.add_all(locations)
+        db_session.commit()
+
+        items = [
+            Inventory(product_id=product.id, location_id=locations[0].id, quantity=100, reserved_quantity=10, available_quantity=90),
+            Inventory(product_id=product.id, location_id=locations[1].id, quantity=40, reserved_quantity=0, available_quantity=40),
+        ]
+        db_session.add_all(items)
+        db_session.commit()
+
+        return {
+            "client": client,
+            "db": db_session,
+            "admin_headers": admin_headers,
+            "product": product,
+            "locations": locations,
+            "items": items,
+        }
+
+    def test_summary_created_with_inventory(self, test_data):
+        """Test summary row reflects inventory inserted directly through the session"""
+        summary = test_data["db"].get(ProductStockSummary, test_data["product"].id)
+        test_data["db"].refresh(summary)
+
+        assert summary.on_hand_quantity == 140
+        assert summary.reserved_quantity == 10
+        assert summary.available_quantity == 130
+        assert summary.location_count == 2
+
+    def test_get_product_stock(self, test_data):
+        """Test getting stock totals for a product"""
+        response = test_data["client"].get(f"/api/v1/products/{test_data['product'].id}/stock")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["product_id"] == test_data["product"].id
+        assert data["on_hand_quantity"] == 140
+        assert data["available_quantity"] == 130
+        assert data["location_count"] == 2
+
+    def test_get_product_stock_not_found(self, client):
+        """Test getting stock for a non-existent product"""
+        response = client.get("/api/v1/products/99999/stock")
+        assert response.status_code == 404
+
+    def test_stock_follows_movements_and_adjustments(self, test_data):
+        """Test summary is updated by stock movements, adjustments and deletes"""
+        client = test_data["client"]
+        headers = test_data["admin_headers"]
+        first, second = test_data["items"]
+
+        client.post(
+            f"/api/v1/inventory/{first.id}/stock-movement",
+            json={"movement_type": "out", "quantity": 25},
+            headers=headers
+        )
+        client.post(
+            f"/api/v1/inventory/{second.id}/adjust-stock",
+            json={"quantity_change": 5},
+            headers=headers
+        )
+
+        data = client.get(f"/api/v1/products/{test_data['product'].id}/stock").json()
+        assert data["on_hand_quantity"] == 120  # 140 - 25 + 5
+        assert data["available_quantity"] == 110
+
+        client.delete(f"/api/v1/inventory/{second.id}", headers=headers)
+
+        data = client.get(f"/api/v1/products/{test_data['product'].id}/stock").json()
+        assert data["on_hand_quantity"] == 75
+        assert data["location_count"] == 1
+
+    def test_product_list_embeds_stock(self, test_data):
+        """Test stock totals are embedded on product list when requested"""
+        response = test_data["client"].get("/api/v1/products/?include_stock=true")
+
+        assert response.status_code == 200
+        product = response.json()["data"][0]
+        assert product["stock_summary"]["on_hand_quantity"] == 140
+        assert product["stock_summary"]["available_quantity"] == 130
+
+    def test_update_product_if_match(self, test_data):
+        """Test product updates honour If-Match"""
+        client = test_data["client"]
+        url = f"/api/v1/products/{test_data['product'].id}"
+
+        etag = client.get(url).headers["ETag"]
+        assert client.put(url, json={"price": 12.0}, headers={"If-Match": '"999"'}).status_code == 412
+
+        response = client.put(url, json={"price": 12.0}, headers={"If-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["version_id"] == int(etag.strip('"')) + 1
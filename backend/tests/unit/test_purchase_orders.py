@@ -0,0 +1,324 @@
+import pytest
+
+from app.core.po_numbers import PONumberAllocator
+from app.models.location import Location
+from app.models.product import Product
+from app.models.purchase_order import PurchaseOrderItem
+from app.models.supplier import Supplier
+
+class TestPurchaseOrderEndpoints:
+    """Test purchase order endpoints"""
+
+    @pytest.fixture
+    def test_data(self, client, db_session, admin_headers):
+        """Create a supplier, three products and a receiving location"""
+        supplier = Supplier(name="Test Supplier", code="SUP001")
+        products = [
+            Product(name=f"PO Product {i}", sku=f"PO00{i}", price=10.0 * i)
+            for i in range(1, 4)
+        ]
+        location = Location(name="Receiving Dock", code="DOCK-1")
+        db_session.add_all([supplier, location, *products])
+        db_session.commit()
+
+        return {
+            "client": client,
+            "db": db_session,
+            "headers": admin_headers,
+            "supplier": supplier,
+            "products": products,
+            "location": location,
+        }
+
+    def _create(self, test_data, lines):
+        return test_data["client"].post(
+            "/api/v1/purchase-orders/",
+            json={
+                "supplier_id": test_data["supplier"].id,
+                "order_date": "2026-01-15",
+                "tax_amount": 5.0,
+                "items": [
+                    {"product_id": product.id, "quantity": quantity, "unit_price": price}
+                    for product, quantity, price in lines
+                ],
+            },
+            headers=test_data["headers"]
+        )
+
+    def test_create_purchase_order(self, test_data):
+        """Test creating a purchase order with several lines"""
+        first, second, _ = test_data["products"]
+        response = self._create(test_data, [(first, 10, 2.5), (second, 4, 10.0)])
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 2
+        assert data["subtotal"] == 65.0
+        assert data["total_amount"] == 70.0
+        assert {item["product"]["sku"] for item in data["items"]} == {"PO001", "PO002"}
+
+    def test_po_numbers_are_sequential_per_year(self, test_data):
+        """Test PO numbers come from the per-year counter and restart each year"""
+        first = test_data["products"][0]
+        numbers = [self._create(test_data, [(first, 1, 1.0)]).json()["po_number"] for _ in range(3)]
+
+        year = numbers[0][2:6]
+        assert [int(number[6:]) for number in numbers] == [1, 2, 3]
+        assert all(number.startswith(f"PO{year}") and len(number) == 12 for number in numbers)
+
+        allocator = PONumberAllocator()
+        assert allocator.next_number(test_data["db"], year=2099) == "PO2099000001"
+        assert allocator.next_number(test_data["db"], year=int(year)) == f"PO{year}000004"
+
+    def test_create_purchase_order_unknown_product(self, test_data):
+        """Test creating a purchase order referencing a missing product"""
+        response = test_data["client"].post(
+            "/api/v1/purchase-orders/",
+            json={
+                "supplier_id": test_data["supplier"].id,
+                "order_date": "2026-01-15",
+                "items": [
+                    {"product_id": test_data["products"][0].id, "quantity": 1, "unit_price": 1.0},
+                    {"product_id": 99999, "quantity": 1, "unit_price": 1.0},
+                ],
+            },
+            headers=test_data["headers"]
+        )
+
+        assert response.status_code == 404
+        assert "99999" in response.json()["detail"]
+
+    def test_update_with_items_diffs_lines(self, test_data):
+        """Test with-items updates keep matched lines and only replace the rest"""
+        first, second, third = test_data["products"]
+        po = self._create(test_data, [(first, 10, 2.5), (second, 4, 10.0)]).json()
+        first_line = next(item for item in po["items"] if item["product_id"] == first.id)
+
+        # Part of the first line has already arrived
+        line = test_data["db"].get(PurchaseOrderItem, first_line["id"])
+        line.received_quantity = 3
+        test_data["db"].commit()
+
+        response = test_data["client"].put(
+            f"/api/v1/purchase-orders/{po['id']}/with-items",
+            json={"items": [
+                {"product_id": first.id, "quantity": 12, "unit_price": 2.5},
+                {"product_id": third.id, "quantity": 1, "unit_price": 7.0},
+            ]},
+            headers=test_data["headers"]
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        items = {item["product_id"]: item for item in data["items"]}
+        assert set(items) == {first.id, third.id}
+        assert items[first.id]["id"] == first_line["id"]
+        assert items[first.id]["received_quantity"] == 3
+        assert items[first.id]["total_price"] == 30.0
+        assert data["subtotal"] == 37.0
+
+    def test_update_with_items_cannot_drop_received_line(self, test_data):
+        """Test lines that have been received cannot be removed"""
+        first, second, _ = test_data["products"]
+        po = self._create(test_data, [(first, 10, 2.5), (second, 4, 10.0)]).json()
+
+        line = test_data["db"].get(PurchaseOrderItem, po["items"][0]["id"])
+        line.received_quantity = 1
+        test_data["db"].commit()
+
+        remaining = next(product for product in (first, second) if product.id != line.product_id)
+        response = test_data["client"].put(
+            f"/api/v1/purchase-orders/{po['id']}/with-items",
+            json={"items": [{"product_id": remaining.id, "quantity": 1, "unit_price": 1.0}]},
+            headers=test_data["headers"]
+        )
+        assert response.status_code == 400
+
+    def _order(self, test_data, lines):
+        """Create a purchase order and move it to ordered"""
+        po = self._create(test_data, lines).json()
+        for new_status in ("pending_approval", "approved", "ordered"):
+            test_data["client"].post(
+                f"/api/v1/purchase-orders/{po['id']}/status",
+                json={"new_status": new_status},
+                headers=test_data["headers"]
+            )
+        return po
+
+    def test_receive_purchase_order(self, test_data):
+        """Test receiving creates inventory rows and movements that reference them"""
+        first, second, _ = test_data["products"]
+        po = self._order(test_data, [(first, 10, 2.5), (second, 4, 10.0)])
+        lines = {item["product_id"]: item["id"] for item in po["items"]}
+
+        response = test_data["client"].post(
+            f"/api/v1/purchase-orders/{po['id']}/receive?location_id={test_data['location'].id}",
+            json=[
+                {"item_id": lines[first.id], "received_quantity": 6},
+                {"item_id": lines[second.id], "received_quantity": 4},
+            ],
+            headers=test_data["headers"]
+        )
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "partially_received"
+
+        inventory = test_data["client"].get(
+            f"/api/v1/inventory/?location_id={test_data['location'].id}",
+            headers=test_data["headers"]
+        ).json()["data"]
+        quantities = {item["product_id"]: item["quantity"] for item in inventory}
+        assert quantities == {first.id: 6, second.id: 4}
+
+        for item in inventory:
+            movements = test_data["client"].get(
+                f"/api/v1/inventory/{item['id']}/stock-movements",
+                headers=test_data["headers"]
+            ).json()
+            assert [movement["reference_id"] for movement in movements] == [po["id"]]
+
+        # Receiving more than ordered fails without applying anything
+        response = test_data["client"].post(
+            f"/api/v1/purchase-orders/{po['id']}/receive?location_id={test_data['location'].id}",
+            json=[{"item_id": lines[first.id], "received_quantity": 5}],
+            headers=test_data["headers"]
+        )
+        assert response.status_code == 400
+
+    def test_receive_several_purchase_orders(self, test_data):
+        """Test a receiving session covering lines from two purchase orders"""
+        first, second, third = test_data["products"]
+        po_a = self._order(test_data, [(first, 5, 1.0)])
+        po_b = self._order(test_data, [(first, 3, 2.0), (third, 2, 4.0)])
+
+        response = test_data["client"].post(
+            "/api/v1/purchase-orders/receive",
+            json={
+                "location_id": test_data["location"].id,
+                "lines": [
+                    {"purchase_order_id": po_a["id"], "item_id": po_a["items"][0]["id"], "received_quantity": 5},
+                    *[
+                        {"purchase_order_id": po_b["id"], "item_id": item["id"], "received_quantity": item["quantity"]}
+                        for item in po_b["items"]
+                    ],
+                ],
+            },
+            headers=test_data["headers"]
+        )
+
+        assert response.status_code == 200
+        assert [po["status"] for po in response.json()] == ["received", "received"]
+
+        inventory = test_data["client"].get(
+            f"/api/v1/inventory/?location_id={test_data['location'].id}",
+            headers=test_data["headers"]
+        ).json()["data"]
+        assert {item["product_id"]: item["quantity"] for item in inventory} == {first.id: 8, third.id: 2}
+
+    def test_list_purchase_order_views(self, test_data):
+        """Test the summary view returns line aggregates and the full view nested lines"""
+        first, second, _ = test_data["products"]
+        self._create(test_data, [(first, 10, 2.5), (second, 4, 10.0)])
+        self._create(test_data, [(first, 1, 1.0)])
+
+        response = test_data["client"].get("/api/v1/purchase-orders/?view=summary", headers=test_data["headers"])
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        summary = data["data"][0]
+        assert "items" not in summary
+        assert summary["supplier_name"] == "Test Supplier"
+        assert summary["line_count"] == 2
+        assert summary["ordered_quantity"] == 14
+        assert summary["received_quantity"] == 0
+        assert summary["total_amount"] == 70.0
+
+        data = test_data["client"].get("/api/v1/purchase-orders/?limit=1", headers=test_data["headers"]).json()
+        assert len(data["data"]) == 1
+        assert len(data["data"][0]["items"]) == 2
+        assert data["data"][0]["items"][0]["product"]["sku"] in {"PO001", "PO002"}
+
+    def test_bulk_status_change(self, test_data):
+        """Test permitted orders move in one request and the rest are reported per PO"""
+        first = test_data["products"][0]
+        pending = [self._create(test_data, [(first, 1, 1.0)]).json()["id"] for _ in range(3)]
+        draft = self._create(test_data, [(first, 1, 1.0)]).json()["id"]
+
+        response = test_data["client"].post(
+            "/api/v1/purchase-orders/bulk-status",
+            json={"po_ids": pending, "new_status": "pending_approval"},
+            headers=test_data["headers"]
+        )
+        assert response.json()["updated"] == 3
+        version = test_data["client"].get(f"/api/v1/purchase-orders/{pending[0]}", headers=test_data["headers"]).json()["version_id"]
+
+        response = test_data["client"].post(
+            "/api/v1/purchase-orders/bulk-status",
+            json={"po_ids": [*pending, draft, 999999], "new_status": "approved"},
+            headers=test_data["headers"]
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["updated"], data["failed"]) == (3, 2)
+        outcomes = {result["po_id"]: result for result in data["results"]}
+        assert all(outcomes[po_id]["success"] and outcomes[po_id]["status"] == "approved" for po_id in pending)
+        assert outcomes[draft]["success"] is False
+        assert outcomes[draft]["status"] == "draft"
+        assert outcomes[999999]["detail"] == "Purchase order not found"
+
+        po = test_data["client"].get(f"/api/v1/purchase-orders/{pending[0]}", headers=test_data["headers"]).json()
+        assert po["status"] == "approved"
+        assert po["approved_by"] is not None
+        assert po["version_id"] == version + 1
+
+        analytics = test_data["client"].get(
+            "/api/v1/analytics/purchase-orders/by-status?end_month=2026-01-01&months=1",
+            headers=test_data["headers"]
+        ).json()
+        assert {row["status"]: row["order_count"] for row in analytics} == {"draft": 1, "approved": 3}
+
+    def test_bulk_status_change_skips_rows_changed_concurrently(self, test_data, db_session):
+        """Test an order that leaves the allowed statuses before the UPDATE is reported, not streamed"""
+        import json
+        from sqlalchemy import event
+        from app.models.change_event import ChangeEvent
+
+        first = test_data["products"][0]
+        won, lost = [self._create(test_data, [(first, 1, 1.0)]).json()["id"] for _ in range(2)]
+
+        # Another writer cancels one order between the locked read and the guarded UPDATE
+        def cancel_first(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("UPDATE purchase_orders SET status"):
+                cursor.execute("UPDATE purchase_orders SET status = 'CANCELLED' WHERE id = ?", (lost,))
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", cancel_first)
+        try:
+            response = test_data["client"].post(
+                "/api/v1/purchase-orders/bulk-status",
+                json={"po_ids": [won, lost], "new_status": "pending_approval"},
+                headers=test_data["headers"]
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", cancel_first)
+
+        data = response.json()
+        assert (data["updated"], data["failed"]) == (1, 1)
+        outcomes = {result["po_id"]: result for result in data["results"]}
+        assert outcomes[won]["success"] is True
+        assert outcomes[lost]["success"] is False
+        assert outcomes[lost]["detail"] == "Status changed concurrently; reload and retry"
+
+        streamed = [
+            (event.entity_id, fields["status"])
+            for event in db_session.query(ChangeEvent).filter(ChangeEvent.entity == "purchase_order", ChangeEvent.op == "updated")
+            for fields in [json.loads(event.fields)] if "status" in fields
+        ]
+        assert streamed == [(won, "pending_approval")]
+
+    def test_bulk_status_change_requires_permission(self, test_data, staff_headers):
+        response = test_data["client"].post(
+            "/api/v1/purchase-orders/bulk-status",
+            json={"po_ids": [1], "new_status": "approved"},
+            headers=staff_headers
+        )
+        assert response.status_code == 403
@@ -0,0 +1,105 @@
+import pytest
+from datetime import date, datetime, timedelta
+
+from app.core.replenishment import plan_reorders
+from app.models.inventory import Inventory, StockMovement, StockMovementType
+from app.models.location import Location
+from app.models.product import Product
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderStatus
+from app.models.supplier import Supplier
+
+class TestReplenishment:
+    """Test reorder suggestions and draft purchase orders"""
+
+    @pytest.fixture
+    def test_data(self, client, db_session, admin_user, admin_headers):
+        """A supplier with a 7 day lead time, a product below its reorder point and a product with demand"""
+        supplier = Supplier(name="Replenishment Supplier", code="REPL")
+        location = Location(name="Replenishment Location", code="REPL-LOC")
+        below_point = Product(name="Below Point", sku="REPL001", price=4.0, cost=2.0, reorder_point=10, max_stock_level=50)
+        with_demand = Product(name="With Demand", sku="REPL002", price=5.0, reorder_point=0)
+        idle = Product(name="Idle", sku="REPL003", price=1.0, reorder_point=0)
+        db_session.add_all([supplier, location, below_point, with_demand, idle])
+        db_session.flush()
+        for product in (below_point, with_demand, idle):
+            product.supplier_id = supplier.id
+
+        inventory = [
+            Inventory(product_id=product.id, location_id=location.id, quantity=quantity, available_quantity=quantity)
+            for product, quantity in ((below_point, 5), (with_demand, 20), (idle, 0))
+        ]
+        db_session.add_all(inventory)
+        db_session.flush()
+
+        # 30 units issued on each of three days: 1 unit a day over the 90 day window
+        now = datetime.utcnow()
+        db_session.add_all([
+            StockMovement(inventory_item_id=inventory[1].id, movement_type=StockMovementType.OUT,
+                          quantity=30, created_at=now - timedelta(days=days))
+            for days in (5, 15, 25)
+        ])
+        db_session.add(PurchaseOrder(
+            po_number="PO-REPL-RECEIVED", supplier_id=supplier.id, status=PurchaseOrderStatus.RECEIVED,
+            order_date=date.today() - timedelta(days=10), delivery_date=date.today() - timedelta(days=3),
+            created_by=admin_user.id
+        ))
+        db_session.commit()
+        return {"client": client, "db": db_session, "headers": admin_headers, "supplier": supplier}
+
+    def test_reorder_suggestions_dry_run(self, test_data):
+        """Test suggestions use reorder points, demand and supplier lead time without writing"""
+        response = test_data["client"].get("/api/v1/replenishment/suggestions", headers=test_data["headers"])
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data["sku_count"] == 3
+        assert len(data["suggestions"]) == 1
+        suggestion = data["suggestions"][0]
+        assert suggestion["supplier_name"] == "Replenishment Supplier"
+
+        lines = {line["sku"]: line for line in suggestion["lines"]}
+        assert set(lines) == {"REPL001", "REPL002"}
+
+        # Up to max_stock_level at cost
+        assert lines["REPL001"]["quantity"] == 45
+        assert lines["REPL001"]["unit_price"] == 2.0
+
+        # 1/day over a 7 day lead time plus safety stock of 1.65 * sigma * sqrt(7)
+        demand = lines["REPL002"]
+        assert demand["daily_demand"] == 1.0
+        assert demand["lead_time_days"] == 7.0
+        assert demand["reorder_level"] == 31
+        assert demand["target_level"] == 61
+        assert demand["quantity"] == 41
+        assert suggestion["total_amount"] == 45 * 2.0 + 41 * 5.0
+
+        assert test_data["db"].query(PurchaseOrder).count() == 1
+
+    def test_draft_purchase_orders_count_as_on_order(self, test_data):
+        """Test drafting creates one purchase order per supplier and the next plan is empty"""
+        response = test_data["client"].post("/api/v1/replenishment/draft-purchase-orders", headers=test_data["headers"])
+        assert response.status_code == 200
+        data = response.json()
+
+        assert len(data) == 1
+        assert data[0]["status"] == "draft"
+        assert data[0]["supplier_id"] == test_data["supplier"].id
+        assert {(item["product"]["sku"], item["quantity"]) for item in data[0]["items"]} == {("REPL001", 45), ("REPL002", 41)}
+        assert data[0]["total_amount"] == 295.0
+
+        assert plan_reorders(test_data["db"]).suggestions == []
+
+    def test_reorder_suggestions_require_create_permission(self, test_data, viewer_headers):
+        response = test_data["client"].get("/api/v1/replenishment/suggestions", headers=viewer_headers)
+        assert response.status_code == 403
+
+    def test_scheduled_job_drafts_purchase_orders(self, test_data):
+        """Test the scheduled replenishment job drafts the plan's purchase orders"""
+        from app.core.replenishment import run_replenishment_job
+        from tests.conftest import TestingSessionLocal
+
+        assert run_replenishment_job(TestingSessionLocal) == 1
+
+        db = test_data["db"]
+        db.expire_all()
+        assert db.query(PurchaseOrder).filter(PurchaseOrder.status == PurchaseOrderStatus.DRAFT).count() == 1
@@ -0,0 +1,175 @@
+import pytest
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+
+from app.core.reservations import ReservationExpiryScheduler, expire_reservations, release_reservation
+from app.models.inventory import Inventory
+from app.models.location import Location
+from app.models.product import Product
+from app.models.reservation import StockReservation, ReservationStatus
+
+class TestReservationEndpoints:
+    """Test stock reservations and their expiry"""
+
+    @pytest.fixture
+    def test_data(self, client, db_session, admin_headers):
+        """Create an inventory item with 50 units on hand"""
+        product = Product(name="Reserved Product", sku="RES001", price=10.0, reorder_point=5)
+        location = Location(name="Reservation Warehouse", code="RES-LOC")
+        db_session.add_all([product, location])
+        db_session.commit()
+
+        item = Inventory(product_id=product.id, location_id=location.id, quantity=50, reserved_quantity=0, available_quantity=50)
+        db_session.add(item)
+        db_session.commit()
+
+        return {
+            "client": client,
+            "db": db_session,
+            "headers": admin_headers,
+            "item": item,
+        }
+
+    def _reserve(self, test_data, quantity, **extra):
+        return test_data["client"].post(
+            "/api/v1/reservations/",
+            json={"inventory_item_id": test_data["item"].id, "quantity": quantity, **extra},
+            headers=test_data["headers"]
+        )
+
+    def test_reserve_and_release(self, test_data):
+        """Test reserving holds stock and releasing returns it"""
+        response = self._reserve(test_data, 20, ttl_seconds=60)
+
+        assert response.status_code == 201
+        reservation = response.json()
+        assert reservation["status"] == "active"
+
+        item = test_data["db"].get(Inventory, test_data["item"].id)
+        assert item.reserved_quantity == 20
+        assert item.available_quantity == 30
+
+        response = test_data["client"].post(
+            f"/api/v1/reservations/{reservation['id']}/release",
+            headers=test_data["headers"]
+        )
+        assert response.status_code == 200
+        assert response.json()["status"] == "released"
+        assert item.reserved_quantity == 0
+        assert item.available_quantity == 50
+
+    def test_reserve_more_than_available(self, test_data):
+        """Test reservations cannot exceed available stock"""
+        assert self._reserve(test_data, 40).status_code == 201
+        assert self._reserve(test_data, 20).status_code == 409
+
+    def test_stock_out_cannot_consume_reserved_stock(self, test_data):
+        """Test outbound movements are limited to stock not held by reservations"""
+        assert self._reserve(test_data, 40).status_code == 201
+
+        movement = {"movement_type": "out", "quantity": 20}
+        url = f"/api/v1/inventory/{test_data['item'].id}/stock-movement"
+        response = test_data["client"].post(url, json=movement, headers=test_data["headers"])
+        assert response.status_code == 400
+        assert "10 available after reservations" in response.json()["detail"]
+
+        movement["quantity"] = 10
+        assert test_data["client"].post(url, json=movement, headers=test_data["headers"]).status_code == 200
+        item = test_data["db"].get(Inventory, test_data["item"].id)
+        test_data["db"].refresh(item)
+        assert item.quantity == 40
+        assert item.available_quantity == 0
+
+    def test_adjustment_cannot_consume_reserved_stock(self, test_data):
+        """Test negative adjustments clamp at unreserved stock and record what was applied"""
+        assert self._reserve(test_data, 40).status_code == 201
+
+        item_id = test_data["item"].id
+        response = test_data["client"].post(
+            f"/api/v1/inventory/{item_id}/adjust-stock",
+            json={"quantity_change": -30},
+            headers=test_data["headers"]
+        )
+        assert response.status_code == 200
+        assert response.json()["new_quantity"] == 40
+        assert response.json()["available_quantity"] == 0
+
+        movements = test_data["client"].get(
+            f"/api/v1/inventory/{item_id}/stock-movements", headers=test_data["headers"]
+        ).json()
+        assert [(m["movement_type"], m["quantity"]) for m in movements] == [("out", 10)]
+
+    def test_fulfill_issues_stock(self, test_data):
+        """Test fulfilling a reservation ships the reserved quantity"""
+        reservation = self._reserve(test_data, 15).json()
+
+        response = test_data["client"].post(
+            f"/api/v1/reservations/{reservation['id']}/fulfill",
+            headers=test_data["headers"]
+        )
+        assert response.status_code == 200
+        assert response.json()["reference_type"] == "reservation"
+
+        item = test_data["db"].get(Inventory, test_data["item"].id)
+        assert item.quantity == 35
+        assert item.reserved_quantity == 0
+        assert item.available_quantity == 35
+
+        # Already fulfilled reservations cannot be released
+        response = test_data["client"].post(
+            f"/api/v1/reservations/{reservation['id']}/release",
+            headers=test_data["headers"]
+        )
+        assert response.status_code == 400
+
+    def test_stale_reservation_is_not_released_twice(self, test_data):
+        """Test the status is re-checked under the row lock, not trusted from a stale load"""
+        db = test_data["db"]
+        reservation = self._reserve(test_data, 10).json()
+        stale = db.get(StockReservation, reservation["id"])
+        assert stale.status == ReservationStatus.ACTIVE
+
+        response = test_data["client"].post(
+            f"/api/v1/reservations/{reservation['id']}/release",
+            headers=test_data["headers"]
+        )
+        assert response.status_code == 200
+
+        with pytest.raises(HTTPException) as exc_info:
+            release_reservation(db, stale)
+        assert exc_info.value.status_code == 400
+
+        item = db.get(Inventory, test_data["item"].id)
+        db.refresh(item)
+        assert item.reserved_quantity == 0
+        assert item.available_quantity == 50
+
+    def test_expired_reservations_are_released(self, test_data):
+        """Test the expiry sweep releases only reservations past their deadline"""
+        db = test_data["db"]
+        expiring = self._reserve(test_data, 10).json()
+        live = self._reserve(test_data, 5).json()
+
+        db.get(StockReservation, expiring["id"]).expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+
+        assert expire_reservations(db) == 1
+        assert db.get(StockReservation, expiring["id"]).status == ReservationStatus.EXPIRED
+        assert db.get(StockReservation, live["id"]).status == ReservationStatus.ACTIVE
+
+        item = db.get(Inventory, test_data["item"].id)
+        assert item.reserved_quantity == 5
+        assert item.available_quantity == 45
+
+    def test_scheduler_pops_deadlines_in_order(self):
+        """Test the scheduler heap yields only due reservations, earliest first"""
+        scheduler = ReservationExpiryScheduler()
+        now = datetime.utcnow()
+        scheduler.schedule(2, now + timedelta(seconds=30))
+        scheduler.schedule(1, now - timedelta(seconds=10))
+        scheduler.schedule(3, now - timedelta(seconds=5))
+
+        due = scheduler.pop_due((now - datetime(1970, 1, 1)).total_seconds())
+        assert due == [1, 3]
+        assert len(scheduler) == 1
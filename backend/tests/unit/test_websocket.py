@@ -0,0 +1,280 @@
+import asyncio
+import json
+import time
+
+import msgpack
+import pytest
+
+from app.core import websocket as websocket_module
+from app.core.backplane import Backplane, InProcessBackplane, PostgresBackplane, create_backplane
+from app.core.database import engine
+from app.core.websocket import ConnectionManager, IDLE_CLOSE_CODE, SLOW_CONSUMER_CLOSE_CODE, manager as global_manager
+
+class FakeWebSocket:
+    """Records sent frames; a stalled socket never completes a send"""
+
+    def __init__(self, stalled: bool = False, subprotocols=()):
+        self.stalled = stalled
+        self.scope = {"subprotocols": list(subprotocols)}
+        self.subprotocol = None
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self, subprotocol=None):
+        self.subprotocol = subprotocol
+
+    async def send_text(self, message: str):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(message)
+
+    async def send_bytes(self, message: bytes):
+        await self.send_text(message)
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+class TestConnectionManager:
+    """Test WebSocket fan-out through per-connection queues"""
+
+    def test_stalled_client_is_evicted_without_delaying_others(self):
+        async def scenario():
+            manager = ConnectionManager(queue_size=2)
+            healthy = [FakeWebSocket() for _ in range(3)]
+            stalled = FakeWebSocket(stalled=True)
+            for websocket in (*healthy, stalled):
+                await manager.connect(websocket)
+
+            for i in range(5):
+                await manager.broadcast(f"message {i}")
+                await asyncio.sleep(0)  # Let writers drain
+            await asyncio.sleep(0)
+
+            return manager, healthy, stalled
+
+        manager, healthy, stalled = asyncio.run(scenario())
+
+        assert all(websocket.sent == [f"message {i}" for i in range(5)] for websocket in healthy)
+        assert stalled.closed_with == SLOW_CONSUMER_CLOSE_CODE
+        assert stalled not in manager.clients
+        assert len(manager.active_connections) == 3
+        assert manager.stats["evictions"] == 1
+        assert manager.stats["messages_dropped"] == 3  # Two queued plus the one that overflowed
+
+    def test_personal_messages_and_disconnect(self):
+        async def scenario():
+            manager = ConnectionManager()
+            mine, other = FakeWebSocket(), FakeWebSocket()
+            await manager.connect(mine, user_id=1)
+            await manager.connect(other, user_id=2)
+
+            await manager.send_alert({"product_id": 5}, user_id=1)
+            await asyncio.sleep(0)
+            manager.disconnect(mine, 1)
+            await manager.broadcast("after disconnect")
+            await asyncio.sleep(0)
+            return manager, mine, other
+
+        manager, mine, other = asyncio.run(scenario())
+
+        assert len(mine.sent) == 1 and '"stock_alert"' in mine.sent[0]
+        assert other.sent == ["after disconnect"]
+        assert 1 not in manager.user_connections
+        assert list(manager.clients) == [other]
+
+    def test_backplane_relays_between_workers(self):
+        """Test a message published in one worker reaches sockets held by another"""
+        async def scenario():
+            backplane = InProcessBackplane()
+            worker_a, worker_b = ConnectionManager(), ConnectionManager()
+            await worker_a.start(backplane)
+            await worker_b.start(backplane)
+            socket_a, socket_b, user_socket = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+            await worker_a.connect(socket_a)
+            await worker_b.connect(socket_b)
+            await worker_b.connect(user_socket, user_id=7)
+
+            await worker_a.broadcast("to everyone")
+            await worker_a.send_personal_message("to user 7", 7)
+            await asyncio.sleep(0)
+            await worker_a.stop()
+            return socket_a, socket_b, user_socket
+
+        socket_a, socket_b, user_socket = asyncio.run(scenario())
+
+        assert socket_a.sent == ["to everyone"]
+        assert socket_b.sent == ["to everyone"]
+        assert user_socket.sent == ["to everyone", "to user 7"]
+
+    def test_topic_subscriptions_filter_delivery(self):
+        """Test subscribed clients only receive their topics while unsubscribed clients get everything"""
+        async def scenario():
+            manager = ConnectionManager()
+            store, product_watcher, firehose = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+            for websocket in (store, product_watcher, firehose):
+                await manager.connect(websocket)
+
+            assert await manager.handle_client_message(store, {"action": "subscribe", "topics": ["location:1"]})
+            assert await manager.handle_client_message(
+                product_watcher, {"action": "subscribe", "topics": ["product:9", "alerts:out_of_stock"]}
+            )
+            assert not await manager.handle_client_message(store, "ping")
+            await asyncio.sleep(0)
+            for websocket in (store, product_watcher):
+                websocket.sent.clear()
+
+            await manager.send_alert({"location_id": 1, "product_id": 5, "alert_type": "low_stock"})
+            await manager.send_alert({"location_id": 2, "product_id": 9, "alert_type": "out_of_stock"})
+            await manager.send_alert({"location_id": 2, "product_id": 6, "alert_type": "low_stock"})
+            await manager.handle_client_message(product_watcher, {"action": "unsubscribe", "topics": ["product:9"]})
+            await asyncio.sleep(0)
+            manager.disconnect(store)
+            return manager, store, product_watcher, firehose
+
+        manager, store, product_watcher, firehose = asyncio.run(scenario())
+
+        def product_ids(websocket):
+            return [json.loads(message)["data"]["product_id"] for message in websocket.sent if "stock_alert" in message]
+
+        assert product_ids(store) == [5]
+        assert product_ids(product_watcher) == [9]  # Matched on two topics, delivered once
+        assert product_ids(firehose) == [5, 9, 6]
+        assert json.loads(product_watcher.sent[-1]) == {"type": "unsubscribed", "topics": ["alerts:out_of_stock"]}
+        assert manager.topic_connections == {"alerts:out_of_stock": {product_watcher}}
+
+    def test_invalid_topics_are_rejected(self):
+        async def scenario():
+            manager = ConnectionManager()
+            websocket = FakeWebSocket()
+            await manager.connect(websocket)
+            await manager.handle_client_message(websocket, {"action": "subscribe", "topics": ["location:x"]})
+            await asyncio.sleep(0)
+            return manager, websocket
+
+        manager, websocket = asyncio.run(scenario())
+
+        assert json.loads(websocket.sent[0]) == {"type": "error", "detail": "Unknown topic: location:x"}
+        assert manager.topic_connections == {}
+        assert websocket in manager.unfiltered
+
+    def test_broadcast_is_encoded_once_for_all_recipients(self, monkeypatch):
+        """Test text and msgpack recipients share one encoding per format"""
+        packed = []
+        monkeypatch.setattr(websocket_module, "packb", lambda obj: packed.append(obj) or msgpack.packb(obj))
+
+        async def scenario():
+            manager = ConnectionManager()
+            text_clients = [FakeWebSocket(subprotocols=["json"]) for _ in range(3)]
+            binary_clients = [FakeWebSocket(subprotocols=["msgpack", "json"]) for _ in range(3)]
+            for websocket in (*text_clients, *binary_clients):
+                await manager.connect(websocket)
+            await manager.broadcast({"type": "notice", "count": 3})
+            await asyncio.sleep(0)
+            return text_clients, binary_clients
+
+        text_clients, binary_clients = asyncio.run(scenario())
+
+        assert [websocket.subprotocol for websocket in text_clients] == ["json"] * 3
+        assert [websocket.subprotocol for websocket in binary_clients] == ["msgpack"] * 3
+        assert json.loads(text_clients[0].sent[0]) == {"type": "notice", "count": 3}
+        assert all(websocket.sent[0] is text_clients[0].sent[0] for websocket in text_clients)
+        assert msgpack.unpackb(binary_clients[0].sent[0]) == {"type": "notice", "count": 3}
+        assert all(websocket.sent[0] is binary_clients[0].sent[0] for websocket in binary_clients)
+        assert len(packed) == 1
+
+    def test_idle_connections_are_reaped_and_live_ones_pinged(self):
+        async def scenario():
+            manager = ConnectionManager(idle_timeout=60)
+            live, dead = FakeWebSocket(), FakeWebSocket()
+            await manager.connect(live, user_id=1)
+            await manager.connect(dead, user_id=2)
+            manager.clients[dead].last_seen -= 120
+            manager.touch(live)
+
+            reaped = manager.reap()
+            await asyncio.sleep(0)
+            return manager, live, dead, reaped
+
+        manager, live, dead, reaped = asyncio.run(scenario())
+
+        assert reaped == 1
+        assert dead.closed_with == IDLE_CLOSE_CODE
+        assert [json.loads(message)["type"] for message in live.sent] == ["ping"]
+        assert manager.active_connections == {live}
+        assert manager.user_connections == {1: {live}}
+        assert manager.stats["reaped"] == 1
+
+    def test_socket_endpoints_unregister_on_disconnect(self, client):
+        """Test both alert socket routes handle protocol messages and leave no registry entries behind"""
+        for path in ("/api/v1/ws/alerts/5", "/api/v1/stock-alerts/ws/alerts/5"):
+            with client.websocket_connect(path) as websocket:
+                websocket.send_text(json.dumps({"action": "subscribe", "topics": ["location:1"]}))
+                assert websocket.receive_json() == {"type": "subscribed", "topics": ["location:1"]}
+                websocket.send_text("hello")  # Ignored: no echo
+                websocket.send_text(json.dumps({"action": "pong"}))
+
+            # The server side finishes on the test client's event loop thread
+            for _ in range(100):
+                if not global_manager.clients:
+                    break
+                time.sleep(0.01)
+            assert global_manager.clients == {}
+            assert global_manager.user_connections == {}
+            assert global_manager.topic_connections == {}
+
+    def test_msgpack_client_sends_binary_frames(self, client):
+        """Test a client on the msgpack subprotocol can send MessagePack frames"""
+        with client.websocket_connect("/api/v1/ws/alerts/5", subprotocols=["msgpack"]) as websocket:
+            websocket.send_bytes(b"\xc1")  # Malformed: ignored, the connection stays up
+            websocket.send_bytes(msgpack.packb({"action": "subscribe", "topics": ["location:1"]}))
+            assert msgpack.unpackb(websocket.receive_bytes()) == {"type": "subscribed", "topics": ["location:1"]}
+            websocket.send_bytes(msgpack.packb({"action": "pong"}))
+
+    def test_backplane_defaults_to_in_process_without_postgres(self):
+        assert isinstance(create_backplane(engine), InProcessBackplane)
+
+    def test_backplane_subclasses_must_implement_the_interface(self):
+        """Test an incomplete backplane fails at construction rather than on first publish"""
+        class StartOnly(Backplane):
+            async def start(self, handler):
+                pass
+
+        with pytest.raises(TypeError):
+            StartOnly()
+
+    def test_postgres_backplane_keeps_delivery_tasks_until_done(self):
+        """Test notifications are delivered on referenced tasks and failures are logged, not lost"""
+        class Notify:
+            def __init__(self, payload):
+                self.payload = payload
+
+        class FakeConnection:
+            notifies = [Notify(json.dumps({"n": 1})), Notify(json.dumps({"n": 2}))]
+
+            def poll(self):
+                pass
+
+        delivered = []
+
+        async def handler(envelope):
+            await asyncio.sleep(0)
+            if envelope["n"] == 2:
+                raise RuntimeError("delivery failed")
+            delivered.append(envelope)
+
+        async def scenario():
+            backplane = PostgresBackplane("postgresql://unused")
+            backplane.handler = handler
+            backplane._loop = asyncio.get_running_loop()
+            backplane._listen_conn = FakeConnection()
+            backplane._on_readable()
+            pending = len(backplane._handler_tasks)
+            await asyncio.gather(*backplane._handler_tasks, return_exceptions=True)
+            await asyncio.sleep(0)
+            return pending, backplane
+
+        pending, backplane = asyncio.run(scenario())
+        assert pending == 2
+        assert delivered == [{"n": 1}]
+        assert backplane._handler_tasks == set()
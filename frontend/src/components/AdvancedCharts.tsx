@@ -29,29 +29,32 @@ import {
   Sector,
   Cell as RechartsCell
 } from 'recharts';
+import { PurchaseOrderAnalytics, PurchaseOrderStatus } from '../types';
 
 interface AdvancedChartsProps {
   inventory: any[];
   products: any[];
   categories: any[];
-  purchaseOrders: any[];
-  suppliers: any[];
+  purchaseOrderAnalytics?: PurchaseOrderAnalytics;
 }
 
 const AdvancedCharts: React.FC<AdvancedChartsProps> = ({
   inventory,
   products,
   categories,
-  purchaseOrders,
-  suppliers
+  purchaseOrderAnalytics
 }) => {
+  // Purchase order charts are aggregated server-side by GET /analytics/purchase-orders
+  const statusCount = (status: PurchaseOrderStatus) =>
+    purchaseOrderAnalytics?.by_status.find(row => row.status === status)?.order_count || 0;
+
   // Generate funnel chart data for purchase order funnel
   const poFunnelData = [
-    { name: 'Draft', value: purchaseOrders.filter(po => po.status === 'draft').length, fill: '#6B7280' },
-    { name: 'Pending Approval', value: purchaseOrders.filter(po => po.status === 'pending_approval').length, fill: '#F59E0B' },
-    { name: 'Approved', value: purchaseOrders.filter(po => po.status === 'approved').length, fill: '#3B82F6' },
-    { name: 'Ordered', value: purchaseOrders.filter(po => po.status === 'ordered').length, fill: '#8B5CF6' },
-    { name: 'Received', value: purchaseOrders.filter(po => po.status === 'received').length, fill: '#10B981' }
+    { name: 'Draft', value: statusCount(PurchaseOrderStatus.DRAFT), fill: '#6B7280' },
+    { name: 'Pending Approval', value: statusCount(PurchaseOrderStatus.PENDING_APPROVAL), fill: '#F59E0B' },
+    { name: 'Approved', value: statusCount(PurchaseOrderStatus.APPROVED), fill: '#3B82F6' },
+    { name: 'Ordered', value: statusCount(PurchaseOrderStatus.ORDERED), fill: '#8B5CF6' },
+    { name: 'Received', value: statusCount(PurchaseOrderStatus.RECEIVED), fill: '#10B981' }
   ];
 
   // Generate stock level distribution
@@ -84,44 +87,20 @@ const AdvancedCharts: React.FC<AdvancedChartsProps> = ({
   ];
 
   // Generate supplier performance data
-  const supplierPerformanceData = suppliers.map(supplier => {
-    const supplierPOs = purchaseOrders.filter(po => po.supplier_id === supplier.id);
-    const totalValue = supplierPOs.reduce((sum, po) => sum + (po.total_amount || 0), 0);
-    const avgDeliveryTime = supplierPOs.length > 0 ? 
-      supplierPOs.reduce((sum, po) => {
-        if (po.status === 'received' && po.created_at && po.updated_at) {
-          const created = new Date(po.created_at);
-          const received = new Date(po.updated_at);
-          return sum + (received.getTime() - created.getTime()) / (1000 * 60 * 60 * 24); // days
-        }
-        return sum;
-      }, 0) / supplierPOs.filter(po => po.status === 'received').length : 0;
-    
-    return {
-      name: supplier.name,
-      orders: supplierPOs.length,
-      value: totalValue,
-      avgDeliveryTime: avgDeliveryTime || 0,
-      fill: getRandomColor()
-    };
-  }).sort((a, b) => b.value - a.value).slice(0, 8);
+  const supplierPerformanceData = (purchaseOrderAnalytics?.by_supplier || []).slice(0, 8).map(supplier => ({
+    name: supplier.supplier_name,
+    orders: supplier.order_count,
+    value: supplier.total_amount,
+    fill: getRandomColor()
+  }));
 
   // Generate monthly revenue trend
-  const monthlyRevenueData = Array.from({ length: 12 }, (_, i) => {
-    const month = new Date(2024, i, 1);
-    const monthPOs = purchaseOrders.filter(po => {
-      const poDate = new Date(po.created_at);
-      return poDate.getMonth() === i && poDate.getFullYear() === 2024;
-    });
-    
-    return {
-      month: month.toLocaleDateString('en-US', { month: 'short' }),
-      revenue: monthPOs.reduce((sum, po) => sum + (po.total_amount || 0), 0),
-      orders: monthPOs.length,
-      avgOrderValue: monthPOs.length > 0 ? 
-        monthPOs.reduce((sum, po) => sum + (po.total_amount || 0), 0) / monthPOs.length : 0
-    };
-  });
+  const monthlyRevenueData = (purchaseOrderAnalytics?.by_month || []).map(month => ({
+    month: new Date(`${month.month}T00:00:00`).toLocaleDateString('en-US', { month: 'short', year: '2-digit' }),
+    revenue: month.total_amount,
+    orders: month.order_count,
+    avgOrderValue: month.average_order_value
+  }));
 
   return (
     <div className="space-y-6">
@@ -211,7 +190,7 @@ const AdvancedCharts: React.FC<AdvancedChartsProps> = ({
                 <Tooltip 
                   formatter={(value, name) => [
                     name === 'value' ? `$${Number(value).toFixed(2)}` : value,
-                    name === 'value' ? 'Total Value' : name === 'orders' ? 'Orders' : 'Avg Delivery (days)'
+                    name === 'value' ? 'Total Value' : 'Orders'
                   ]}
                   contentStyle={{
                     backgroundColor: 'rgba(255, 255, 255, 0.95)',
@@ -232,7 +211,7 @@ const AdvancedCharts: React.FC<AdvancedChartsProps> = ({
         <div className="px-6 py-6">
           <div className="flex items-center justify-between mb-6">
             <h3 className="text-xl font-bold text-gray-900">Monthly Revenue Trends</h3>
-            <div className="text-sm text-gray-500">2024 Performance</div>
+            <div className="text-sm text-gray-500">Last 12 Months</div>
           </div>
           <ResponsiveContainer width="100%" height={300}>
             <ComposedChart data={monthlyRevenueData}>
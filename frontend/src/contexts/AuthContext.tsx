@@ -40,6 +40,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
         console.error('AuthContext error details:', error.response?.data);
         setIsAuthenticated(false);
         localStorage.removeItem('access_token');
+        localStorage.removeItem('refresh_token');
         localStorage.removeItem('user');
         // Disconnect WebSocket on error
         websocketService.disconnect();
@@ -68,6 +69,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   const logout = () => {
     // Clear cached user data on logout
     queryClient.removeQueries(['currentUser']);
+    apiService.auth.revokeRefreshToken();
     localStorage.removeItem('access_token');
     localStorage.removeItem('user');
     setIsAuthenticated(false);
@@ -1,6 +1,7 @@
 import React, { createContext, useContext, useState, useEffect, ReactNode } from 'react';
 import { useQuery } from 'react-query';
 import apiService from '../services/api';
+import { EntityChange } from '../types';
 
 interface NotificationContextType {
   activeAlertsCount: number;
@@ -23,7 +24,7 @@ export const NotificationProvider: React.FC<NotificationProviderProps> = ({ chil
     ['active-alerts-count'],
     () => apiService.stockAlerts.getActiveAlerts(),
     {
-      refetchInterval: 30000, // Refetch every 30 seconds
+      // Kept current by the WebSocket change stream instead of polling
       onSuccess: (data) => {
         setActiveAlertsCount(data?.length || 0);
         setUnreadAlertsCount(data?.length || 0);
@@ -57,14 +58,28 @@ export const NotificationProvider: React.FC<NotificationProviderProps> = ({ chil
       refreshAlerts();
     };
 
+    const handleEntityChange = (event: CustomEvent<EntityChange>) => {
+      if (event.detail.entity === 'stock_alert') {
+        refreshAlerts();
+      }
+    };
+
+    const handleStreamReset = () => {
+      refreshAlerts();
+    };
+
     // Add event listeners
     window.addEventListener('stockAlert', handleStockAlert as EventListener);
     window.addEventListener('alertResolved', handleAlertResolved as EventListener);
+    window.addEventListener('entityChange', handleEntityChange as EventListener);
+    window.addEventListener('changeStreamReset', handleStreamReset);
 
     // Cleanup
     return () => {
       window.removeEventListener('stockAlert', handleStockAlert as EventListener);
       window.removeEventListener('alertResolved', handleAlertResolved as EventListener);
+      window.removeEventListener('entityChange', handleEntityChange as EventListener);
+      window.removeEventListener('changeStreamReset', handleStreamReset);
     };
   }, [refreshAlerts]);
 
@@ -33,142 +33,55 @@ import {
 import apiService from '../services/api';
 
 const Dashboard: React.FC = () => {
-  const { data: productsData } = useQuery(['products'], () => apiService.products.getProducts());
-  const { data: categoriesData } = useQuery(['categories'], () => apiService.categories.getCategories());
-  const { data: inventoryData } = useQuery(['inventory'], () => apiService.inventory.getInventory());
-  const { data: suppliersData } = useQuery(['suppliers'], () => apiService.suppliers.getSuppliers());
-  const { data: locationsData } = useQuery(['locations'], () => apiService.locations.getLocations());
-  const { data: purchaseOrdersData } = useQuery(['purchase-orders'], () => apiService.purchaseOrders.getPurchaseOrders());
-  const { data: activeAlertsData } = useQuery(['active-alerts'], () => apiService.stockAlerts.getActiveAlerts());
+  const { data: summary } = useQuery(['dashboard-summary'], () => apiService.dashboard.getSummary());
 
-  const products = productsData?.data || [];
-  const categories = categoriesData?.data || [];
-  const inventory = inventoryData?.data || [];
-  const suppliers = suppliersData?.data || [];
-  const locations = locationsData?.data || [];
-  const purchaseOrders = purchaseOrdersData?.data || [];
-  const activeAlerts = activeAlertsData || [];
+  const counts = summary?.counts;
+  const stockStatus = summary?.stock_status;
+  const poStatus = summary?.purchase_order_status;
 
-  // Calculate stock status with detailed information
-  const inStockItems = inventory.filter(item => {
-    const product = products.find(p => p.id === item.product_id);
-    return item.available_quantity > (product?.min_stock_level || 0);
-  });
-
-  const lowStockItems = inventory.filter(item => {
-    const product = products.find(p => p.id === item.product_id);
-    return item.available_quantity > 0 && item.available_quantity <= (product?.min_stock_level || 0);
-  });
-
-  const outOfStockItems = inventory.filter(item => item.available_quantity <= 0);
-
-  const pendingPOs = purchaseOrders.filter(po => 
-    po.status === 'pending_approval' || po.status === 'approved'
-  );
-
-  // Stock Status Chart Data with detailed information
+  // Stock Status Chart Data
   const stockStatusData = [
-    { 
-      name: 'In Stock', 
-      value: inStockItems.length, 
-      fill: '#10B981', 
-      stroke: '#059669',
-      details: inStockItems.map(item => {
-        const product = products.find(p => p.id === item.product_id);
-        const location = locations.find(l => l.id === item.location_id);
-        return `${product?.name || 'Unknown'} - ${item.available_quantity} units at ${location?.name || 'Unknown'}`;
-      })
-    },
-    { 
-      name: 'Low Stock', 
-      value: lowStockItems.length, 
-      fill: '#F59E0B', 
-      stroke: '#D97706',
-      details: lowStockItems.map(item => {
-        const product = products.find(p => p.id === item.product_id);
-        const location = locations.find(l => l.id === item.location_id);
-        const minLevel = product?.min_stock_level || 0;
-        return `${product?.name || 'Unknown'} - ${item.available_quantity}/${minLevel} units at ${location?.name || 'Unknown'}`;
-      })
-    },
-    { 
-      name: 'Out of Stock', 
-      value: outOfStockItems.length, 
-      fill: '#EF4444', 
-      stroke: '#DC2626',
-      details: outOfStockItems.map(item => {
-        const product = products.find(p => p.id === item.product_id);
-        const location = locations.find(l => l.id === item.location_id);
-        return `${product?.name || 'Unknown'} - ${item.available_quantity} units at ${location?.name || 'Unknown'}`;
-      })
-    }
+    { name: 'In Stock', value: stockStatus?.ok || 0, fill: '#10B981', stroke: '#059669' },
+    { name: 'Low Stock', value: stockStatus?.low || 0, fill: '#F59E0B', stroke: '#D97706' },
+    { name: 'Out of Stock', value: stockStatus?.out || 0, fill: '#EF4444', stroke: '#DC2626' },
+    { name: 'Overstocked', value: stockStatus?.over || 0, fill: '#8B5CF6', stroke: '#7C3AED' }
   ];
 
-  // Purchase Order Status Chart Data with detailed information
+  // Purchase Order Status Chart Data
   const poStatusData = [
-    { 
-      name: 'Draft', 
-      value: purchaseOrders.filter(po => po.status === 'draft').length, 
-      fill: '#6B7280',
-      details: purchaseOrders.filter(po => po.status === 'draft').map(po => `PO-${po.id}: ${po.supplier?.name || 'Unknown Supplier'}`)
-    },
-    { 
-      name: 'Pending', 
-      value: purchaseOrders.filter(po => po.status === 'pending_approval').length, 
-      fill: '#F59E0B',
-      details: purchaseOrders.filter(po => po.status === 'pending_approval').map(po => `PO-${po.id}: ${po.supplier?.name || 'Unknown Supplier'}`)
-    },
-    { 
-      name: 'Approved', 
-      value: purchaseOrders.filter(po => po.status === 'approved').length, 
-      fill: '#3B82F6',
-      details: purchaseOrders.filter(po => po.status === 'approved').map(po => `PO-${po.id}: ${po.supplier?.name || 'Unknown Supplier'}`)
-    },
-    { 
-      name: 'Ordered', 
-      value: purchaseOrders.filter(po => po.status === 'ordered').length, 
-      fill: '#8B5CF6',
-      details: purchaseOrders.filter(po => po.status === 'ordered').map(po => `PO-${po.id}: ${po.supplier?.name || 'Unknown Supplier'}`)
-    },
-    { 
-      name: 'Received', 
-      value: purchaseOrders.filter(po => po.status === 'received').length, 
-      fill: '#10B981',
-      details: purchaseOrders.filter(po => po.status === 'received').map(po => `PO-${po.id}: ${po.supplier?.name || 'Unknown Supplier'}`)
-    },
-    { 
-      name: 'Cancelled', 
-      value: purchaseOrders.filter(po => po.status === 'cancelled').length, 
-      fill: '#EF4444',
-      details: purchaseOrders.filter(po => po.status === 'cancelled').map(po => `PO-${po.id}: ${po.supplier?.name || 'Unknown Supplier'}`)
-    }
+    { name: 'Draft', value: poStatus?.draft || 0, fill: '#6B7280' },
+    { name: 'Pending', value: poStatus?.pending_approval || 0, fill: '#F59E0B' },
+    { name: 'Approved', value: poStatus?.approved || 0, fill: '#3B82F6' },
+    { name: 'Ordered', value: poStatus?.ordered || 0, fill: '#8B5CF6' },
+    { name: 'Received', value: poStatus?.received || 0, fill: '#10B981' },
+    { name: 'Cancelled', value: poStatus?.cancelled || 0, fill: '#EF4444' }
   ];
 
   const stats = [
     {
       name: 'Total Products',
-      value: products.length,
+      value: counts?.products || 0,
       icon: CubeIcon,
       color: 'bg-blue-500',
       href: '/products'
     },
     {
       name: 'Inventory Items',
-      value: inventory.length,
+      value: counts?.inventory_items || 0,
       icon: ArchiveBoxIcon,
       color: 'bg-purple-500',
       href: '/inventory'
     },
     {
       name: 'Purchase Orders',
-      value: purchaseOrders.length,
+      value: counts?.purchase_orders || 0,
       icon: ClipboardDocumentListIcon,
       color: 'bg-pink-500',
       href: '/purchase-orders'
     },
     {
       name: 'Active Alerts',
-      value: activeAlerts.length,
+      value: counts?.active_alerts || 0,
       icon: BellIcon,
       color: 'bg-red-500',
       href: '/stock-alerts'
@@ -184,19 +97,6 @@ const Dashboard: React.FC = () => {
           <p className="font-bold text-gray-900">{data.name}</p>
           <p className="text-sm text-gray-600">Count: {data.value}</p>
           <p className="text-sm text-gray-600">Percentage: {((data.value / stockStatusData.reduce((sum, item) => sum + item.value, 0)) * 100).toFixed(1)}%</p>
-          {data.details && data.details.length > 0 && (
-            <div className="mt-2">
-              <p className="text-xs font-semibold text-gray-700 mb-1">Details:</p>
-              <div className="max-h-32 overflow-y-auto">
-                {data.details.slice(0, 5).map((detail: string, index: number) => (
-                  <p key={index} className="text-xs text-gray-600">• {detail}</p>
-                ))}
-                {data.details.length > 5 && (
-                  <p className="text-xs text-gray-500">... and {data.details.length - 5} more</p>
-                )}
-              </div>
-            </div>
-          )}
         </div>
       );
     }
@@ -212,19 +112,6 @@ const Dashboard: React.FC = () => {
           <p className="font-bold text-gray-900">{data.name}</p>
           <p className="text-sm text-gray-600">Count: {data.value}</p>
           <p className="text-sm text-gray-600">Percentage: {((data.value / poStatusData.reduce((sum, item) => sum + item.value, 0)) * 100).toFixed(1)}%</p>
-          {data.details && data.details.length > 0 && (
-            <div className="mt-2">
-              <p className="text-xs font-semibold text-gray-700 mb-1">Purchase Orders:</p>
-              <div className="max-h-32 overflow-y-auto">
-                {data.details.slice(0, 5).map((detail: string, index: number) => (
-                  <p key={index} className="text-xs text-gray-600">• {detail}</p>
-                ))}
-                {data.details.length > 5 && (
-                  <p className="text-xs text-gray-500">... and {data.details.length - 5} more</p>
-                )}
-              </div>
-            </div>
-          )}
         </div>
       );
     }
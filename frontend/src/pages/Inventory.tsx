@@ -1,9 +1,9 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from 'react-query';
 import { PlusIcon, PencilIcon, TrashIcon, MapPinIcon, ArrowUpIcon, ArrowDownIcon } from '@heroicons/react/24/outline';
 import { toast } from 'react-toastify';
 import apiService from '../services/api';
-import { Inventory as InventoryType, InventoryCreate, InventoryUpdate, Product, Location } from '../types';
+import { Inventory as InventoryType, InventoryCreate, InventoryUpdate, Product, Location, EntityChange, PaginatedResponse } from '../types';
 
 const InventoryPage: React.FC = () => {
   const [isModalOpen, setIsModalOpen] = useState(false);
@@ -30,6 +30,34 @@ const InventoryPage: React.FC = () => {
     })
   );
 
+  // Apply stream deltas to cached rows in place; only new or removed rows need a refetch
+  useEffect(() => {
+    const handleEntityChange = (event: CustomEvent<EntityChange>) => {
+      const change = event.detail;
+      if (change.entity !== 'inventory') {
+        return;
+      }
+      if (change.op !== 'updated') {
+        queryClient.invalidateQueries('inventory');
+        return;
+      }
+      queryClient.setQueriesData<PaginatedResponse<InventoryType> | undefined>('inventory', (page) =>
+        page && {
+          ...page,
+          data: page.data.map((item) => (item.id === change.id ? { ...item, ...change.fields } : item)),
+        }
+      );
+    };
+    const handleStreamReset = () => queryClient.invalidateQueries('inventory');
+
+    window.addEventListener('entityChange', handleEntityChange as EventListener);
+    window.addEventListener('changeStreamReset', handleStreamReset);
+    return () => {
+      window.removeEventListener('entityChange', handleEntityChange as EventListener);
+      window.removeEventListener('changeStreamReset', handleStreamReset);
+    };
+  }, [queryClient]);
+
   const { data: productsData } = useQuery(
     ['products'],
     () => apiService.products.getProducts({ is_active: true })
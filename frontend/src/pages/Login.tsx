@@ -28,8 +28,11 @@ const Login: React.FC = () => {
 
   const loginMutation = useMutation(apiService.auth.login, {
     onSuccess: async (data) => {
-      // Store token first
+      // Store tokens first; the refresh token renews the access token without another password login
       localStorage.setItem('access_token', data.access_token);
+      if (data.refresh_token) {
+        localStorage.setItem('refresh_token', data.refresh_token);
+      }
       
       // Small delay to ensure token is properly set
       await new Promise(resolve => setTimeout(resolve, 100));
@@ -6,9 +6,10 @@ import {
   Inventory, InventoryCreate, InventoryUpdate,
   Location, LocationCreate, LocationUpdate,
   Supplier, SupplierCreate, SupplierUpdate,
-  PurchaseOrder, PurchaseOrderCreate, PurchaseOrderUpdate, PurchaseOrderItem, PurchaseOrderItemCreate, PurchaseOrderStatus,
+  PurchaseOrder, PurchaseOrderCreate, PurchaseOrderUpdate, PurchaseOrderItem, PurchaseOrderItemCreate, PurchaseOrderStatus, PurchaseOrderSummary, PurchaseOrderAnalytics, PurchaseOrderBulkStatusResult,
   StockAlert, StockAlertCreate, StockAlertUpdate,
   AlertRule, AlertRuleCreate, AlertRuleUpdate,
+  DashboardSummary,
   PaginatedResponse, UserWithPermissions, UserCreate, UserUpdate
 } from '../types';
 
@@ -18,6 +19,8 @@ const API_VERSION = process.env.REACT_APP_API_VERSION || '/api/v1';
 
 class ApiService {
   private api: AxiosInstance;
+  // One refresh at a time: concurrent 401s wait on it instead of spending the refresh token twice
+  private refreshing: Promise<string> | null = null;
 
   constructor() {
     this.api = axios.create({
@@ -47,10 +50,24 @@ class ApiService {
     // Response interceptor to handle auth errors
     this.api.interceptors.response.use(
       (response) => response,
-      (error) => {
+      async (error) => {
+        const config = error.config;
+        const isAuthCall = config?.url?.startsWith('/auth/');
+        if (error.response?.status === 401 && config && !config._retried && !isAuthCall && localStorage.getItem('refresh_token')) {
+          // Access token expired: trade the refresh token for a new pair and retry once
+          config._retried = true;
+          try {
+            const token = await this.refreshAccessToken();
+            config.headers.Authorization = `Bearer ${token}`;
+            return this.api.request(config);
+          } catch {
+            // Fall through to a full login
+          }
+        }
         if (error.response?.status === 401) {
           console.log('401 error detected, clearing auth data');
           localStorage.removeItem('access_token');
+          localStorage.removeItem('refresh_token');
           localStorage.removeItem('user');
           // Only redirect if not already on login page
           if (window.location.pathname !== '/login') {
@@ -62,6 +79,24 @@ class ApiService {
     );
   }
 
+  private refreshAccessToken(): Promise<string> {
+    if (!this.refreshing) {
+      this.refreshing = this.api
+        .post<AuthResponse>('/auth/refresh', { refresh_token: localStorage.getItem('refresh_token') })
+        .then((response) => {
+          localStorage.setItem('access_token', response.data.access_token);
+          if (response.data.refresh_token) {
+            localStorage.setItem('refresh_token', response.data.refresh_token);
+          }
+          return response.data.access_token;
+        })
+        .finally(() => {
+          this.refreshing = null;
+        });
+    }
+    return this.refreshing;
+  }
+
   // Auth API
   auth = {
     login: async (credentials: LoginCredentials): Promise<AuthResponse> => {
@@ -99,7 +134,17 @@ class ApiService {
       return response.data;
     },
 
+    // Revoke the stored refresh token server-side; best effort, the local copy is dropped either way
+    revokeRefreshToken: () => {
+      const refreshToken = localStorage.getItem('refresh_token');
+      localStorage.removeItem('refresh_token');
+      if (refreshToken) {
+        this.api.post('/auth/logout', { refresh_token: refreshToken }).catch(() => undefined);
+      }
+    },
+
     logout: () => {
+      this.auth.revokeRefreshToken();
       localStorage.removeItem('access_token');
       localStorage.removeItem('user');
       window.location.href = '/login';
@@ -364,6 +409,29 @@ class ApiService {
       return response.data;
     },
 
+    getPurchaseOrderSummaries: async (params?: {
+      skip?: number;
+      limit?: number;
+      status?: string;
+      supplier_id?: number;
+      start_date?: string;
+      end_date?: string;
+    }): Promise<PaginatedResponse<PurchaseOrderSummary>> => {
+      const response: AxiosResponse<PaginatedResponse<PurchaseOrderSummary>> = await this.api.get('/purchase-orders/', {
+        params: { ...params, view: 'summary' },
+      });
+      return response.data;
+    },
+
+    getPurchaseOrderAnalytics: async (params?: {
+      end_month?: string;
+      months?: number;
+      top_suppliers?: number;
+    }): Promise<PurchaseOrderAnalytics> => {
+      const response: AxiosResponse<PurchaseOrderAnalytics> = await this.api.get('/analytics/purchase-orders', { params });
+      return response.data;
+    },
+
     getPurchaseOrder: async (id: number): Promise<PurchaseOrder> => {
       const response: AxiosResponse<PurchaseOrder> = await this.api.get(`/purchase-orders/${id}`);
       return response.data;
@@ -405,6 +473,14 @@ class ApiService {
       return response.data;
     },
 
+    bulkChangePurchaseOrderStatus: async (poIds: number[], newStatus: PurchaseOrderStatus): Promise<PurchaseOrderBulkStatusResult> => {
+      const response: AxiosResponse<PurchaseOrderBulkStatusResult> = await this.api.post('/purchase-orders/bulk-status', {
+        po_ids: poIds,
+        new_status: newStatus
+      });
+      return response.data;
+    },
+
     receivePurchaseOrder: async (poId: number, receivedItems: any[], locationId: number): Promise<PurchaseOrder> => {
       const response: AxiosResponse<PurchaseOrder> = await this.api.post(`/purchase-orders/${poId}/receive`, {
         received_items: receivedItems,
@@ -414,6 +490,14 @@ class ApiService {
     },
   };
 
+  // Dashboard API
+  dashboard = {
+    getSummary: async (): Promise<DashboardSummary> => {
+      const response: AxiosResponse<DashboardSummary> = await this.api.get('/dashboard/summary');
+      return response.data;
+    },
+  };
+
   // Stock Alerts API
   stockAlerts = {
     getStockAlerts: async (params?: {
@@ -6,6 +6,8 @@ class WebSocketService {
   private maxReconnectAttempts = 5;
   private reconnectDelay = 1000;
   private userId: number | null = null;
+  private topics = new Set<string>();
+  private lastSequence: number | null = null;
 
   connect(userId?: number) {
     this.userId = userId || null;
@@ -19,6 +21,11 @@ class WebSocketService {
       this.ws.onopen = () => {
         console.log('WebSocket connected');
         this.reconnectAttempts = 0;
+        // Restore subscriptions after a reconnect, then catch up on missed changes
+        if (this.topics.size > 0) {
+          this.sendAction('subscribe', Array.from(this.topics));
+        }
+        this.send(JSON.stringify({ action: 'resume', since: this.lastSequence }));
       };
 
       this.ws.onmessage = (event) => {
@@ -44,8 +51,20 @@ class WebSocketService {
   }
 
   private handleMessage(data: any) {
-    if (data.type === 'stock_alert') {
+    if (data.type === 'ping') {
+      // Server heartbeat: a silent connection is closed as dead
+      this.send(JSON.stringify({ action: 'pong' }));
+    } else if (data.type === 'stock_alert') {
       this.handleStockAlert(data.data);
+    } else if (data.type === 'change') {
+      this.lastSequence = Math.max(this.lastSequence ?? 0, data.seq);
+      window.dispatchEvent(new CustomEvent('entityChange', { detail: data }));
+    } else if (data.type === 'resumed' || data.type === 'reset') {
+      this.lastSequence = data.sequence;
+      if (data.type === 'reset') {
+        // The gap could not be replayed: listeners refetch
+        window.dispatchEvent(new CustomEvent('changeStreamReset'));
+      }
     }
   }
 
@@ -105,6 +124,21 @@ class WebSocketService {
     }
   }
 
+  // Narrow delivery to topics such as `location:3`, `product:42` or `alerts:low_stock`
+  subscribe(topics: string[]) {
+    topics.forEach((topic) => this.topics.add(topic));
+    this.sendAction('subscribe', topics);
+  }
+
+  unsubscribe(topics: string[]) {
+    topics.forEach((topic) => this.topics.delete(topic));
+    this.sendAction('unsubscribe', topics);
+  }
+
+  private sendAction(action: 'subscribe' | 'unsubscribe', topics: string[]) {
+    this.send(JSON.stringify({ action, topics }));
+  }
+
   send(message: string) {
     if (this.ws && this.ws.readyState === WebSocket.OPEN) {
       this.ws.send(message);
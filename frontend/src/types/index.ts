@@ -69,6 +69,8 @@ export interface RegisterData {
 export interface AuthResponse {
   access_token: string;
   token_type: string;
+  refresh_token?: string;
+  expires_in?: number;
   user: User;
 }
 
@@ -94,6 +96,7 @@ export interface Product {
   reorder_point: number;
   created_at: string;
   updated_at?: string;
+  version_id?: number;
   category?: Category;
   supplier?: Supplier;
 }
@@ -167,11 +170,15 @@ export interface Inventory {
   quantity: number;
   reserved_quantity: number;
   available_quantity: number;
+  stock_status?: 'ok' | 'low' | 'out' | 'over';
   unit_cost?: number;
+  average_unit_cost?: number;
+  fifo_value?: number;
   last_restocked?: string;
   notes?: string;
   created_at: string;
   updated_at?: string;
+  version_id?: number;
   product?: Product;
   location?: Location;
 }
@@ -327,10 +334,51 @@ export interface PurchaseOrder {
   approved_at?: string;
   created_at: string;
   updated_at?: string;
+  version_id?: number;
   supplier?: Supplier;
   items: PurchaseOrderItem[];
 }
 
+// List projection returned by GET /purchase-orders/?view=summary
+export interface PurchaseOrderSummary {
+  id: number;
+  po_number: string;
+  supplier_id: number;
+  supplier_name?: string;
+  status: PurchaseOrderStatus;
+  order_date: string;
+  expected_delivery_date?: string;
+  delivery_date?: string;
+  subtotal: number;
+  tax_amount: number;
+  shipping_amount: number;
+  total_amount: number;
+  currency: string;
+  created_by: number;
+  created_at: string;
+  updated_at?: string;
+  version_id?: number;
+  line_count: number;
+  ordered_quantity: number;
+  received_quantity: number;
+}
+
+// Per-PO outcome of POST /purchase-orders/bulk-status
+export interface PurchaseOrderStatusOutcome {
+  po_id: number;
+  success: boolean;
+  previous_status?: PurchaseOrderStatus;
+  status?: PurchaseOrderStatus;
+  detail?: string;
+}
+
+export interface PurchaseOrderBulkStatusResult {
+  new_status: PurchaseOrderStatus;
+  updated: number;
+  failed: number;
+  results: PurchaseOrderStatusOutcome[];
+}
+
 export interface PurchaseOrderCreate {
   supplier_id: number;
   order_date: string;
@@ -358,6 +406,56 @@ export interface PurchaseOrderUpdate {
   shipping_amount?: number;
 }
 
+// Dashboard KPIs returned by GET /dashboard/summary
+export interface DashboardCounts {
+  products: number;
+  categories: number;
+  inventory_items: number;
+  suppliers: number;
+  locations: number;
+  purchase_orders: number;
+  active_alerts: number;
+}
+
+export interface DashboardSummary {
+  counts: DashboardCounts;
+  stock_status: Record<string, number>;
+  purchase_order_status: Record<string, number>;
+  active_alerts_by_type: Record<string, number>;
+  inventory_value: number;
+  inventory_average_cost_value: number;
+  generated_at: string;
+}
+
+// Procurement analytics returned by GET /analytics/purchase-orders
+export interface SupplierSpend {
+  supplier_id: number;
+  supplier_name: string;
+  order_count: number;
+  total_amount: number;
+}
+
+export interface MonthlySpend {
+  month: string;
+  order_count: number;
+  total_amount: number;
+  average_order_value: number;
+}
+
+export interface StatusBreakdown {
+  status: PurchaseOrderStatus;
+  order_count: number;
+  total_amount: number;
+}
+
+export interface PurchaseOrderAnalytics {
+  start_month: string;
+  end_month: string;
+  by_supplier: SupplierSpend[];
+  by_month: MonthlySpend[];
+  by_status: StatusBreakdown[];
+}
+
 // Stock Alert types
 export enum AlertType {
   LOW_STOCK = "low_stock",
@@ -460,6 +558,16 @@ export interface ApiResponse<T> {
   message?: string;
 }
 
+// Delta from the WebSocket change stream
+export interface EntityChange {
+  type: 'change';
+  seq: number;
+  entity: 'inventory' | 'stock_alert' | 'purchase_order';
+  id: number;
+  op: 'created' | 'updated' | 'deleted';
+  fields: Record<string, any>;
+}
+
 export interface PaginatedResponse<T> {
   data: T[];
   total: number;